@@ -9,7 +9,7 @@ from utils.bot import GalacticWideWebBot
 from utils.checks import wait_for_startup
 from utils.containers import GuildContainer
 from utils.dataclasses import Config
-from utils.dbv2 import GWWGuilds
+from utils.dbv2 import GWWGuilds, run_in_db_thread
 from utils.embeds import BotInfoEmbeds
 from utils.interactables import ConfirmButton
 
@@ -64,11 +64,11 @@ class AdminCommandsCog(commands.Cog):
                 await self.bot.get_cog(name="PersonalOrderCog").personal_order_updates()
             case "Global Event":
                 self.bot.databases.war_info.global_event_id -= 1
-                self.bot.databases.war_info.save_changes()
+                await run_in_db_thread(self.bot.databases.war_info.save_changes)
                 await self.bot.get_cog(name="GlobalEventsCog").global_event_check()
             case "Dispatch":
                 self.bot.databases.war_info.dispatch_id -= 1
-                self.bot.databases.war_info.save_changes()
+                await run_in_db_thread(self.bot.databases.war_info.save_changes)
                 await self.bot.get_cog(name="DispatchesCog").dispatch_check()
             case "DSS changes":
                 self.bot.databases.dss_info.planet_index -= 1
@@ -76,11 +76,11 @@ class AdminCommandsCog(commands.Cog):
                     ta: choice([i for i in (1, 2, 3) if i != status])
                     for ta, status in self.bot.databases.dss_info.tactical_action_statuses.items()
                 }
-                self.bot.databases.dss_info.save_changes()
+                await run_in_db_thread(self.bot.databases.dss_info.save_changes)
                 await self.bot.get_cog(name="WarUpdatesCog").dss_check()
             case "Steam":
                 self.bot.databases.war_info.patch_notes_id -= 1
-                self.bot.databases.war_info.save_changes()
+                await run_in_db_thread(self.bot.databases.war_info.save_changes)
                 await self.bot.get_cog(name="SteamCog").steam_check()
         await inter.send(
             content=f"{feature} update completed in {(datetime.now(tz=timezone.utc) - command_start).total_seconds():.3f} seconds",
@@ -141,7 +141,7 @@ class AdminCommandsCog(commands.Cog):
         self, inter: AppCmdInter, id_to_check: int = commands.Param(large=True)
     ) -> None:
         await inter.response.defer(ephemeral=True)
-        all_guilds = GWWGuilds(fetch_all=True)
+        all_guilds = await run_in_db_thread(GWWGuilds, fetch_all=True)
         db_guild = next(
             (
                 g
@@ -158,7 +158,7 @@ class AdminCommandsCog(commands.Cog):
                     db_guild.guild_id
                 ) or await self.bot.fetch_guild(db_guild.guild_id)
             except NotFound:
-                db_guild.delete()
+                await run_in_db_thread(db_guild.delete)
                 await inter.send("Guild not found, deleted from DB")
                 return
             container = GuildContainer(
@@ -203,7 +203,9 @@ class AdminCommandsCog(commands.Cog):
             )
         elif "confirm_button" in inter.component.custom_id:
             button_type = inter.component.custom_id.split("_")[0]
-            db_guild: GWWGuild = GWWGuilds.get_specific_guild(id=guild_id)
+            db_guild: GWWGuild = await run_in_db_thread(
+                GWWGuilds.get_specific_guild, id=guild_id
+            )
             for interface_list in self.bot.interface_handler.lists.values():
                 try:
                     interface_list.remove_entry(guild_id_to_remove=guild_id)
@@ -220,7 +222,7 @@ class AdminCommandsCog(commands.Cog):
                         f"Discord Guild '{discord_guild.name}' left via admin button"
                     )
                 case "reset":
-                    db_guild.reset()
+                    await run_in_db_thread(db_guild.reset)
                     await inter.send(
                         content=f"Successfully reset **{discord_guild.name}**",
                         ephemeral=True,
@@ -258,7 +260,7 @@ class AdminCommandsCog(commands.Cog):
         public: str = commands.Param(choices=["Yes", "No"], default="No"),
     ) -> None:
         await inter.response.defer(ephemeral=public != "Yes")
-        gww_guilds = GWWGuilds(fetch_all=True)
+        gww_guilds = await run_in_db_thread(GWWGuilds, fetch_all=True)
         possible_fake_guilds: list[Guild] = []
         for gww_guild in gww_guilds:
             if gww_guild.features == []:
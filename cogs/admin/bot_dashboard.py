@@ -5,7 +5,7 @@ from disnake.ext.tasks import loop
 from disnake.ui import TextDisplay
 from utils.bot import GalacticWideWebBot
 from utils.containers import BotDashboardContainer
-from utils.dbv2 import BotDashboard
+from utils.dbv2 import BotDashboard, run_in_db_thread
 
 
 class BotDashboardCog(Cog):
@@ -64,7 +64,7 @@ class BotDashboardCog(Cog):
                     )
                 )
                 self.bot_dashboard_db.message_id = self.bot.bot_dashboard_message.id
-                self.bot_dashboard_db.save_changes()
+                await run_in_db_thread(self.bot_dashboard_db.save_changes)
             except HTTPException as e:
                 self.bot.logger.error(f"bot_dashboard loop returning - {e}")
                 return
@@ -7,7 +7,7 @@ from typing import TYPE_CHECKING
 from utils.bot import GalacticWideWebBot
 from utils.containers import GuildContainer, WelcomeContainer
 from utils.dataclasses import Languages
-from utils.dbv2 import GWWGuilds
+from utils.dbv2 import GUILD_REGISTRY, GWWGuilds, run_in_db_thread
 
 if TYPE_CHECKING:
     from utils.dbv2 import GWWGuild
@@ -32,7 +32,9 @@ class GuildManagementCog(Cog):
 
     @Cog.listener()
     async def on_guild_join(self, guild: Guild) -> None:
-        guild_in_db: GWWGuild | None = GWWGuilds.get_specific_guild(id=guild.id)
+        guild_in_db: GWWGuild | None = await run_in_db_thread(
+            GWWGuilds.get_specific_guild, id=guild.id
+        )
         if guild_in_db:
             text = (
                 f"Guild **{guild.name}** just added the bot but was already in the DB"
@@ -41,8 +43,11 @@ class GuildManagementCog(Cog):
             self.bot.logger.warning(text)
         else:
             language = Languages.get_from_locale(guild.preferred_locale)
-            guild_in_db = GWWGuilds.add(
-                guild_id=guild.id, language=language.short_code, feature_keys=[]
+            guild_in_db = await run_in_db_thread(
+                GWWGuilds.add,
+                guild_id=guild.id,
+                language=language.short_code,
+                feature_keys=[],
             )
 
         if guild.system_channel is not None:
@@ -61,14 +66,16 @@ class GuildManagementCog(Cog):
 
     @Cog.listener()
     async def on_guild_remove(self, guild: Guild) -> None:
-        guild_in_db: GWWGuild | None = GWWGuilds.get_specific_guild(id=guild.id)
+        guild_in_db: GWWGuild | None = await run_in_db_thread(
+            GWWGuilds.get_specific_guild, id=guild.id
+        )
         if not guild_in_db:
             text = f"Guild **{guild.name}** just removed the bot but was not in the DB"
             await self.bot.channels.moderator_channel.send(text)
             self.bot.logger.warning(text)
         else:
             container = GuildContainer(guild=guild, db_guild=guild_in_db, removed=True)
-            guild_in_db.delete()
+            await run_in_db_thread(guild_in_db.delete)
             await self.bot.channels.moderator_channel.send(components=container)
         for lst in self.bot.interface_handler.lists.values():
             for c in (c for c in lst.copy() if c.guild.id == guild.id):
@@ -82,8 +89,9 @@ class GuildManagementCog(Cog):
                 f"guild_checking loop returning - the bot isn't ready"
             )
             return
-        dbguilds = GWWGuilds(fetch_all=True)
+        dbguilds = await run_in_db_thread(GWWGuilds, fetch_all=True)
         if dbguilds:
+            GUILD_REGISTRY.load(dbguilds)
             disc_guild_ids = [dguild.id for dguild in self.bot.guilds]
             for dbguild in dbguilds:
                 if dbguild.guild_id not in disc_guild_ids:
@@ -135,8 +143,8 @@ class GuildManagementCog(Cog):
                 return
             for guild in self.guilds_to_remove:
                 guild.features.clear()
-                guild.update_features()
-                guild.delete()
+                await run_in_db_thread(guild.update_features)
+                await run_in_db_thread(guild.delete)
                 self.bot.logger.info(
                     f"{self.qualified_name} | ban_listener | removed {guild.guild_id} from the DB"
                 )
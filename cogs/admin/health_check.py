@@ -2,8 +2,9 @@ from datetime import datetime, timedelta, timezone
 from disnake import ButtonStyle, MessageInteraction, ui
 from disnake.ext import commands, tasks
 from main import GalacticWideWebBot
+from utils.api_wrapper.clients.resilience import CIRCUIT_BREAKERS, CircuitState
 from utils.dataclasses import Config, VIP
-from utils.dbv2 import Feature, GWWGuild, GWWGuilds
+from utils.dbv2 import Feature, GWWGuild, GWWGuilds, run_in_db_thread
 
 
 class HealthCheckCog(commands.Cog):
@@ -27,8 +28,8 @@ class HealthCheckCog(commands.Cog):
         if not self.bot.ready:
             return
         now = datetime.now(tz=timezone.utc)
-        guild: GWWGuild | None = GWWGuilds.get_specific_guild(
-            id=Config.SUPPORT_SERVER_ID
+        guild: GWWGuild | None = await run_in_db_thread(
+            GWWGuilds.get_specific_guild, id=Config.SUPPORT_SERVER_ID
         )
         if guild:
             try:
@@ -47,7 +48,14 @@ class HealthCheckCog(commands.Cog):
                     ) or await self.bot.fetch_channel(dashboard.channel_id)
                     message = await channel.fetch_message(dashboard.message_id)
                     cutoff = now - timedelta(minutes=17)
-                    if message.edited_at < cutoff and self.bot.startup_time < cutoff:
+                    # unchanged dashboards aren't edited, but the handler still confirms them
+                    updated_at = max(
+                        message.edited_at or message.created_at,
+                        self.bot.interface_handler.confirmed_at["dashboards"].get(
+                            message.id, message.created_at
+                        ),
+                    )
+                    if updated_at < cutoff and self.bot.startup_time < cutoff:
                         await self.send_warning(
                             error=f"Dashboards are late to being updated"
                         )
@@ -81,6 +89,10 @@ class HealthCheckCog(commands.Cog):
             if self.bot.ready_time < now:
                 await self.send_warning(error=f"Data has not been formatted yet")
 
+        for breaker in CIRCUIT_BREAKERS.open_breakers:
+            if breaker.state == CircuitState.OPEN:
+                await self.send_warning(error=f"Circuit open for {breaker.name}")
+
     @health_check.before_loop
     async def before_dashboard_check(self) -> None:
         await self.bot.wait_until_ready()
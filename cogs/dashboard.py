@@ -3,7 +3,8 @@ from disnake.ext.commands import Cog
 from disnake.ext.tasks import loop
 from utils.bot import GalacticWideWebBot
 from utils.dbv2 import GWWGuilds
-from utils.embeds import Dashboard
+from utils.embeds import Dashboard, DashboardModel
+from utils.functions import END_TIMES
 
 
 class DashboardCog(Cog):
@@ -34,31 +35,20 @@ class DashboardCog(Cog):
             self.bot.logger.warning("dashboard_poster returning - the bot isn't ready")
             return
         unique_langs = GWWGuilds.unique_languages()
+        model = DashboardModel.from_data(self.bot.data.formatted_data)
         dashboards = {
             lang: Dashboard(
-                data=self.bot.data.formatted_data,
+                data=model.data,
                 language_code=lang,
                 json_dict=self.bot.json_dict,
+                model=model,
             )
             for lang in unique_langs
         }
-        for lang, dashboard in dashboards.copy().items():
-            compact_level = 0
-            while (
-                dashboard.character_count() > 6000
-                or (len(dashboard.embeds) >= 9 and dashboard.character_count() > 5000)
-            ) and compact_level < 2:
-                compact_level += 1
-                dashboards[lang] = Dashboard(
-                    data=self.bot.data.formatted_data,
-                    language_code=lang,
-                    json_dict=self.bot.json_dict,
-                    compact_level=compact_level,
-                )
-                dashboard = dashboards[lang]
         await self.bot.interface_handler.send_feature("dashboards", dashboards)
         self.bot.logger.info(
             f"dashboard_poster loop - updated {len(self.bot.interface_handler.dashboards)} dashboards in {(datetime.now(tz=timezone.utc)-dashboards_start).total_seconds():.2f} seconds"
+            f" | end time projections: {END_TIMES.hits} hits ({END_TIMES.hit_ratio:.0%}), {END_TIMES.misses} misses"
         )
 
     @dashboard_poster.before_loop
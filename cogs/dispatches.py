@@ -10,7 +10,7 @@ from disnake.ext.tasks import loop
 from utils.bot import GalacticWideWebBot
 from utils.containers import DispatchContainer
 from utils.checks import wait_for_startup
-from utils.dbv2 import GWWGuilds
+from utils.dbv2 import GWWGuilds, run_in_db_thread
 from utils.interactables import DispatchStringSelect
 
 
@@ -37,11 +37,6 @@ class DispatchesCog(Cog):
                 "dispatch_check loop returning - the bot isn't ready"
             )
             return
-        if self.bot.interface_handler.busy:
-            self.bot.logger.warning(
-                "dispatch_check loop returning - the interface_handler is busy"
-            )
-            return
         if not self.bot.data.formatted_data:
             self.bot.logger.error("dispatch_check loop returning - NO FORMATTED DATA")
             return
@@ -71,7 +66,7 @@ class DispatchesCog(Cog):
                             f"dispatch_check loop - dispatch {dispatch.id} has been faulty for 15 minutes, skipping"
                         )
                         self.bot.databases.war_info.dispatch_id = dispatch.id
-                        self.bot.databases.war_info.save_changes()
+                        await run_in_db_thread(self.bot.databases.war_info.save_changes)
                         continue
                     unique_langs = GWWGuilds.unique_languages()
                     containers = {
@@ -96,7 +91,7 @@ class DispatchesCog(Cog):
                         announcement_type="dispatch",
                     )
                     self.bot.databases.war_info.dispatch_id = dispatch.id
-                    self.bot.databases.war_info.save_changes()
+                    await run_in_db_thread(self.bot.databases.war_info.save_changes)
                     self.bot.logger.info(
                         f"dispatch_check loop - sent dispatch #{dispatch.id} out to {len(self.bot.interface_handler.war_announcements)} channels in {(datetime.now(tz=timezone.utc) - dispatch_start).total_seconds():.2f} seconds"
                     )
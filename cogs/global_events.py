@@ -6,7 +6,7 @@ from os import listdir
 from utils.bot import GalacticWideWebBot
 from utils.checks import wait_for_startup
 from utils.containers import GlobalEventsContainer
-from utils.dbv2 import GWWGuilds
+from utils.dbv2 import GWWGuilds, run_in_db_thread
 
 
 class GlobalEventsCog(Cog):
@@ -32,11 +32,6 @@ class GlobalEventsCog(Cog):
                 "global_event_check loop returning - the bot isn't ready"
             )
             return
-        if self.bot.interface_handler.busy:
-            self.bot.logger.warning(
-                "global_event_check loop returning - the interface_handler is busy"
-            )
-            return
         if self.bot.data.formatted_data.global_events.get("en") is None:
             self.bot.logger.warning(
                 "global_event_check loop returning - english global events are missing"
@@ -65,7 +60,7 @@ class GlobalEventsCog(Cog):
                         f"global_event_check loop - global event {global_event.id} identified as MO briefing and is being skipped"
                     )
                     self.bot.databases.war_info.global_event_id = global_event.id
-                    self.bot.databases.war_info.save_changes()
+                    await run_in_db_thread(self.bot.databases.war_info.save_changes)
                     continue
                 if all(
                     [
@@ -78,7 +73,7 @@ class GlobalEventsCog(Cog):
                         f"global_event_check loop - global event {global_event.id} is fully empty and is being skipped"
                     )
                     self.bot.databases.war_info.global_event_id = global_event.id
-                    self.bot.databases.war_info.save_changes()
+                    await run_in_db_thread(self.bot.databases.war_info.save_changes)
                     continue
 
                 image_url = None
@@ -120,7 +115,7 @@ class GlobalEventsCog(Cog):
                     feature_type="detailed_dispatches", content=containers
                 )
                 self.bot.databases.war_info.global_event_id = global_event.id
-                self.bot.databases.war_info.save_changes()
+                await run_in_db_thread(self.bot.databases.war_info.save_changes)
                 self.bot.logger.info(
                     f"global_event_check loop - sent global event {global_event.id} out to {len(self.bot.interface_handler.detailed_dispatches)} channels in {(datetime.now(tz=timezone.utc) - ge_start).total_seconds():.2f} seconds"
                 )
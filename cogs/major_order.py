@@ -13,7 +13,7 @@ from utils.bot import GalacticWideWebBot
 from utils.checks import wait_for_startup
 from utils.containers import MOUnavailableContainer
 from utils.dataclasses import Languages
-from utils.dbv2 import GWWGuilds
+from utils.dbv2 import GWWGuilds, run_in_db_thread
 from utils.embeds import Dashboard
 from utils.interactables import WikiButton
 
@@ -47,11 +47,6 @@ class MajorOrderCog(Cog):
                 "major_order_check loop returning - the bot isn't ready"
             )
             return
-        if self.bot.interface_handler.busy:
-            self.bot.logger.warning(
-                "major_order_check loop returning - the interface_handler is busy"
-            )
-            return
         if not self.bot.data.formatted_data:
             self.bot.logger.error(
                 "major_order_check loop returning - NO FORMATTED DATA"
@@ -136,7 +131,7 @@ class MajorOrderCog(Cog):
                         embed_list.insert(0, image_embed)
 
                 self.bot.databases.war_info.major_order_ids.append(major_order.id)
-                self.bot.databases.war_info.save_changes()
+                await run_in_db_thread(self.bot.databases.war_info.save_changes)
                 await self.bot.interface_handler.send_feature(
                     feature_type="war_announcements",
                     content=embeds,
@@ -153,7 +148,7 @@ class MajorOrderCog(Cog):
         for active_id in self.bot.databases.war_info.major_order_ids.copy():
             if active_id not in current_mo_ids:
                 self.bot.databases.war_info.major_order_ids.remove(active_id)
-                self.bot.databases.war_info.save_changes()
+                await run_in_db_thread(self.bot.databases.war_info.save_changes)
                 self.bot.logger.info(
                     f"major_order_check - MO {active_id} no longer active, removed from DB"
                 )
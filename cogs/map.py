@@ -4,7 +4,6 @@ from disnake import (
     ApplicationInstallTypes,
     Colour,
     Embed,
-    File,
     HTTPException,
     InteractionContextTypes,
     NotFound,
@@ -14,6 +13,8 @@ from disnake.ext.tasks import loop
 from utils.bot import GalacticWideWebBot
 from utils.checks import wait_for_startup
 from utils.dbv2 import GWWGuilds
+from utils.embeds import MapEmbed
+from utils.map_renderer import MapSnapshot
 from utils.maps import Maps
 
 
@@ -39,7 +40,6 @@ class MapCog(Cog):
             self.bot.logger.warning("map_poster returning - the bot isn't ready")
             return
         unique_langs = GWWGuilds.unique_languages()
-        map_embeds = {lang: Embed(colour=Colour.dark_embed()) for lang in unique_langs}
         fifteen_minutes_ago = datetime.now(tz=timezone.utc) - timedelta(minutes=15)
         need_to_update_maps = any(
             [
@@ -52,41 +52,36 @@ class MapCog(Cog):
             ]
         )
         if need_to_update_maps:
-            self.bot.maps.update_base_map(
-                planets=self.bot.data.formatted_data.galactic_planets,
-                assignments=self.bot.data.formatted_data.assignments.get("en", []),
-            )
-            for language_code, embed in map_embeds.items():
-                language_json = self.bot.json_dict["languages"][language_code]
-                self.bot.maps.localize_map(
-                    language_code_short=language_code,
-                    language_code_long=language_json["code_long"],
-                    planets=self.bot.data.formatted_data.galactic_planets,
-                )
-                self.bot.maps.add_icons(
-                    lang=language_code,
-                    long_code=language_json["code_long"],
-                    planets=self.bot.data.formatted_data.galactic_planets,
-                    dss=self.bot.data.formatted_data.dss,
-                )
-                message = await self.bot.channels.waste_bin_channel.send(
-                    file=File(
-                        fp=self.bot.maps.FileLocations.localized_map_path(language_code)
-                    )
-                )
-                self.bot.maps.latest_maps[language_code] = Maps.LatestMap(
-                    datetime.now(tz=timezone.utc), message.attachments[0].url
-                )
-        for language_code, embed in map_embeds.items():
-            latest_map = self.bot.maps.latest_maps[language_code]
-            embed.set_image(url=latest_map.map_link)
-            embed.add_field(
-                "", f"-# Updated <t:{int(datetime.now(tz=timezone.utc).timestamp())}:R>"
+            results = await self.bot.map_renderer.publish_maps(
+                snapshot=MapSnapshot.from_data(self.bot.data.formatted_data),
+                languages={
+                    code: self.bot.json_dict["languages"][code]["code_long"]
+                    for code in unique_langs
+                },
+                channel=self.bot.channels.waste_bin_channel,
             )
+            errors = []
+            for language_code, result in results.items():
+                if isinstance(result, Exception):
+                    errors.append(result)
+                else:
+                    self.bot.maps.latest_maps[language_code] = result
+            if errors:
+                raise errors[0]
+        map_embeds = {
+            lang: MapEmbed(map_link=self.bot.maps.latest_maps[lang].map_link)
+            for lang in unique_langs
+        }
         await self.bot.interface_handler.send_feature("maps", map_embeds)
         self.bot.logger.info(
             f"map_poster loop - updated {len(self.bot.interface_handler.maps)} maps in {(datetime.now(tz=timezone.utc)-maps_start).total_seconds():.2f} seconds"
         )
+        if need_to_update_maps:
+            self.bot.logger.info(
+                f"map_poster loop - render timings | {self.bot.map_renderer.last_timings}"
+                f" | uploads: {self.bot.map_renderer.uploads}"
+                f" | uploads skipped: {self.bot.map_renderer.uploads_skipped}"
+            )
 
     @map_poster.before_loop
     async def before_map_poster(self) -> None:
@@ -124,53 +119,43 @@ class MapCog(Cog):
         if latest_map is None or (
             latest_map is not None and latest_map.updated_at < fifteen_minutes_ago
         ):
-            self.bot.maps.update_base_map(
-                planets=self.bot.data.formatted_data.galactic_planets,
-                assignments=self.bot.data.formatted_data.assignments.get("en", []),
-            )
             language_json = self.bot.json_dict["languages"][guild.language]
-            self.bot.maps.localize_map(
-                language_code_short=language_json["code"],
-                language_code_long=language_json["code_long"],
-                planets=self.bot.data.formatted_data.galactic_planets,
-            )
-            self.bot.maps.add_icons(
-                lang=language_json["code"],
-                long_code=language_json["code_long"],
-                planets=self.bot.data.formatted_data.galactic_planets,
-                dss=self.bot.data.formatted_data.dss,
-            )
+            snapshot = MapSnapshot.from_data(self.bot.data.formatted_data)
             try:
-                message = await self.bot.channels.waste_bin_channel.send(
-                    file=File(
-                        fp=self.bot.maps.FileLocations.localized_map_path(
-                            language_json["code"]
-                        )
-                    ),
-                )
-                self.bot.maps.latest_maps[language_json["code"]] = Maps.LatestMap(
-                    datetime.now(tz=timezone.utc), message.attachments[0].url
-                )
-                latest_map = self.bot.maps.latest_maps[language_json["code"]]
+                # a preview is shown first if the full map takes a while
+                async for latest_map in self.bot.map_renderer.publish_progressively(
+                    snapshot=snapshot,
+                    language_code=language_json["code"],
+                    language_code_long=language_json["code_long"],
+                    channel=self.bot.channels.waste_bin_channel,
+                ):
+                    if not await self.show_map(inter=inter, latest_map=latest_map):
+                        return
+                self.bot.maps.latest_maps[language_json["code"]] = latest_map
             except HTTPException as e:
                 await self.bot.channels.moderator_channel.send(
                     (
                         f"Error with Maps command\n"
                         f"Language: **{language_json['code']}**\n"
-                        f"Filepath: **{self.bot.maps.FileLocations.localized_map_path(language_json['code'])}**"
+                        f"Map version: **{snapshot.version}**"
                     )
                 )
                 raise e
+        else:
+            await self.show_map(inter=inter, latest_map=latest_map)
+
+    async def show_map(self, inter: AppCmdInter, latest_map: Maps.LatestMap) -> bool:
         embed = Embed(colour=Colour.dark_embed())
         embed.set_image(url=latest_map.map_link)
         try:
             await inter.edit_original_response(content="", embed=embed)
+            return True
         except NotFound:
             await inter.channel.send(
                 "There was an error with that command, please try again.",
                 delete_after=5,
             )
-            return
+            return False
 
 
 def setup(bot: GalacticWideWebBot) -> None:
@@ -1,4 +1,3 @@
-from datetime import datetime, timedelta, timezone
 from disnake import (
     AppCmdInter,
     ApplicationInstallTypes,
@@ -12,7 +11,7 @@ from disnake.ui import Container, MediaGallery
 from utils.bot import GalacticWideWebBot
 from utils.containers import PlanetContainers
 from utils.checks import wait_for_startup
-from utils.maps import Maps
+from utils.map_renderer import MapPlanet, MapSnapshot
 
 
 class PlanetCog(Cog):
@@ -97,48 +96,21 @@ class PlanetCog(Cog):
             gambit_planets=self.bot.data.formatted_data.gambit_planets,
         )
 
+        arrow_maps = None
         if with_map == "Yes":
-            fifteen_minutes_ago = datetime.now(tz=timezone.utc) - timedelta(minutes=15)
-            latest_map = self.bot.maps.latest_maps.get(guild.language)
-            if not latest_map or (
-                latest_map and latest_map.updated_at < fifteen_minutes_ago
-            ):
-                self.bot.maps.update_base_map(
-                    planets=self.bot.data.formatted_data.galactic_planets,
-                    assignments=self.bot.data.formatted_data.assignments.get("en", []),
-                )
-                language_json = self.bot.json_dict["languages"][guild.language]
-                self.bot.maps.localize_map(
-                    language_code_short=language_json["code"],
-                    language_code_long=language_json["code_long"],
-                    planets=self.bot.data.formatted_data.galactic_planets,
-                )
-                self.bot.maps.add_icons(
-                    lang=guild.language,
-                    long_code=language_json["code_long"],
-                    planets=self.bot.data.formatted_data.galactic_planets,
-                    dss=self.bot.data.formatted_data.dss,
-                )
-                message = await self.bot.channels.waste_bin_channel.send(
-                    file=File(
-                        fp=self.bot.maps.FileLocations.localized_map_path(
-                            language_json["code"]
-                        )
-                    )
-                )
-                self.bot.maps.latest_maps[language_json["code"]] = Maps.LatestMap(
-                    datetime.now(tz=timezone.utc), message.attachments[0].url
-                )
-                latest_map = self.bot.maps.latest_maps[language_json["code"]]
-            self.bot.maps.draw_arrow(language_code=guild.language, planet=planet_data)
-            arrow_map_message = await self.bot.channels.waste_bin_channel.send(
-                file=File(fp=self.bot.maps.FileLocations.arrow_map)
+            language_json = self.bot.json_dict["languages"][guild.language]
+            # a preview is sent first if the arrow map takes a while
+            arrow_maps = self.bot.map_renderer.publish_progressively(
+                snapshot=MapSnapshot.from_data(self.bot.data.formatted_data),
+                language_code=language_json["code"],
+                language_code_long=language_json["code_long"],
+                channel=self.bot.channels.waste_bin_channel,
+                planet=MapPlanet.from_planet(planet_data),
             )
+            arrow_map = await anext(arrow_maps)
             components.append(
                 Container(
-                    MediaGallery(
-                        MediaGalleryItem(arrow_map_message.attachments[0].url)
-                    ),
+                    MediaGallery(MediaGalleryItem(arrow_map.map_link)),
                     accent_colour=Colour.dark_embed(),
                 ),
             )
@@ -153,6 +125,13 @@ class PlanetCog(Cog):
                 components=components,
                 ephemeral=public != "Yes",
             )
+        if arrow_maps is not None:
+            async for arrow_map in arrow_maps:
+                components[-1] = Container(
+                    MediaGallery(MediaGalleryItem(arrow_map.map_link)),
+                    accent_colour=Colour.dark_embed(),
+                )
+                await inter.edit_original_response(components=components)
 
 
 def setup(bot: GalacticWideWebBot) -> None:
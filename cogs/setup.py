@@ -17,9 +17,9 @@ from disnake.ui import ActionRow, Container, TextDisplay
 from utils.bot import GalacticWideWebBot
 from utils.checks import wait_for_startup
 from utils.containers import SetupContainer
-from utils.dbv2 import Feature
+from utils.dbv2 import Feature, run_in_db_thread
 from utils.embeds import Dashboard
-from utils.maps import Maps
+from utils.map_renderer import MapSnapshot
 from utils.setup import Setup
 
 FEATURE_INDEXES = {
@@ -150,7 +150,7 @@ class SetupCog(Cog):
                                             message_id=message.id,
                                         )
                                     )
-                                    guild.update_features()
+                                    await run_in_db_thread(guild.update_features)
                                     self.bot.interface_handler.dashboards.append(
                                         message
                                     )
@@ -178,7 +178,7 @@ class SetupCog(Cog):
                 except:
                     pass
                 guild.features = [f for f in guild.features if f.name != "dashboards"]
-                guild.update_features()
+                await run_in_db_thread(guild.update_features)
                 self.bot.interface_handler.dashboards.remove_entry(guild.guild_id)
                 await inter.edit_original_response(
                     components=SetupContainer(
@@ -203,7 +203,7 @@ class SetupCog(Cog):
                 except:
                     pass
                 guild.features = [f for f in guild.features if f.name != "maps"]
-                guild.update_features()
+                await run_in_db_thread(guild.update_features)
                 self.bot.interface_handler.maps.remove_entry(guild.guild_id)
                 await inter.edit_original_response(
                     components=SetupContainer(
@@ -253,7 +253,7 @@ class SetupCog(Cog):
             elif "clear_features_button-" in inter.component.custom_id:
                 feature_type = inter.component.custom_id.split("-")[1]
                 guild.features = [f for f in guild.features if f.name != feature_type]
-                guild.update_features()
+                await run_in_db_thread(guild.update_features)
                 getattr(self.bot.interface_handler, feature_type).remove_entry(
                     guild.guild_id
                 )
@@ -338,17 +338,6 @@ class SetupCog(Cog):
                     language_code=guild.language,
                     json_dict=self.bot.json_dict,
                 )
-                compact_level = 0
-                while (
-                    dashboard.character_count() > 6000 or len(dashboard.embeds) >= 9
-                ) and compact_level < 2:
-                    compact_level += 1
-                    dashboard = Dashboard(
-                        data=self.bot.data.formatted_data,
-                        language_code=guild.language,
-                        json_dict=self.bot.json_dict,
-                        compact_level=compact_level,
-                    )
                 try:
                     message = await dashboard_channel.send(
                         embeds=dashboard.embeds,
@@ -370,7 +359,7 @@ class SetupCog(Cog):
                         message_id=message.id,
                     )
                 )
-                guild.update_features()
+                await run_in_db_thread(guild.update_features)
                 self.bot.interface_handler.dashboards.append(message)
                 await inter.edit_original_response(
                     components=SetupContainer(
@@ -433,34 +422,13 @@ class SetupCog(Cog):
                     await inter.edit_original_response(
                         components=[TextDisplay("Generating map, please wait...")]
                     )
-                    self.bot.maps.update_base_map(
-                        planets=self.bot.data.formatted_data.galactic_planets,
-                        assignments=self.bot.data.formatted_data.assignments.get(
-                            "en", []
-                        ),
-                    )
-                    self.bot.maps.localize_map(
-                        language_code_short=guild_language["code"],
+                    latest_map = await self.bot.map_renderer.publish_map(
+                        snapshot=MapSnapshot.from_data(self.bot.data.formatted_data),
+                        language_code=guild_language["code"],
                         language_code_long=guild_language["code_long"],
-                        planets=self.bot.data.formatted_data.galactic_planets,
-                    )
-                    message = await self.bot.channels.waste_bin_channel.send(
-                        file=File(
-                            fp=self.bot.maps.FileLocations.localized_map_path(
-                                guild_language["code"]
-                            )
-                        )
-                    )
-                    self.bot.maps.latest_maps[guild_language["code"]] = Maps.LatestMap(
-                        datetime.now(tz=timezone.utc), message.attachments[0].url
-                    )
-                    self.bot.maps.add_icons(
-                        lang=guild_language["code"],
-                        long_code=guild_language["code_long"],
-                        planets=self.bot.data.formatted_data.galactic_planets,
-                        dss=self.bot.data.formatted_data.dss,
+                        channel=self.bot.channels.waste_bin_channel,
                     )
-                    latest_map = self.bot.maps.latest_maps[guild_language["code"]]
+                    self.bot.maps.latest_maps[guild_language["code"]] = latest_map
                     message = await map_channel.send(
                         embed=Embed(colour=Colour.dark_embed())
                         .set_image(url=latest_map.map_link)
@@ -478,7 +446,7 @@ class SetupCog(Cog):
                         message_id=message.id,
                     )
                 )
-                guild.update_features()
+                await run_in_db_thread(guild.update_features)
                 self.bot.interface_handler.maps.append(message)
                 await inter.edit_original_response(
                     components=SetupContainer(
@@ -528,7 +496,7 @@ class SetupCog(Cog):
                         channel_id=channel.id,
                     )
                 )
-                guild.update_features()
+                await run_in_db_thread(guild.update_features)
                 list_to_update: list = getattr(self.bot.interface_handler, feature_type)
                 list_to_update.append(channel)
                 await inter.edit_original_response(
@@ -549,7 +517,7 @@ class SetupCog(Cog):
                 )
         elif inter.component.custom_id == "language_select":
             guild.language = inter.values[0].lower()
-            guild.save_changes()
+            await run_in_db_thread(guild.save_changes)
             guild_language = self.bot.json_dict["languages"][guild.language]
             await inter.edit_original_response(
                 components=SetupContainer(
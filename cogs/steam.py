@@ -9,7 +9,7 @@ from disnake.ext.commands import Cog, Param, slash_command
 from disnake.ext.tasks import loop
 from utils.bot import GalacticWideWebBot
 from utils.checks import wait_for_startup
-from utils.dbv2 import GWWGuilds
+from utils.dbv2 import GWWGuilds, run_in_db_thread
 from utils.embeds import SteamEmbed
 from utils.interactables import SteamStringSelect
 
@@ -35,11 +35,6 @@ class SteamCog(Cog):
         if not self.bot.ready:
             self.bot.logger.warning("steam_check loop returning - the bot isn't ready")
             return
-        if self.bot.interface_handler.busy:
-            self.bot.logger.warning(
-                "steam_check loop returning - the interface_handler is busy"
-            )
-            return
         if self.bot.data.formatted_data.steam_news == []:
             self.bot.logger.warning(
                 "steam_check loop returning - steam posts are missing"
@@ -60,7 +55,7 @@ class SteamCog(Cog):
                 }
                 await self.bot.interface_handler.send_feature("patch_notes", embeds)
                 self.bot.databases.war_info.patch_notes_id = steam_news.id
-                self.bot.databases.war_info.save_changes()
+                await run_in_db_thread(self.bot.databases.war_info.save_changes)
                 self.bot.logger.info(
                     f"steam_check loop - sent steam announcement {steam_news.id} out to {len(self.bot.interface_handler.patch_notes)} channels in {(datetime.now(tz=timezone.utc) - patch_notes_start).total_seconds():.2f} seconds"
                 )
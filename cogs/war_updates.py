@@ -1,6 +1,5 @@
-from asyncio import to_thread
 from datetime import datetime, timezone
-from disnake import DiscordServerError, File
+from disnake import DiscordServerError
 from disnake.ext.commands import Cog
 from disnake.ext.tasks import loop
 from utils.bot import GalacticWideWebBot
@@ -11,8 +10,8 @@ from utils.containers import (
 )
 from utils.dataclasses import CampaignChangesJson, DSSChangesJson, RegionChangesJson
 from utils.dataclasses.enums import EventType
-from utils.dbv2 import GWWGuilds
-from utils.maps import Maps
+from utils.dbv2 import GWWGuilds, run_in_db_thread
+from utils.map_renderer import MapSnapshot
 
 
 class WarUpdatesCog(Cog):
@@ -41,11 +40,6 @@ class WarUpdatesCog(Cog):
                 "campaign_check loop returning - the bot isn't ready"
             )
             return
-        if self.bot.interface_handler.busy:
-            self.bot.logger.warning(
-                "campaign_check loop returning - the interface_handler is busy"
-            )
-            return
         if not self.bot.data.previous_data:
             self.bot.logger.warning(
                 "campaign_check loop returning - previous data is missing"
@@ -67,10 +61,10 @@ class WarUpdatesCog(Cog):
             for lang in unique_langs
         }
         new_updates = False
-        need_to_update_sectors = False
         if not self.bot.databases.war_campaigns:
             for new_campaign in self.bot.data.formatted_data.campaigns:
-                self.bot.databases.war_campaigns.add(
+                await run_in_db_thread(
+                    self.bot.databases.war_campaigns.add,
                     campaign_id=new_campaign.id,
                     planet_index=new_campaign.planet.index,
                     planet_owner=new_campaign.planet.faction.full_name,
@@ -133,9 +127,8 @@ class WarUpdatesCog(Cog):
                 self.bot.data.tracking_service.liberation_changes.remove_entry(
                     key=planet.index
                 )
-                old_campaign.delete()
+                await run_in_db_thread(old_campaign.delete)
                 self.bot.databases.war_campaigns.remove(old_campaign)
-                need_to_update_sectors = True
             else:
                 if new_campaign := next(
                     (
@@ -158,7 +151,7 @@ class WarUpdatesCog(Cog):
                         old_campaign.event = True
                         old_campaign.event_faction = new_campaign.faction.full_name
                         old_campaign.event_type = new_campaign.planet.event.type.value
-                        old_campaign.save_event_changes()
+                        await run_in_db_thread(old_campaign.save_event_changes)
                         new_updates = True
 
         old_campaign_ids = [
@@ -183,7 +176,8 @@ class WarUpdatesCog(Cog):
                         campaign=new_campaign,
                         gambit_planets=self.bot.data.formatted_data.gambit_planets,
                     )
-                self.bot.databases.war_campaigns.add(
+                await run_in_db_thread(
+                    self.bot.databases.war_campaigns.add,
                     campaign_id=new_campaign.id,
                     planet_index=new_campaign.planet.index,
                     planet_owner=new_campaign.planet.faction.full_name,
@@ -200,7 +194,6 @@ class WarUpdatesCog(Cog):
                     ),
                 )
                 new_updates = True
-                need_to_update_sectors = True
 
         if new_updates:
             await self.bot.interface_handler.send_feature(
@@ -209,48 +202,23 @@ class WarUpdatesCog(Cog):
             self.bot.logger.info(
                 f"campaign_check loop - sent campaign announcement out to {len(self.bot.interface_handler.war_announcements)} channels in {(datetime.now(tz=timezone.utc) - update_start).total_seconds():.2f} seconds"
             )
-            if need_to_update_sectors:
-                await to_thread(
-                    self.bot.maps.update_sectors,
-                    planets=self.bot.data.formatted_data.galactic_planets,
-                )
-                self.bot.maps.update_waypoint_lines(
-                    planets=self.bot.data.formatted_data.galactic_planets
-                )
-            self.bot.maps.update_assignment_tasks(
-                assignments=self.bot.data.formatted_data.assignments.get("en", []),
-                planets=self.bot.data.formatted_data.galactic_planets,
-            )
-            self.bot.maps.update_planets(
-                planets=self.bot.data.formatted_data.galactic_planets
+            results = await self.bot.map_renderer.publish_maps(
+                snapshot=MapSnapshot.from_data(self.bot.data.formatted_data),
+                languages={
+                    lang["code"]: lang["code_long"]
+                    for lang in self.bot.json_dict["languages"].values()
+                },
+                channel=self.bot.channels.waste_bin_channel,
             )
-            for lang in self.bot.json_dict["languages"].values():
-                self.bot.maps.localize_map(
-                    language_code_short=lang["code"],
-                    language_code_long=lang["code_long"],
-                    planets=self.bot.data.formatted_data.galactic_planets,
-                )
-                self.bot.maps.add_icons(
-                    lang=lang["code"],
-                    long_code=lang["code_long"],
-                    planets=self.bot.data.formatted_data.galactic_planets,
-                    dss=self.bot.data.formatted_data.dss,
-                )
-                try:
-                    message = await self.bot.channels.waste_bin_channel.send(
-                        file=File(
-                            fp=self.bot.maps.FileLocations.localized_map_path(
-                                lang["code"]
-                            )
-                        )
-                    )
-                    self.bot.maps.latest_maps[lang["code"]] = Maps.LatestMap(
-                        datetime.now(tz=timezone.utc), message.attachments[0].url
-                    )
-                except DiscordServerError as e:
+            for code, result in results.items():
+                if isinstance(result, DiscordServerError):
                     self.bot.logger.error(
-                        f"campaign_check loop | map update upload error | {e}"
+                        f"campaign_check loop | map update upload error | {result}"
                     )
+                elif isinstance(result, Exception):
+                    raise result
+                else:
+                    self.bot.maps.latest_maps[code] = result
 
     @campaign_check.before_loop
     async def before_campaign_check(self) -> None:
@@ -268,11 +236,6 @@ class WarUpdatesCog(Cog):
         if not self.bot.ready:
             self.bot.logger.warning("dss_check loop returning - the bot isn't ready")
             return
-        if self.bot.interface_handler.busy:
-            self.bot.logger.warning(
-                "dss_check loop returning - the interface_handler is busy"
-            )
-            return
         if not self.bot.data.previous_data:
             self.bot.logger.warning(
                 "dss_check loop returning - previous data is missing"
@@ -310,7 +273,7 @@ class WarUpdatesCog(Cog):
                     ta.id: ta.status
                     for ta in self.bot.data.formatted_data.dss.tactical_actions
                 }
-                self.bot.databases.dss_info.save_changes()
+                await run_in_db_thread(self.bot.databases.dss_info.save_changes)
                 return
             dss_has_moved = False
             if (
@@ -331,7 +294,7 @@ class WarUpdatesCog(Cog):
                 self.bot.databases.dss_info.planet_index = (
                     self.bot.data.formatted_data.dss.planet.index
                 )
-                self.bot.databases.dss_info.save_changes()
+                await run_in_db_thread(self.bot.databases.dss_info.save_changes)
                 dss_updates = True
                 dss_has_moved = True
             for ta in self.bot.data.formatted_data.dss.tactical_actions:
@@ -344,7 +307,7 @@ class WarUpdatesCog(Cog):
                         self.bot.databases.dss_info.tactical_action_statuses[ta.id] = (
                             ta.status
                         )
-                        self.bot.databases.dss_info.save_changes()
+                        await run_in_db_thread(self.bot.databases.dss_info.save_changes)
                     dss_updates = True
 
         if dss_updates:
@@ -355,30 +318,18 @@ class WarUpdatesCog(Cog):
                 f"dss_check loop - sent DSS announcement out to {len(self.bot.interface_handler.dss_announcements)} channels in {(datetime.now(tz=timezone.utc) - update_start).total_seconds():.2f} seconds"
             )
             if dss_has_moved:
-                self.bot.maps.update_planets(
-                    planets=self.bot.data.formatted_data.galactic_planets
+                results = await self.bot.map_renderer.publish_maps(
+                    snapshot=MapSnapshot.from_data(self.bot.data.formatted_data),
+                    languages={
+                        lang: self.bot.json_dict["languages"][lang]["code_long"]
+                        for lang in unique_langs
+                    },
+                    channel=self.bot.channels.waste_bin_channel,
                 )
-                for lang in unique_langs:
-                    lang_json = self.bot.json_dict["languages"][lang]
-                    self.bot.maps.localize_map(
-                        language_code_short=lang,
-                        language_code_long=lang_json["code_long"],
-                        planets=self.bot.data.formatted_data.galactic_planets,
-                    )
-                    self.bot.maps.add_icons(
-                        lang=lang,
-                        long_code=lang_json["code_long"],
-                        planets=self.bot.data.formatted_data.galactic_planets,
-                        dss=self.bot.data.formatted_data.dss,
-                    )
-                    message = await self.bot.channels.waste_bin_channel.send(
-                        file=File(
-                            fp=self.bot.maps.FileLocations.localized_map_path(lang)
-                        )
-                    )
-                    self.bot.maps.latest_maps[lang] = Maps.LatestMap(
-                        datetime.now(tz=timezone.utc), message.attachments[0].url
-                    )
+                for lang, result in results.items():
+                    if isinstance(result, Exception):
+                        raise result
+                    self.bot.maps.latest_maps[lang] = result
 
     @dss_check.before_loop
     async def before_dss_check(self) -> None:
@@ -396,11 +347,6 @@ class WarUpdatesCog(Cog):
         if not self.bot.ready:
             self.bot.logger.warning("region_check loop returning - the bot isn't ready")
             return
-        if self.bot.interface_handler.busy:
-            self.bot.logger.warning(
-                "region_check loop returning - the interface_handler is busy"
-            )
-            return
         if not self.bot.data.previous_data:
             self.bot.logger.warning(
                 "region_check loop returning - previous data is missing"
@@ -417,7 +363,9 @@ class WarUpdatesCog(Cog):
         if not self.bot.databases.planet_regions:
             for region in all_regions:
                 if region.is_available:
-                    self.bot.databases.planet_regions.add(region)
+                    await run_in_db_thread(
+                        self.bot.databases.planet_regions.add, region
+                    )
             return
 
         components = {
@@ -466,7 +414,9 @@ class WarUpdatesCog(Cog):
                     self.bot.data.tracking_service.region_changes.remove_entry(
                         old_region.settings_hash
                     )
-                    self.bot.databases.planet_regions.delete(old_region)
+                    await run_in_db_thread(
+                        self.bot.databases.planet_regions.delete, old_region
+                    )
 
         if all_regions:
             # region updates
@@ -490,7 +440,9 @@ class WarUpdatesCog(Cog):
                         container.add_new_region(
                             region=region,
                         )
-                    self.bot.databases.planet_regions.add(region)
+                    await run_in_db_thread(
+                        self.bot.databases.planet_regions.add, region
+                    )
                     region_updates = True
 
             if region_updates:
@@ -3,7 +3,7 @@ from disnake.ext.commands import Cog, Param, slash_command
 from utils.bot import GalacticWideWebBot
 from utils.checks import wait_for_startup
 from utils.dataclasses.enums import CampaignType, EventType
-from utils.dbv2 import GWWGuild, GWWGuilds
+from utils.dbv2 import GWWGuild, GWWGuilds, run_in_db_thread
 from utils.embeds import WarfrontAllPlanetsEmbed, Dashboard
 
 
@@ -36,12 +36,14 @@ class WarfrontCog(Cog):
     ) -> None:
         await inter.response.defer(ephemeral=public != "Yes")
         if inter.guild:
-            guild = GWWGuilds.get_specific_guild(id=inter.guild.id)
+            guild = await run_in_db_thread(
+                GWWGuilds.get_specific_guild, id=inter.guild.id
+            )
             if not guild:
                 self.bot.logger.error(
                     f"Guild {inter.guild.id} - {inter.guild.name} - had the bot installed but wasn't found in the DB"
                 )
-                guild = GWWGuilds.add(inter.guild.id, "en", [])
+                guild = await run_in_db_thread(GWWGuilds.add, inter.guild.id, "en", [])
         else:
             guild = GWWGuild.default()
         guild_language = self.bot.json_dict["languages"][guild.language]
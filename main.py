@@ -1,6 +1,5 @@
 from utils.bot import GalacticWideWebBot
 
-bot = GalacticWideWebBot()
-
 if __name__ == "__main__":
+    bot = GalacticWideWebBot()
     bot.super_start()
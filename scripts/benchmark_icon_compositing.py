@@ -0,0 +1,87 @@
+"""Times drawing a frame of map icons the old way, one paste per icon, against `Maps.composite_icons`
+
+Run from the repository root with `python -m scripts.benchmark_icon_compositing`"""
+
+from argparse import ArgumentParser
+from cv2 import imread, IMREAD_UNCHANGED, merge, split
+from numpy import uint8
+from numpy.random import default_rng
+from os import listdir
+from time import perf_counter
+import utils.dataclasses  # has to load before utils.maps to avoid a circular import
+from utils.maps import ICON_DIRECTORY, IconAtlas, MapIcon, Maps
+
+
+def paste_image(background, overlay, coords) -> None:
+    """How icons were drawn before the atlas, kept to compare against"""
+    x = max(coords[0] - int(overlay.shape[0] / 2), 57)
+    y = max(coords[1] - int(overlay.shape[1] / 2), 57)
+    b, g, r, a = split(overlay)
+    overlay_rgb = merge((b, g, r))
+    mask = a.astype(float) / 255.0
+    mask = merge((mask, mask, mask))
+    h, w = overlay.shape[:2]
+    roi = background[y : y + h, x : x + w, :3].astype(float)
+    blended = (overlay_rgb.astype(float) * mask + roi * (1 - mask)).astype(uint8)
+    background[y : y + h, x : x + w, :3] = blended
+
+
+def benchmark_icon_compositing(
+    icon_directory: str = ICON_DIRECTORY,
+    placement_count: int = 400,
+    repeats: int = 10,
+) -> dict[str, float]:
+    """Seconds per frame for the old per-icon paste and `Maps.composite_icons`"""
+    images = {
+        file_name[:-4]: imread(icon_directory + file_name, IMREAD_UNCHANGED)
+        for file_name in sorted(listdir(icon_directory))
+        if file_name.endswith(".png")
+    }
+    images = {name: image for name, image in images.items() if image.shape[2] == 4}
+    atlas = IconAtlas(
+        {name: MapIcon.from_image(image) for name, image in images.items()}
+    )
+    maps = Maps()
+    background = maps.empty_map.copy()
+    names = sorted(images)
+    rng = default_rng(0)
+    frame = [
+        (names[rng.integers(len(names))], (int(x), int(y)))
+        for x, y in rng.integers(
+            100, min(background.shape[:2]) - 100, size=(placement_count, 2)
+        )
+    ]
+
+    start = perf_counter()
+    for _ in range(repeats):
+        for name, coords in frame:
+            paste_image(background, images[name], coords)
+    per_icon = (perf_counter() - start) / repeats
+
+    start = perf_counter()
+    for _ in range(repeats):
+        maps.composite_icons(
+            background=background,
+            placements=[maps.place_icon(atlas[name], coords) for name, coords in frame],
+        )
+    composited = (perf_counter() - start) / repeats
+    return {
+        "per_icon": per_icon,
+        "composited": composited,
+        "speedup": per_icon / composited,
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--icons", type=int, default=400, help="icons per frame")
+    parser.add_argument("--repeats", type=int, default=10, help="frames timed")
+    args = parser.parse_args()
+    results = benchmark_icon_compositing(
+        placement_count=args.icons, repeats=args.repeats
+    )
+    print(
+        f"per icon: {results['per_icon'] * 1000:.1f}ms | "
+        f"composited: {results['composited'] * 1000:.1f}ms | "
+        f"speedup: {results['speedup']:.1f}x"
+    )
@@ -1,3 +1,4 @@
+from .http_pool import HTTPPool
 from .base_client import BaseAPIClient
 from .authed_client import (
     AuthedClient,
@@ -18,6 +19,7 @@ __all__ = [
     "ArsenalClient",
     "AuthedClient",
     "HelldiversClient",
+    "HTTPPool",
     "ItemsClient",
     "SteamNewsClient",
     "SteamPlayerCountClient",
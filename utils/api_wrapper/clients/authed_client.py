@@ -1,12 +1,14 @@
 from utils.api_wrapper.clients import BaseAPIClient
+from utils.api_wrapper.clients.http_pool import HTTPPool
 from utils.dataclasses import Config
 
 
 class AuthedClient(BaseAPIClient):
-    def __init__(self, logger):
+    def __init__(self, logger, http_pool: HTTPPool | None = None):
         super().__init__(
             base_url=Config.AUTHED_API_URL,
             logger=logger,
+            http_pool=http_pool,
             headers=Config.AUTHED_API_HEADERS,
         )
 
@@ -18,10 +20,11 @@ class AuthedClient(BaseAPIClient):
 
 
 class AltDSSVotesAuthedClient(BaseAPIClient):
-    def __init__(self, logger):
+    def __init__(self, logger, http_pool: HTTPPool | None = None):
         super().__init__(
             base_url=Config.ALT_AUTHED_API_DSS_ENDPOINT,
             logger=logger,
+            http_pool=http_pool,
             headers=Config.ALT_AUTHED_API_HEADERS,
         )
 
@@ -30,10 +33,11 @@ class AltDSSVotesAuthedClient(BaseAPIClient):
 
 
 class AltPOAuthedClient(BaseAPIClient):
-    def __init__(self, logger):
+    def __init__(self, logger, http_pool: HTTPPool | None = None):
         super().__init__(
             base_url=Config.ALT_PO_ENDPOINT,
             logger=logger,
+            http_pool=http_pool,
             headers=Config.ALT_AUTHED_API_HEADERS,
         )
 
@@ -42,10 +46,11 @@ class AltPOAuthedClient(BaseAPIClient):
 
 
 class AltSuperstoreAuthedClient(BaseAPIClient):
-    def __init__(self, logger):
+    def __init__(self, logger, http_pool: HTTPPool | None = None):
         super().__init__(
             base_url=Config.ALT_SUPERSTORE_ENDPOINT,
             logger=logger,
+            http_pool=http_pool,
             headers=Config.ALT_AUTHED_API_HEADERS,
         )
 
@@ -1,25 +1,45 @@
 from abc import ABC
 from aiohttp import ClientSession, ClientTimeout, ClientSSLError
-from asyncio import sleep
+from asyncio import CancelledError, sleep
+from collections import OrderedDict
+from json import loads
+from time import perf_counter
 from typing import Optional
+from utils.api_wrapper.clients.http_pool import HTTPPool
+from utils.api_wrapper.clients.resilience import (
+    CIRCUIT_BREAKERS,
+    CircuitOpenError,
+    RetryPolicy,
+)
 from utils.logger import GWWLogger
 
+# Most responses kept around for conditional requests
+ETAG_CACHE_SIZE = 128
+
 
 class BaseAPIClient(ABC):
+    # clients are created for each pull so the cache lives on the class
+    _etag_cache: OrderedDict[tuple, tuple[str, bytes]] = OrderedDict()
+    retry_policy = RetryPolicy()
+
     def __init__(
         self,
         base_url: str,
         logger: GWWLogger,
         timeout: int = 5,
         headers: Optional[dict] = None,
+        http_pool: Optional[HTTPPool] = None,
     ):
         self.base_url = base_url.rstrip("/")
         self.logger = logger
         self.timeout = ClientTimeout(total=timeout)
         self.default_headers = headers or {}
+        self.http_pool = http_pool
         self._session: Optional[ClientSession] = None
 
     async def _get_session(self) -> ClientSession:
+        if self.http_pool:
+            return self.http_pool.get_session()
         if self._session is None or self._session.closed:
             self._session = ClientSession(
                 headers=self.default_headers, timeout=self.timeout
@@ -27,6 +47,7 @@ class BaseAPIClient(ABC):
         return self._session
 
     async def close(self):
+        """Closes this client's own session, a shared pool is left open"""
         if self._session and not self._session.closed:
             await self._session.close()
             self._session = None
@@ -36,40 +57,99 @@ class BaseAPIClient(ABC):
         endpoint: str = "",
         params: Optional[dict] = None,
         headers: Optional[dict] = None,
-        retries: int = 2,
+        retries: Optional[int] = None,
+        conditional: bool = True,
     ) -> Optional[dict | list]:
+        """GET `endpoint`, retrying 429s, 5xx and connection errors with backoff
+
+        Responses are cached by ETag for conditional requests unless `conditional` is `False`,
+        for URLs that change every pull and would only push others out of the cache.
+        Raises `CircuitOpenError` without sending while the circuit is open"""
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        endpoint_name = f"{self.__class__.__name__} {endpoint.split('?')[0] or '/'}"
+        request_headers = {**self.default_headers, **(headers or {})}
+        # each language is its own request every pull, so one pull can only fail a breaker once
+        breaker_name = endpoint_name
+        if language := request_headers.get("Accept-Language"):
+            breaker_name += f" [{language}]"
+        breaker = CIRCUIT_BREAKERS.get_breaker(breaker_name)
+        if not breaker.allow_request():
+            raise CircuitOpenError(breaker_name)
         session = await self._get_session()
+        retries = retries or self.retry_policy.attempts
 
-        request_headers = {**self.default_headers, **(headers or {})}
+        cache_key = (
+            url,
+            tuple(sorted((params or {}).items())),
+            language,
+        )
+        cached = self._etag_cache.get(cache_key) if conditional else None
+        if cached:
+            request_headers["If-None-Match"] = cached[0]
 
-        for attempt in range(retries):
-            try:
-                async with session.get(
-                    url=url, params=params, headers=request_headers
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data
-                    else:
+        try:
+            for attempt in range(retries):
+                retry_after = None
+                try:
+                    request_start = perf_counter()
+                    async with session.get(
+                        url=url,
+                        params=params,
+                        headers=request_headers,
+                        timeout=self.timeout,
+                    ) as response:
+                        if self.http_pool:
+                            self.http_pool.record_latency(
+                                endpoint_name, perf_counter() - request_start
+                            )
+                        if response.status == 200:
+                            data = await response.json()
+                            if conditional and (etag := response.headers.get("ETag")):
+                                self._remember(cache_key, etag, await response.read())
+                            breaker.record_success()
+                            return data
+                        elif response.status == 304 and cached:
+                            self._etag_cache.move_to_end(cache_key)
+                            breaker.record_success()
+                            return loads(cached[1])
                         self.logger.warning(
                             f"[{self.__class__.__name__}] GET {endpoint} failed - "
                             f"Status: {response.status}, Attempt {attempt + 1}/{retries}"
                         )
-            except ClientSSLError as e:
-                self.logger.error(
-                    f"[{self.__class__.__name__}] SSL Error for {endpoint}: {e}"
-                )
-                raise
-            except Exception as e:
-                self.logger.error(
-                    f"[{self.__class__.__name__}] Error fetching {endpoint}: {type(e)} {e}"
-                )
+                        if not self.retry_policy.is_retryable(response.status):
+                            # the request is wrong rather than the upstream struggling
+                            breaker.record_success()
+                            return None
+                        retry_after = self.retry_policy.parse_retry_after(
+                            response.headers.get("Retry-After")
+                        )
+                except ClientSSLError as e:
+                    self.logger.error(
+                        f"[{self.__class__.__name__}] SSL Error for {endpoint}: {e}"
+                    )
+                    breaker.record_failure()
+                    raise
+                except Exception as e:
+                    self.logger.error(
+                        f"[{self.__class__.__name__}] Error fetching {endpoint}: {type(e)} {e}"
+                    )
 
                 if attempt < retries - 1:
-                    await sleep(1 * (attempt + 1))
-                else:
-                    return None
+                    delay = self.retry_policy.delay(attempt, retry_after)
+                    if delay is None:
+                        break
+                    await sleep(delay)
+        except CancelledError:
+            breaker.record_failure()
+            raise
+        breaker.record_failure()
+        return None
+
+    def _remember(self, cache_key: tuple, etag: str, body: bytes) -> None:
+        self._etag_cache[cache_key] = (etag, body)
+        self._etag_cache.move_to_end(cache_key)
+        while len(self._etag_cache) > ETAG_CACHE_SIZE:
+            self._etag_cache.popitem(last=False)
 
     async def __aenter__(self):
         await self._get_session()
@@ -1,10 +1,13 @@
 from utils.api_wrapper.clients import BaseAPIClient
+from utils.api_wrapper.clients.http_pool import HTTPPool
 from utils.dataclasses import Config
 
 
 class ArsenalClient(BaseAPIClient):
-    def __init__(self, logger):
-        super().__init__(base_url=Config.ARSENAL_API_URL, logger=logger)
+    def __init__(self, logger, http_pool: HTTPPool | None = None):
+        super().__init__(
+            base_url=Config.ARSENAL_API_URL, logger=logger, http_pool=http_pool
+        )
 
     async def get_community_target(self) -> list[dict]:
         return await self.get()
@@ -1,11 +1,13 @@
 from utils.api_wrapper.clients import BaseAPIClient
+from utils.api_wrapper.clients.http_pool import HTTPPool
 
 
 class HelldiversClient(BaseAPIClient):
-    def __init__(self, logger, base_url: str):
+    def __init__(self, logger, base_url: str, http_pool: HTTPPool | None = None):
         super().__init__(
             base_url=base_url,
             logger=logger,
+            http_pool=http_pool,
             headers={
                 "Accept-Language": "en-GB",
                 "X-Super-Client": "Galactic Wide Web",
@@ -19,6 +21,8 @@ class HelldiversClient(BaseAPIClient):
         return await self.get(
             endpoint=f"NewsFeed/{war_id}?maxEntries=1024&?fromTimestamp={time_for_dispatches}",
             headers={"Accept-Language": lang},
+            # fromTimestamp moves every pull so the URL never repeats
+            conditional=False,
         )
 
     async def get_war_status(self, war_id: int, lang: str = "en-GB") -> dict:
@@ -0,0 +1,117 @@
+from aiohttp import ClientSession, TCPConnector, TraceConfig
+from bisect import bisect_left
+from typing import Optional
+from utils.mixins import ReprMixin
+
+# Most connections kept open in total and to any single host
+HTTP_CONNECTION_LIMIT = 64
+HTTP_CONNECTIONS_PER_HOST = 16
+
+# How long an idle connection is kept open for reuse (in seconds)
+HTTP_KEEPALIVE_TIMEOUT = 90
+
+# How long resolved hostnames are cached (in seconds)
+DNS_CACHE_TTL = 600
+
+# Upper bounds of the request latency histogram buckets (in seconds)
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class LatencyHistogram(ReprMixin):
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        """Counts request latencies into fixed buckets, the last bucket catches anything slower"""
+        self.buckets = buckets
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Upper bound of the bucket the percentile falls in"""
+        target = self.count * percent / 100
+        running = 0
+        for upper_bound, bucket_count in zip(self.buckets, self.counts):
+            running += bucket_count
+            if running >= target:
+                return upper_bound
+        return self.max
+
+    def __str__(self) -> str:
+        return (
+            f"{self.count} requests | mean: {self.mean * 1000:.0f}ms"
+            f" | p95 <= {self.percentile(95)}s | max: {self.max:.2f}s"
+        )
+
+
+class HTTPPool(ReprMixin):
+    def __init__(
+        self,
+        limit: int = HTTP_CONNECTION_LIMIT,
+        limit_per_host: int = HTTP_CONNECTIONS_PER_HOST,
+        keepalive_timeout: float = HTTP_KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: int = DNS_CACHE_TTL,
+    ):
+        """A long-lived ClientSession shared by the API clients
+
+        Keeps connections, DNS lookups and TLS sessions between pulls"""
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._session: Optional[ClientSession] = None
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.latencies: dict[str, LatencyHistogram] = {}
+
+    def get_session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            trace_config = TraceConfig()
+            trace_config.on_connection_create_end.append(self._on_connection_created)
+            trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+            self._session = ClientSession(
+                connector=TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                ),
+                trace_configs=[trace_config],
+            )
+        return self._session
+
+    async def _on_connection_created(self, session, context, params) -> None:
+        self.connections_created += 1
+
+    async def _on_connection_reused(self, session, context, params) -> None:
+        self.connections_reused += 1
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Share of requests that went out on an already open connection"""
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused / total if total else 0.0
+
+    def record_latency(self, endpoint: str, seconds: float) -> None:
+        self.latencies.setdefault(endpoint, LatencyHistogram()).record(seconds)
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": self.reuse_ratio,
+        }
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
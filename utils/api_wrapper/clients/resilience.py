@@ -0,0 +1,135 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from random import uniform
+from time import monotonic
+from utils.mixins import ReprMixin
+
+# Attempts per request and the backoff between them (in seconds)
+RETRY_ATTEMPTS = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8
+
+# Consecutive failed requests, one per pull, before an endpoint's circuit opens for a language
+FAILURE_THRESHOLD = 3
+
+# How long an open circuit waits before letting a probe request through (in seconds)
+RESET_TIMEOUT = 120
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str):
+        """Raised instead of sending a request while the endpoint's circuit is open"""
+        super().__init__(f"circuit for {name} is open")
+        self.name = name
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half open"
+
+
+class RetryPolicy(ReprMixin):
+    def __init__(
+        self,
+        attempts: int = RETRY_ATTEMPTS,
+        base_delay: float = BACKOFF_BASE,
+        max_delay: float = BACKOFF_MAX,
+    ):
+        """Exponential backoff with full jitter, honouring `Retry-After` up to `max_delay`"""
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def is_retryable(status: int) -> bool:
+        return status == 429 or status >= 500
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float | None:
+        """Seconds to wait before the next attempt, `None` if it isn't worth waiting"""
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        return uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    @staticmethod
+    def parse_retry_after(value: str | None) -> float | None:
+        """`Retry-After` can be a number of seconds or an HTTP date"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(
+                0.0,
+                (
+                    parsedate_to_datetime(value) - datetime.now(tz=timezone.utc)
+                ).total_seconds(),
+            )
+        except (TypeError, ValueError):
+            return None
+
+
+class CircuitBreaker(ReprMixin):
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+    ):
+        """Stops requests to an endpoint after repeated failures, then lets a single probe through"""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: datetime | None = None
+        self._opened_monotonic: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._opened_monotonic is None:
+            return CircuitState.CLOSED
+        if monotonic() - self._opened_monotonic >= self.reset_timeout:
+            return CircuitState.HALF_OPEN
+        return CircuitState.OPEN
+
+    def allow_request(self) -> bool:
+        match self.state:
+            case CircuitState.CLOSED:
+                return True
+            case CircuitState.HALF_OPEN if not self._probing:
+                self._probing = True
+                return True
+            case _:
+                return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._opened_monotonic = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            if self._opened_monotonic is None:
+                self.opened_at = datetime.now(tz=timezone.utc)
+            self._opened_monotonic = monotonic()
+        self._probing = False
+
+
+class CircuitBreakerRegistry(dict[str, CircuitBreaker]):
+    def get_breaker(self, name: str) -> CircuitBreaker:
+        if name not in self:
+            self[name] = CircuitBreaker(name=name)
+        return self[name]
+
+    @property
+    def open_breakers(self) -> list[CircuitBreaker]:
+        return [b for b in self.values() if b.state != CircuitState.CLOSED]
+
+
+CIRCUIT_BREAKERS = CircuitBreakerRegistry()
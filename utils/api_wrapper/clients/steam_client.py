@@ -1,11 +1,13 @@
 from utils.api_wrapper.clients import BaseAPIClient
+from utils.api_wrapper.clients.http_pool import HTTPPool
 
 
 class SteamPlayerCountClient(BaseAPIClient):
-    def __init__(self, logger, base_url: str):
+    def __init__(self, logger, base_url: str, http_pool: HTTPPool | None = None):
         super().__init__(
             base_url=base_url,
             logger=logger,
+            http_pool=http_pool,
         )
 
     async def get_steam_count(self) -> dict:
@@ -15,10 +17,11 @@ class SteamPlayerCountClient(BaseAPIClient):
 
 
 class SteamNewsClient(BaseAPIClient):
-    def __init__(self, logger, base_url: str):
+    def __init__(self, logger, base_url: str, http_pool: HTTPPool | None = None):
         super().__init__(
             base_url=base_url,
             logger=logger,
+            http_pool=http_pool,
         )
 
     async def get_steam_news(self) -> dict:
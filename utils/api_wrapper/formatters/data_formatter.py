@@ -1,6 +1,6 @@
-from copy import deepcopy
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+from itertools import count
 from utils.api_wrapper.models import (
     Assignment,
     Campaign,
@@ -21,6 +21,9 @@ from utils.dataclasses import Factions, Languages
 from utils.dataclasses.communities import arsenal
 from utils.dataclasses.enums import AssignmentTaskType, EventType, SpaceStationType
 
+# Each build takes the next version, per-build caches are keyed on it
+FORMATTED_DATA_VERSIONS = count(1)
+
 CORRECT_SECTORS = {
     "SOL": [0],
     "ALTUS": [1, 4, 2, 5, 3],
@@ -80,6 +83,13 @@ CORRECT_SECTORS = {
     "THE VOID": [278, 281, 280, 279, 277, 276, 275],
 }
 
+# The sector each planet belongs to, the first listed sector wins
+PLANET_SECTORS: dict[int, str] = {
+    planet_index: sector
+    for sector, planet_indices in reversed(CORRECT_SECTORS.items())
+    for planet_index in planet_indices
+}
+
 
 @dataclass
 class FormattedDataContext:
@@ -103,18 +113,36 @@ class FormattedDataContext:
 
     json_dict: dict
 
+    # payload hashes by endpoint name, used to reuse models from the previous build
+    payload_hashes: dict[str, str] = field(default_factory=dict)
+    previous: "FormattedData | None" = None
+
+    def reusable_from(self, *endpoints: str) -> "FormattedData | None":
+        """The previous build if it was made from the same payloads for all `endpoints`"""
+        if self.previous and all(
+            endpoint in self.payload_hashes
+            and self.previous.payload_hashes.get(endpoint)
+            == self.payload_hashes[endpoint]
+            for endpoint in endpoints
+        ):
+            return self.previous
+
 
 class FormattedData:
     def __init__(
         self,
         context: FormattedDataContext,
     ):
-        """Formats the data provided and sets the properties of `this_object`"""
+        """Formats the data provided and sets the properties of `this_object`
+
+        Read-only once built, `DataService` keeps the last build as `previous_data`"""
+        self.version: int = next(FORMATTED_DATA_VERSIONS)
         self.total_players: int = 0
         self.steam_player_count: int = 0
         self.galactic_impact_mod: float = 0.0
         self.war_start_timestamp: int = 0
         self.planets: dict[int, Planet] = {}
+        self.regions_by_hash: dict[int, Planet.Region] = {}
         self.gambit_planets: dict[int, Planet] = {}
         self.war_effects: dict[int, GalacticWarEffect] = {}
         self.global_events: dict[str, list[GlobalEvent]] = {}
@@ -130,11 +158,15 @@ class FormattedData:
         self.items_data: list[dict] = []
         self.organised_items: list[EndpointItem] = []
         self.personal_order: PersonalOrder = None
+        self.payload_hashes: dict[str, str] = context.payload_hashes.copy()
 
         if context.items_data != []:
             self.items_data = context.items_data
-            for i in self.items_data:
-                self.organised_items.append(EndpointItem(i))
+            if previous := context.reusable_from("items"):
+                self.organised_items = previous.organised_items
+            else:
+                for i in self.items_data:
+                    self.organised_items.append(EndpointItem(i))
 
         if context.steam_player_count:
             self.steam_player_count: int = context.steam_player_count
@@ -156,10 +188,7 @@ class FormattedData:
                 )
                 self.planets[planet.index] = planet
                 if planet.index not in CORRECT_SECTORS.get(planet.sector, []):
-                    planet.sector = next(
-                        (s for s, pl in CORRECT_SECTORS.items() if planet.index in pl),
-                        "UNKNOWN",
-                    )
+                    planet.sector = PLANET_SECTORS.get(planet.index, "UNKNOWN")
 
             for homeworld in context.war_info["homeWorlds"]:
                 for planet_index in homeworld["planetIndices"]:
@@ -169,7 +198,9 @@ class FormattedData:
                             number=homeworld["race"]
                         )
 
-        if context.war_effects:
+        if (previous := context.reusable_from("war_effects")) and previous.war_effects:
+            self.war_effects = previous.war_effects
+        elif context.war_effects:
             for war_effect in context.war_effects:
                 self.war_effects[war_effect["id"]] = GalacticWarEffect(
                     gwa=war_effect, json_dict=context.json_dict
@@ -293,18 +324,19 @@ class FormattedData:
                 )
 
         if context.news_feed.get("en"):
+            english_dispatches = {d["id"]: d for d in context.news_feed["en"]}
             for lang, dispatches in context.news_feed.items():
+                if (
+                    previous := context.reusable_from(
+                        "war_info", "news_feed:en", f"news_feed:{lang}"
+                    )
+                ) and lang in previous.dispatches:
+                    self.dispatches[lang] = previous.dispatches[lang]
+                    continue
                 for dispatch in dispatches:
                     if dispatch["message"].count("_") > dispatch["message"].count(" "):
                         if (
-                            english_dispatch := next(
-                                (
-                                    d
-                                    for d in context.news_feed.get("en", [])
-                                    if d["id"] == dispatch["id"]
-                                ),
-                                None,
-                            )
+                            english_dispatch := english_dispatches.get(dispatch["id"])
                         ) is not None:
                             dispatch["message"] = english_dispatch["message"]
                 self.dispatches[lang] = [
@@ -315,7 +347,9 @@ class FormattedData:
                     for dispatch_data in sorted(dispatches, key=lambda x: x["id"])
                 ]
 
-        if context.steam_news:
+        if (previous := context.reusable_from("steam_news")) and previous.steam_news:
+            self.steam_news = previous.steam_news
+        elif context.steam_news:
             self.steam_news = [
                 SteamNews(raw_steam_data=steam_news)
                 for steam_news in context.steam_news
@@ -334,16 +368,11 @@ class FormattedData:
                     key=lambda x: x.ends_at_datetime,
                     reverse=True,
                 )
-                for assignment in self.assignments.get(lang, []):
+            english_assignments = {a.id: a for a in self.assignments["en"]}
+            for assignments in self.assignments.values():
+                for assignment in assignments:
                     if assignment.briefing and assignment.briefing.count("_") > 5:
-                        english_assignment = next(
-                            (
-                                a
-                                for a in self.assignments.get("en", [])
-                                if a.id == assignment.id
-                            ),
-                            None,
-                        )
+                        english_assignment = english_assignments.get(assignment.id)
                         if english_assignment:
                             if (
                                 english_assignment.briefing
@@ -570,17 +599,12 @@ class FormattedData:
                 )
 
         if self.planets:
-            for region in (
-                r for p in self.planets.values() for r in p.regions.values()
-            ):
+            all_regions = [r for p in self.planets.values() for r in p.regions.values()]
+            for region in all_regions:
+                self.regions_by_hash.setdefault(region.settings_hash, region)
+            for region in all_regions:
                 for index in region._connection_indices:
-                    if connected_region_list := [
-                        r
-                        for p in self.planets.values()
-                        for r in p.regions.values()
-                        if r.settings_hash == index
-                    ]:
-                        connected_region = connected_region_list[0]
+                    if connected_region := self.regions_by_hash.get(index):
                         region.connections.append(connected_region)
 
             for p in self.planets.values():
@@ -605,16 +629,27 @@ class FormattedData:
                         planet.community_targets.append(arsenal)
 
         if context.control_centre.get("en"):
-            self.control_centre = {
-                lang: ControlCentre(
-                    context.control_centre.get(lang),
-                    context.json_dict,
-                    self.war_start_timestamp,
-                )
-                for lang in context.control_centre
-            }
+            for lang in context.control_centre:
+                if (
+                    previous := context.reusable_from(
+                        "war_info", "control_centre:en", f"control_centre:{lang}"
+                    )
+                ) and lang in previous.control_centre:
+                    self.control_centre[lang] = previous.control_centre[lang]
+                else:
+                    self.control_centre[lang] = ControlCentre(
+                        context.control_centre.get(lang),
+                        context.json_dict,
+                        self.war_start_timestamp,
+                    )
 
-        if context.superstore != []:
+        if (
+            previous := context.reusable_from(
+                "items", "superstore", "superstore:rotation"
+            )
+        ) and previous.superstore:
+            self.superstore = previous.superstore
+        elif context.superstore != []:
             self.superstore = Superstore(
                 context.superstore,
                 context.json_dict["items"]["items"],
@@ -623,10 +658,6 @@ class FormattedData:
 
         self.formatted_at = datetime.now(tz=timezone.utc)
 
-    def copy(self):
-        """Returns a deep copy of the data"""
-        return deepcopy(self)
-
     @property
     def dss(self) -> DSS | None:
         """Returns the DSS data"""
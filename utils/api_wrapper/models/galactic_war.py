@@ -1,7 +1,7 @@
 from data.lists import STRATAGEM_ID_DICT, STRATAGEM_CAT_DICT
 from datetime import datetime, timezone
 from disnake import Colour
-from utils.api_wrapper.services.tracking_service import TrackerEntry
+from utils.trackers import BaseTrackerEntry
 from utils.dataclasses import Faction, Factions
 from utils.functions import arrowhead_format
 from utils.functions.health_bar import health_bar
@@ -26,7 +26,7 @@ class GlobalResource(ReprMixin):
         self.current_value: int = raw_global_resource_data["currentValue"]
         self.max_value: int = raw_global_resource_data["maxValue"]
         self.perc: float = self.current_value / self.max_value
-        self.tracker: TrackerEntry | None = None
+        self.tracker: BaseTrackerEntry | None = None
         self.name: str = ""
         self.description: str = ""
         self.embed_colour: Colour = Colour.dark_embed()
@@ -1,4 +1,6 @@
+from asyncio import create_task, gather
 from datetime import datetime, timedelta, timezone
+from typing import Any
 from utils.api_wrapper.clients import (
     AltDSSVotesAuthedClient,
     AltPOAuthedClient,
@@ -6,16 +8,20 @@ from utils.api_wrapper.clients import (
     ArsenalClient,
     AuthedClient,
     HelldiversClient,
+    HTTPPool,
     ItemsClient,
     SteamNewsClient,
     SteamPlayerCountClient,
 )
 from utils.api_wrapper.formatters import FormattedData, FormattedDataContext
 from utils.api_wrapper.services import TrackingService
+from utils.api_wrapper.services.fetch_plan import FetchPlan
 from utils.api_wrapper.utils.constants import EndpointBase
 from utils.dataclasses import Languages
+from utils.dataclasses.languages import Language
 from utils.dataclasses.enums import AssignmentTaskType
 from utils.dbv2 import GWWGuilds
+from utils.functions import END_TIMES
 from utils.logger import GWWLogger
 from utils.mixins import ReprMixin
 
@@ -26,9 +32,13 @@ class DataService(ReprMixin):
         self.logger = logger
         self.loaded = False
         self.fetching = False
+        self.last_fetch_plan: FetchPlan | None = None
+        self._payload_hashes: dict[str, str] = {}
+        self._last_good_payloads: dict[str, tuple[str, Any]] = {}
         self.previous_data = None
         self.formatted_data: FormattedData = None
         self.tracking_service = TrackingService()
+        self.http_pool = HTTPPool()
 
         self.war_id = 801
         self.steam_player_count = 0
@@ -67,12 +77,45 @@ class DataService(ReprMixin):
         self.pull_start_time = datetime.now(tz=timezone.utc)
         self.clear()
         self.fetching = True
+        plan = FetchPlan(
+            logger=self.logger,
+            previous_hashes=self._payload_hashes,
+            last_good=self._last_good_payloads,
+        )
+
+        await gather(
+            self._fetch_helldivers(plan=plan),
+            self._fetch_steam(plan=plan),
+            self._fetch_personal_order(plan=plan),
+            self._fetch_arsenal(plan=plan),
+            *(
+                (self._fetch_items_and_superstore(plan=plan),)
+                if self.pull_start_time.minute == 0 or not self.loaded
+                else ()
+            ),
+        )
+        self._sync_episode_translations()
+
+        plan.finish()
+        # failed endpoints lose their hash so their next payload counts as changed,
+        # endpoints that weren't requested this pull (like items) keep theirs
+        self._payload_hashes = {
+            **{k: v for k, v in self._payload_hashes.items() if k not in plan.report},
+            **plan.hashes,
+        }
+        self.last_fetch_plan = plan
+        self.logger.info(
+            f"pull_from_api - {plan.summary()} | connection reuse: {self.http_pool.reuse_ratio:.0%}"
+        )
+        self.fetching = False
 
+    async def _fetch_helldivers(self, plan: FetchPlan) -> None:
         async with HelldiversClient(
             logger=self.logger,
             base_url=EndpointBase.HELLDIVERS.value,
+            http_pool=self.http_pool,
         ) as client:
-            war_id = await client.get_war_id()
+            war_id = await plan.fetch("war_id", client.get_war_id())
             if war_id:
                 self.war_id = war_id["id"]
 
@@ -80,200 +123,185 @@ class DataService(ReprMixin):
             in_use_languages = [
                 l for l in Languages.api_languages if l.short_code in unique_languages
             ]
-            for lang in in_use_languages:
-                raw_war_status = await client.get_war_status(
-                    war_id=self.war_id,
-                    lang=lang.long_code,
+            war_status_tasks = {
+                lang.short_code: create_task(
+                    plan.fetch(
+                        f"war_status:{lang.short_code}",
+                        client.get_war_status(war_id=self.war_id, lang=lang.long_code),
+                        after="war_id",
+                    )
                 )
-                if raw_war_status:
-                    self._raw_war_status[lang.short_code] = raw_war_status
+                for lang in in_use_languages
+            }
+            independent_requests = gather(
+                *(
+                    self._fetch_language(plan=plan, client=client, lang=lang)
+                    for lang in in_use_languages
+                ),
+                plan.fetch(
+                    "war_stats",
+                    client.get_war_stats(war_id=self.war_id),
+                    after="war_id",
+                ),
+                plan.fetch(
+                    "war_info", client.get_war_info(war_id=self.war_id), after="war_id"
+                ),
+                plan.fetch("war_effects", client.get_war_effects()),
+            )
 
-                time_for_dispatches = int(
-                    (
-                        self._raw_war_status.get("en", {}).get(
-                            "time",
-                            (
-                                self.pull_start_time
-                                - datetime(
-                                    year=2024,
-                                    month=2,
-                                    day=14,
-                                    hour=15,
-                                    minute=11,
-                                    tzinfo=timezone.utc,
-                                )
-                            ).total_seconds(),
-                        )
+            # news feeds and space stations only rely on the english war status,
+            # the other languages finish alongside them
+            if (english_war_status := war_status_tasks.get("en")) is not None:
+                if raw_war_status := await english_war_status:
+                    self._raw_war_status["en"] = raw_war_status
+            time_for_dispatches = int(
+                (
+                    self._raw_war_status.get("en", {}).get(
+                        "time",
+                        (
+                            self.pull_start_time
+                            - datetime(
+                                year=2024,
+                                month=2,
+                                day=14,
+                                hour=15,
+                                minute=11,
+                                tzinfo=timezone.utc,
+                            )
+                        ).total_seconds(),
                     )
-                    - timedelta(weeks=1).total_seconds()
-                )
-                news_feed = await client.get_news_feed(
-                    war_id=self.war_id,
-                    time_for_dispatches=time_for_dispatches,
-                    lang=lang.long_code,
                 )
+                - timedelta(weeks=1).total_seconds()
+            )
+            *news_feeds, _ = await gather(
+                *(
+                    plan.fetch(
+                        f"news_feed:{lang.short_code}",
+                        client.get_news_feed(
+                            war_id=self.war_id,
+                            time_for_dispatches=time_for_dispatches,
+                            lang=lang.long_code,
+                        ),
+                        after=(
+                            "war_status:en"
+                            if english_war_status is not None
+                            else "war_id"
+                        ),
+                    )
+                    for lang in in_use_languages
+                ),
+                self._fetch_space_stations(plan=plan, client=client),
+            )
+            for lang_code, task in war_status_tasks.items():
+                raw_war_status = await task
+                if raw_war_status:
+                    self._raw_war_status[lang_code] = raw_war_status
+            for lang, news_feed in zip(in_use_languages, news_feeds):
                 if news_feed:
                     self._raw_news_feed[lang.short_code] = news_feed[-25:]
 
-                assignments = await client.get_assignments(
-                    war_id=self.war_id, lang=lang.long_code
-                )
-                if assignments != None:
-                    self._raw_assignments[lang.short_code] = assignments
-
-                control_centre = await client.get_control_centre(
-                    war_id=self.war_id, lang=lang.long_code
-                )
-                if control_centre:
-                    self._raw_control_centre[lang.short_code] = control_centre
-
-            if english_cc := self._raw_control_centre.get("en"):
-                for language, cc in self._raw_control_centre.items():
-                    if language == "en":
-                        continue
-                    for ep in cc.get("episodes", []):
-                        if english_ep := next(
-                            (eng_ep for eng_ep in english_cc.get("episodes", [])),
-                            None,
-                        ):
-                            if ep["title"] != english_ep["title"]:
-                                if (
-                                    ep["id32"]
-                                    not in self._episode_phase_translations[language][
-                                        "episodes"
-                                    ]
-                                ):
-                                    self._episode_phase_translations[language][
-                                        "episodes"
-                                    ][ep["id32"]] = {
-                                        "title": ep["title"],
-                                        "description": ep["description"],
-                                    }
-
-                            else:
-                                if (
-                                    ep["id32"]
-                                    in self._episode_phase_translations[language][
-                                        "episodes"
-                                    ]
-                                ):
-                                    ep["title"] = self._episode_phase_translations[
-                                        language
-                                    ]["episodes"][ep["id32"]]["title"]
-                                    ep["description"] = (
-                                        self._episode_phase_translations[language][
-                                            "episodes"
-                                        ][ep["id32"]]["description"]
-                                    )
-
-                            for phase in ep["phases"]:
-                                if english_ph := next(
-                                    (
-                                        eng_ph
-                                        for eng_ph in english_ep.get("phases", [])
-                                        if eng_ph["id32"] == phase["id32"]
-                                    ),
-                                    None,
-                                ):
-                                    if phase["introTitle"] != english_ph["introTitle"]:
-                                        if (
-                                            phase["id32"]
-                                            not in self._episode_phase_translations[
-                                                language
-                                            ]["phases"]
-                                        ):
-                                            self._episode_phase_translations[language][
-                                                "phases"
-                                            ][phase["id32"]] = {
-                                                "introTitle": phase["introTitle"],
-                                                "introMessage": phase["introMessage"],
-                                                "outroTitle": phase["outroTitle"],
-                                                "outroMessage": phase["outroMessage"],
-                                            }
-                                        else:
-                                            for (
-                                                key,
-                                                value,
-                                            ) in self._episode_phase_translations[
-                                                language
-                                            ][
-                                                "phases"
-                                            ][
-                                                phase["id32"]
-                                            ].items():
-                                                if phase[key] != value:
-                                                    value = phase[key]
-                                    else:
-                                        if (
-                                            phase["id32"]
-                                            in self._episode_phase_translations[
-                                                language
-                                            ]["phases"]
-                                        ):
-                                            phase["introTitle"] = (
-                                                self._episode_phase_translations[
-                                                    language
-                                                ]["phases"][phase["id32"]]["introTitle"]
-                                            )
-                                            phase["introMessage"] = (
-                                                self._episode_phase_translations[
-                                                    language
-                                                ]["phases"][phase["id32"]][
-                                                    "introMessage"
-                                                ]
-                                            )
-                                            phase["outroTitle"] = (
-                                                self._episode_phase_translations[
-                                                    language
-                                                ]["phases"][phase["id32"]]["outroTitle"]
-                                            )
-                                            phase["outroMessage"] = (
-                                                self._episode_phase_translations[
-                                                    language
-                                                ]["phases"][phase["id32"]][
-                                                    "outroMessage"
-                                                ]
-                                            )
-
-            for space_station in self._raw_war_status.get("en", {}).get(
-                "spaceStations", []
-            ):
-                space_station_info = await client.get_space_station_info(
-                    war_id=self.war_id, station_id=space_station["id32"]
-                )
-                self._raw_space_stations.append(space_station_info)
-
-            war_stats = await client.get_war_stats(war_id=self.war_id)
+            *_, war_stats, war_info, war_effects = await independent_requests
             if war_stats:
                 self._raw_war_stats = war_stats
-
-            war_info = await client.get_war_info(war_id=self.war_id)
             if war_info:
                 self._raw_war_info = war_info
-
-            war_effects = await client.get_war_effects()
             if war_effects:
                 self._raw_war_effects = war_effects
 
-        async with SteamPlayerCountClient(
-            logger=self.logger, base_url=EndpointBase.STEAM_PLAYER_COUNT.value
-        ) as client:
-            steam_count = await client.get_steam_count()
-            if steam_count:
-                self.steam_player_count = steam_count["response"]["player_count"]
+    async def _fetch_language(
+        self, plan: FetchPlan, client: HelldiversClient, lang: Language
+    ) -> None:
+        assignments, control_centre = await gather(
+            plan.fetch(
+                f"assignments:{lang.short_code}",
+                client.get_assignments(war_id=self.war_id, lang=lang.long_code),
+                after="war_id",
+            ),
+            plan.fetch(
+                f"control_centre:{lang.short_code}",
+                client.get_control_centre(war_id=self.war_id, lang=lang.long_code),
+                after="war_id",
+            ),
+        )
+        if assignments != None:
+            self._raw_assignments[lang.short_code] = assignments
+        if control_centre:
+            self._raw_control_centre[lang.short_code] = control_centre
+
+    async def _fetch_space_stations(
+        self, plan: FetchPlan, client: HelldiversClient
+    ) -> None:
+        space_stations = await gather(
+            *(
+                plan.fetch(
+                    f"space_station:{space_station['id32']}",
+                    client.get_space_station_info(
+                        war_id=self.war_id, station_id=space_station["id32"]
+                    ),
+                    after="war_status:en",
+                )
+                for space_station in self._raw_war_status.get("en", {}).get(
+                    "spaceStations", []
+                )
+            )
+        )
+        self._raw_space_stations.extend(ss for ss in space_stations if ss)
 
-        async with SteamNewsClient(
-            logger=self.logger, base_url=EndpointBase.STEAM_NEWS.value
-        ) as client:
-            steam_news = await client.get_steam_news()
-            if steam_news:
-                self._raw_steam_news: list[dict] = [
-                    pn
-                    for pn in steam_news["appnews"]["newsitems"]
-                    if pn["feedlabel"] == "Community Announcements"
-                ]
+        stations_with_votes = [
+            ss
+            for ss in self._raw_space_stations
+            if ss.get("currentElectionId", None) is not None
+        ]
+        if stations_with_votes:
+            async with AltDSSVotesAuthedClient(
+                logger=self.logger, http_pool=self.http_pool
+            ) as votes_client:
+                all_votes = await gather(
+                    *(
+                        plan.fetch(
+                            f"space_station_votes:{ss['id32']}",
+                            votes_client.get_space_stations_votes(
+                                ss["currentElectionId"]
+                            ),
+                            after=f"space_station:{ss['id32']}",
+                        )
+                        for ss in stations_with_votes
+                    )
+                )
+            for space_station, space_station_votes in zip(
+                stations_with_votes, all_votes
+            ):
+                if space_station_votes is not None:
+                    space_station["votes"] = space_station_votes
+
+    async def _fetch_steam(self, plan: FetchPlan) -> None:
+        async with (
+            SteamPlayerCountClient(
+                logger=self.logger,
+                base_url=EndpointBase.STEAM_PLAYER_COUNT.value,
+                http_pool=self.http_pool,
+            ) as count_client,
+            SteamNewsClient(
+                logger=self.logger,
+                base_url=EndpointBase.STEAM_NEWS.value,
+                http_pool=self.http_pool,
+            ) as news_client,
+        ):
+            steam_count, steam_news = await gather(
+                plan.fetch("steam_player_count", count_client.get_steam_count()),
+                plan.fetch("steam_news", news_client.get_steam_news()),
+            )
+        if steam_count:
+            self.steam_player_count = steam_count["response"]["player_count"]
+        if steam_news:
+            self._raw_steam_news: list[dict] = [
+                pn
+                for pn in steam_news["appnews"]["newsitems"]
+                if pn["feedlabel"] == "Community Announcements"
+            ]
 
-        async with AuthedClient(logger=self.logger) as client:
+    async def _fetch_personal_order(self, plan: FetchPlan) -> None:
+        async with AuthedClient(logger=self.logger, http_pool=self.http_pool) as client:
             # dss_votes = await client.get_dss_votes()
             dss_votes = None
             if dss_votes:
@@ -284,52 +312,162 @@ class DataService(ReprMixin):
             if personal_order:
                 self._raw_personal_order = personal_order
 
-        for space_station in self._raw_space_stations:
-            if (
-                current_vote_id := space_station.get("currentElectionId", None)
-            ) is not None:
-                async with AltDSSVotesAuthedClient(logger=self.logger) as client:
-                    space_station_votes = await client.get_space_stations_votes(
-                        current_vote_id
-                    )
-                    if space_station_votes is not None:
-                        space_station["votes"] = space_station_votes
-
         if not self._raw_personal_order:
-            async with AltPOAuthedClient(logger=self.logger) as client:
-                personal_order = await client.get_personal_order()
+            async with AltPOAuthedClient(
+                logger=self.logger, http_pool=self.http_pool
+            ) as client:
+                personal_order = await plan.fetch(
+                    "personal_order", client.get_personal_order()
+                )
                 if personal_order:
                     self._raw_personal_order = personal_order
 
-        if self.pull_start_time.minute == 0 or not self.loaded:
-            async with ItemsClient(
-                logger=self.logger, base_url=EndpointBase.ITEMS.value
-            ) as client:
-                self._raw_api_items = await client.get_items()
-
-            async with AltSuperstoreAuthedClient(logger=self.logger) as client:
-                mother_data = await client.get_superstore()
-                super_store_pages: dict = next(
-                    (s for s in mother_data if s["id32"] == 2776696735), None
+    async def _fetch_items_and_superstore(self, plan: FetchPlan) -> None:
+        async with (
+            ItemsClient(
+                logger=self.logger,
+                base_url=EndpointBase.ITEMS.value,
+                http_pool=self.http_pool,
+            ) as items_client,
+            AltSuperstoreAuthedClient(
+                logger=self.logger, http_pool=self.http_pool
+            ) as store_client,
+        ):
+            items, mother_data, rotating_data = await gather(
+                plan.fetch("items", items_client.get_items()),
+                plan.fetch("superstore", store_client.get_superstore()),
+                plan.fetch("superstore:rotation", store_client.get_rotating()),
+            )
+        if items is not None:
+            self._raw_api_items = items
+        if mother_data:
+            super_store_pages: dict = next(
+                (s for s in mother_data if s["id32"] == 2776696735), None
+            )
+            if super_store_pages is not None:
+                # copied so the rotation isn't inserted into a payload that may be served again
+                self._raw_stuperstore: list = list(
+                    super_store_pages.get("sections", [])
                 )
-                if super_store_pages is not None:
-                    self._raw_stuperstore: list = super_store_pages.get("sections", [])
-                rotating_data = await client.get_rotating()
-                if rotating_data is not None:
-                    self._raw_stuperstore.insert(
-                        0, rotating_data.get("salesPage", {}).get("sections", [{}])[0]
-                    )
+        if rotating_data is not None:
+            self._raw_stuperstore.insert(
+                0, rotating_data.get("salesPage", {}).get("sections", [{}])[0]
+            )
 
-        async with ArsenalClient(logger=self.logger) as client:
-            arsenal_target = await client.get_community_target()
+    async def _fetch_arsenal(self, plan: FetchPlan) -> None:
+        async with ArsenalClient(
+            logger=self.logger, http_pool=self.http_pool
+        ) as client:
+            arsenal_target = await plan.fetch(
+                "arsenal_targets", client.get_community_target()
+            )
             if arsenal_target and arsenal_target["count"] != 0:
                 self._arsenal_targets: list[int] = arsenal_target["data"]
 
-        self.fetching = False
+    def _sync_episode_translations(self) -> None:
+        if english_cc := self._raw_control_centre.get("en"):
+            for language, cc in self._raw_control_centre.items():
+                if language == "en":
+                    continue
+                for ep in cc.get("episodes", []):
+                    if english_ep := next(
+                        (eng_ep for eng_ep in english_cc.get("episodes", [])),
+                        None,
+                    ):
+                        if ep["title"] != english_ep["title"]:
+                            if (
+                                ep["id32"]
+                                not in self._episode_phase_translations[language][
+                                    "episodes"
+                                ]
+                            ):
+                                self._episode_phase_translations[language]["episodes"][
+                                    ep["id32"]
+                                ] = {
+                                    "title": ep["title"],
+                                    "description": ep["description"],
+                                }
+
+                        else:
+                            if (
+                                ep["id32"]
+                                in self._episode_phase_translations[language][
+                                    "episodes"
+                                ]
+                            ):
+                                ep["title"] = self._episode_phase_translations[
+                                    language
+                                ]["episodes"][ep["id32"]]["title"]
+                                ep["description"] = self._episode_phase_translations[
+                                    language
+                                ]["episodes"][ep["id32"]]["description"]
+
+                        for phase in ep["phases"]:
+                            if english_ph := next(
+                                (
+                                    eng_ph
+                                    for eng_ph in english_ep.get("phases", [])
+                                    if eng_ph["id32"] == phase["id32"]
+                                ),
+                                None,
+                            ):
+                                if phase["introTitle"] != english_ph["introTitle"]:
+                                    if (
+                                        phase["id32"]
+                                        not in self._episode_phase_translations[
+                                            language
+                                        ]["phases"]
+                                    ):
+                                        self._episode_phase_translations[language][
+                                            "phases"
+                                        ][phase["id32"]] = {
+                                            "introTitle": phase["introTitle"],
+                                            "introMessage": phase["introMessage"],
+                                            "outroTitle": phase["outroTitle"],
+                                            "outroMessage": phase["outroMessage"],
+                                        }
+                                    else:
+                                        for (
+                                            key,
+                                            value,
+                                        ) in self._episode_phase_translations[language][
+                                            "phases"
+                                        ][
+                                            phase["id32"]
+                                        ].items():
+                                            if phase[key] != value:
+                                                value = phase[key]
+                                else:
+                                    if (
+                                        phase["id32"]
+                                        in self._episode_phase_translations[language][
+                                            "phases"
+                                        ]
+                                    ):
+                                        phase["introTitle"] = (
+                                            self._episode_phase_translations[language][
+                                                "phases"
+                                            ][phase["id32"]]["introTitle"]
+                                        )
+                                        phase["introMessage"] = (
+                                            self._episode_phase_translations[language][
+                                                "phases"
+                                            ][phase["id32"]]["introMessage"]
+                                        )
+                                        phase["outroTitle"] = (
+                                            self._episode_phase_translations[language][
+                                                "phases"
+                                            ][phase["id32"]]["outroTitle"]
+                                        )
+                                        phase["outroMessage"] = (
+                                            self._episode_phase_translations[language][
+                                                "phases"
+                                            ][phase["id32"]]["outroMessage"]
+                                        )
 
     def format_data(self) -> None:
-        if self.formatted_data != None:
-            self.previous_data = self.formatted_data.copy()
+        # each build is a new object and snapshots are never mutated once built, so the old one can be kept as is
+        self.previous_data = self.formatted_data
         formatted_data_context = FormattedDataContext(
             war_id=self.war_id,
             steam_player_count=self.steam_player_count,
@@ -347,16 +485,23 @@ class DataService(ReprMixin):
             items_data=self._raw_api_items,
             arsenal_targets=self._arsenal_targets,
             json_dict=self.json_dict,
+            payload_hashes=self._payload_hashes,
+            previous=self.previous_data,
         )
         self.formatted_data = FormattedData(context=formatted_data_context)
         self.update_tracker_rates()
+        END_TIMES.advance(version=self.formatted_data.version)
         if not self.loaded:
             self.loaded = True
 
     def update_tracker_rates(self):
+        # every sample of a build shares its timestamp, so late pulls don't skew the rates
+        sampled_at = self.formatted_data.formatted_at.timestamp()
         for campaign in self.formatted_data.campaigns:
             self.tracking_service.liberation_changes.add_entry(
-                key=campaign.planet.index, value=campaign.progress
+                key=campaign.planet.index,
+                value=campaign.progress,
+                timestamp=sampled_at,
             )
             campaign.planet.tracker = (
                 self.tracking_service.liberation_changes.get_entry(
@@ -371,7 +516,9 @@ class DataService(ReprMixin):
             for region in planet.regions.values():
                 if region.is_available:
                     self.tracking_service.region_changes.add_entry(
-                        key=region.settings_hash, value=region.perc
+                        key=region.settings_hash,
+                        value=region.perc,
+                        timestamp=sampled_at,
                     )
                     region.tracker = self.tracking_service.region_changes.get_entry(
                         key=region.settings_hash
@@ -389,7 +536,9 @@ class DataService(ReprMixin):
                     ]:
                         continue
                     self.tracking_service.major_order_changes.add_entry(
-                        key=(assignment.id, task_index), value=task.progress_perc
+                        key=(assignment.id, task_index),
+                        value=task.progress_perc,
+                        timestamp=sampled_at,
                     )
             for assignments in self.formatted_data.assignments.values():
                 for assignment in assignments:
@@ -412,7 +561,9 @@ class DataService(ReprMixin):
             for ta in self.formatted_data.dss.tactical_actions:
                 for cost in ta.cost:
                     self.tracking_service.tactical_action_changes.add_entry(
-                        key=(ta.id, cost.item), value=cost.progress
+                        key=(ta.id, cost.item),
+                        value=cost.progress,
+                        timestamp=sampled_at,
                     )
                     ta.cost_changes[cost.item] = (
                         self.tracking_service.tactical_action_changes.get_entry(
@@ -423,7 +574,9 @@ class DataService(ReprMixin):
         if self.formatted_data.global_resources:
             for gr in self.formatted_data.global_resources:
                 self.tracking_service.global_resource_changes.add_entry(
-                    key=gr.id, value=gr.perc
+                    key=gr.id,
+                    value=gr.perc,
+                    timestamp=sampled_at,
                 )
                 gr.tracker = self.tracking_service.global_resource_changes.get_entry(
                     key=gr.id
@@ -0,0 +1,166 @@
+from asyncio import Semaphore, wait_for
+from datetime import datetime, timezone
+from enum import Enum
+from hashlib import blake2b
+from json import dumps
+from time import perf_counter
+from typing import Any, Awaitable
+from utils.api_wrapper.clients.resilience import CircuitOpenError
+from utils.logger import GWWLogger
+from utils.mixins import ReprMixin
+
+# Maximum number of requests in flight at once across every client
+FETCH_CONCURRENCY = 16
+
+# Time allowed for each endpoint, including the client's own retries (in seconds)
+DEFAULT_ENDPOINT_TIMEOUT = 12
+ENDPOINT_TIMEOUTS: dict[str, int] = {
+    "war_id": 8,
+    "war_status": 15,
+    "war_info": 15,
+    "news_feed": 12,
+    "steam_player_count": 6,
+    "steam_news": 8,
+    "items": 20,
+    "superstore": 20,
+}
+
+
+class EndpointStatus(Enum):
+    CHANGED = "changed"
+    UNCHANGED = "unchanged"
+    FAILED = "failed"
+    STALE = "stale"
+
+
+def payload_hash(payload: Any) -> str:
+    """A stable digest of a decoded JSON payload"""
+    return blake2b(
+        dumps(payload, sort_keys=True, separators=(",", ":")).encode(),
+        digest_size=16,
+    ).hexdigest()
+
+
+class FetchPlan(ReprMixin):
+    def __init__(
+        self,
+        logger: GWWLogger,
+        max_concurrency: int = FETCH_CONCURRENCY,
+        previous_hashes: dict[str, str] | None = None,
+        last_good: dict[str, tuple[str, Any]] | None = None,
+    ):
+        """Runs API requests concurrently under a shared concurrency limit and records how long each one took
+
+        Requests name the request they waited for with `after`, the longest such chain is the critical path
+
+        Payloads are hashed and compared to `previous_hashes` to spot changes.
+        `last_good` keeps good payloads to serve while an endpoint's circuit is open"""
+        self.logger = logger
+        self._semaphore = Semaphore(max_concurrency)
+        self.timings: dict[str, float] = {}
+        self.dependencies: dict[str, str] = {}
+        self.timed_out: list[str] = []
+        self.previous_hashes = previous_hashes or {}
+        self.hashes: dict[str, str] = {}
+        self.report: dict[str, EndpointStatus] = {}
+        self.last_good = last_good if last_good is not None else {}
+        self.started_at: datetime = datetime.now(tz=timezone.utc)
+        self._start = perf_counter()
+        self.wall_time: float | None = None
+
+    async def fetch(
+        self,
+        name: str,
+        request: Awaitable,
+        timeout: float | None = None,
+        after: str | None = None,
+    ) -> Any | None:
+        """Await `request` within the endpoint's time budget
+
+        `name` is `endpoint` or `endpoint:detail`, the endpoint part picks the timeout.
+        `after` is the name of the request whose result this one needed
+        """
+        if after is not None:
+            self.dependencies[name] = after
+        if timeout is None:
+            timeout = ENDPOINT_TIMEOUTS.get(
+                name.split(":", 1)[0], DEFAULT_ENDPOINT_TIMEOUT
+            )
+        async with self._semaphore:
+            request_start = perf_counter()
+            try:
+                result = await wait_for(request, timeout=timeout)
+            except TimeoutError:
+                self.timed_out.append(name)
+                self.logger.warning(
+                    f"[FetchPlan] {name} timed out after {timeout} seconds"
+                )
+                result = None
+            except CircuitOpenError:
+                if name in self.last_good:
+                    self.hashes[name], result = self.last_good[name]
+                    self.report[name] = EndpointStatus.STALE
+                    return result
+                result = None
+            finally:
+                self.timings[name] = perf_counter() - request_start
+        if result is None:
+            self.report[name] = EndpointStatus.FAILED
+        else:
+            self.hashes[name] = payload_hash(result)
+            self.last_good[name] = (self.hashes[name], result)
+            self.report[name] = (
+                EndpointStatus.UNCHANGED
+                if self.hashes[name] == self.previous_hashes.get(name)
+                else EndpointStatus.CHANGED
+            )
+        return result
+
+    def with_status(self, status: EndpointStatus) -> list[str]:
+        return [name for name, s in self.report.items() if s == status]
+
+    def finish(self) -> None:
+        self.wall_time = perf_counter() - self._start
+
+    @property
+    def critical_path(self) -> tuple[list[str], float] | None:
+        """The slowest chain of dependent requests as `([names], seconds)`, first request first"""
+        chains: dict[str, tuple[list[str], float]] = {}
+
+        def chain_of(name: str) -> tuple[list[str], float]:
+            if name not in chains:
+                after = self.dependencies.get(name)
+                names, seconds = chain_of(after) if after in self.timings else ([], 0.0)
+                chains[name] = (names + [name], seconds + self.timings[name])
+            return chains[name]
+
+        if not self.timings:
+            return None
+        return max((chain_of(name) for name in self.timings), key=lambda x: x[1])
+
+    @property
+    def slowest(self) -> tuple[str, float] | None:
+        """The slowest single request as `(name, seconds)`"""
+        if not self.timings:
+            return None
+        return max(self.timings.items(), key=lambda x: x[1])
+
+    @property
+    def sequential_time(self) -> float:
+        """How long the requests would have taken one after another"""
+        return sum(self.timings.values())
+
+    def summary(self) -> str:
+        slowest_name, slowest_time = self.slowest or (None, 0.0)
+        critical_names, critical_time = self.critical_path or ([], 0.0)
+        return (
+            f"{len(self.timings)} requests in {self.wall_time or 0.0:.2f}s"
+            f" | critical path: {' > '.join(critical_names)} ({critical_time:.2f}s)"
+            f" | slowest: {slowest_name} ({slowest_time:.2f}s)"
+            f" | sequential: {self.sequential_time:.2f}s"
+            f" | timed out: {len(self.timed_out)}"
+            f" | changed: {len(self.with_status(EndpointStatus.CHANGED))}"
+            f" | unchanged: {len(self.with_status(EndpointStatus.UNCHANGED))}"
+            f" | failed: {len(self.with_status(EndpointStatus.FAILED))}"
+            f" | stale: {len(self.with_status(EndpointStatus.STALE))}"
+        )
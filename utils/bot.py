@@ -14,9 +14,10 @@ from json import load
 from os import listdir
 from utils.api_wrapper.services import DataService
 from utils.dataclasses import BotChannels, Config, GWWBotModes
-from utils.dbv2 import Databases, GWWGuild, GWWGuilds
+from utils.dbv2 import DB_POOL, Databases, GWWGuild, GWWGuilds, run_in_db_thread
 from utils.interface_handler import InterfaceHandler
 from utils.logger import GWWLogger
+from utils.map_renderer import MapRenderer
 from utils.maps import Maps
 
 STARTUP_SECONDS = 90
@@ -41,6 +42,7 @@ class GalacticWideWebBot(AutoShardedInteractionBot):
         self.bot_dashboard_channel: TextChannel | None = None
         self.bot_dashboard_message: Message | None = None
         self.maps = Maps()
+        self.map_renderer = MapRenderer()
         self.loops: list[Loop] = []
         self.load_extensions("cogs/admin")
         self.load_extensions("cogs")
@@ -53,13 +55,19 @@ class GalacticWideWebBot(AutoShardedInteractionBot):
     def ready(self) -> bool:
         return self.ready_time < datetime.now(tz=timezone.utc)
 
+    async def close(self) -> None:
+        await self.data.http_pool.close()
+        self.map_renderer.close()
+        await super().close()
+        await run_in_db_thread(DB_POOL.close)
+
     async def on_ready(self) -> None:
         await self.channels.get_channels(self)
         self.logger.info(
             f"Loaded {len(self.cogs)}/{len([f for f in listdir('cogs') if f.endswith('.py')]) + len([f for f in listdir('cogs/admin') if f.endswith('.py')])} cogs successfully"
         )
         await self.get_owner()
-        self.databases = Databases()
+        self.databases = await run_in_db_thread(Databases)
 
     def load_json(self) -> None:
         for key, values in self.json_dict.copy().items():
@@ -0,0 +1,250 @@
+from asyncio import Event, Lock, PriorityQueue, Task, create_task, sleep
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
+from itertools import count
+from time import monotonic, perf_counter
+from typing import Awaitable, Callable
+from utils.mixins import ReprMixin
+
+# Most requests the broadcaster has in flight at once
+BROADCAST_WORKERS = 25
+
+# Discord's global limit is 50 requests per second per bot, stay just under it
+GLOBAL_REQUESTS_PER_SECOND = 45
+
+
+class DeliveryStatus(Enum):
+    SENT = "sent"
+    FAILED = "failed"
+    REMOVED = "removed"
+
+
+@dataclass
+class BroadcastResult:
+    feature_type: str
+    sent: int = 0
+    failed: int = 0
+    removed: int = 0
+    skipped: int = 0
+    latencies: list[float] = field(default_factory=list, repr=False)
+    queue_waits: list[float] = field(default_factory=list, repr=False)
+    wall_time: float = 0.0
+
+    def record(self, status: DeliveryStatus, latency: float) -> None:
+        match status:
+            case DeliveryStatus.SENT:
+                self.sent += 1
+            case DeliveryStatus.REMOVED:
+                self.removed += 1
+            case _:
+                self.failed += 1
+        self.latencies.append(latency)
+
+    def percentile(self, percent: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[round((len(ordered) - 1) * percent / 100)]
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> float:
+        return self.percentile(95)
+
+    @property
+    def total(self) -> int:
+        return self.sent + self.failed + self.removed
+
+    def __str__(self) -> str:
+        return (
+            f"{self.feature_type} | {self.total} in {self.wall_time:.2f}s"
+            f" | sent: {self.sent} | failed: {self.failed} | removed: {self.removed}"
+            f" | skipped: {self.skipped}"
+            f" | p50: {self.p50 * 1000:.0f}ms | p95: {self.p95 * 1000:.0f}ms"
+            f" | max queue wait: {max(self.queue_waits, default=0.0):.2f}s"
+        )
+
+
+class TokenBucket(ReprMixin):
+    def __init__(self, rate: float, capacity: int | None = None):
+        """Hands out `rate` tokens per second, allowing bursts up to `capacity`"""
+        self.rate = rate
+        self.capacity = capacity or int(rate)
+        self._tokens = float(self.capacity)
+        self._updated = monotonic()
+        self._lock = Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await sleep((1 - self._tokens) / self.rate)
+
+
+class Priority(IntEnum):
+    URGENT = 0
+    ANNOUNCEMENT = 1
+    BULK = 2
+
+
+# Which queue each feature's sends go into, anything not listed is an ANNOUNCEMENT
+FEATURE_PRIORITIES: dict[str, Priority] = {
+    "war_announcements": Priority.URGENT,
+    "dss_announcements": Priority.URGENT,
+    "major_order_updates": Priority.URGENT,
+    "region_announcements": Priority.URGENT,
+    "dashboards": Priority.BULK,
+    "maps": Priority.BULK,
+}
+
+# Announcements sent through another feature's channels, like dispatches in war announcements
+ANNOUNCEMENT_TYPE_PRIORITIES: dict[str, Priority] = {
+    "MO": Priority.URGENT,
+    "dispatch": Priority.ANNOUNCEMENT,
+    "PO": Priority.ANNOUNCEMENT,
+}
+
+
+@dataclass(eq=False)
+class QueuedJob:
+    channel_id: int
+    job: Callable[[], Awaitable[DeliveryStatus]]
+    priority: Priority
+    result: BroadcastResult
+    done: Callable[[], None]
+    enqueued_at: float = field(default_factory=perf_counter)
+
+
+class Broadcaster(ReprMixin):
+    def __init__(
+        self,
+        workers: int = BROADCAST_WORKERS,
+        requests_per_second: float = GLOBAL_REQUESTS_PER_SECOND,
+    ):
+        """Runs message sends and edits concurrently while respecting Discord's rate limits
+
+        Jobs wait in a priority queue so urgent announcements jump ahead of bulk dashboard and map edits.
+        A token bucket keeps the bot under the global limit and only one request per channel
+        is in flight at a time, so we never queue up behind a channel's own bucket.
+        disnake still waits out any 429s that slip through."""
+        self.worker_count = workers
+        self._workers: list[Task] = []
+        self._queue: PriorityQueue[tuple[int, int, QueuedJob]] = PriorityQueue()
+        self._sequence = count()
+        self._global_bucket = TokenBucket(rate=requests_per_second)
+        self._channel_locks: dict[int, Lock] = {}
+        # jobs holding or waiting for each channel's lock, the lock goes when this reaches 0
+        self._channel_users: Counter[int] = Counter()
+        self.waiting: dict[Priority, deque[QueuedJob]] = {p: deque() for p in Priority}
+        self.max_wait: dict[Priority, float] = {p: 0.0 for p in Priority}
+
+    @property
+    def depth(self) -> dict[Priority, int]:
+        """Number of jobs waiting for a worker, by priority"""
+        return {priority: len(jobs) for priority, jobs in self.waiting.items()}
+
+    @property
+    def oldest(self) -> dict[Priority, float]:
+        """How long the oldest waiting job has been queued (in seconds), by priority"""
+        now = perf_counter()
+        return {
+            priority: now - jobs[0].enqueued_at if jobs else 0.0
+            for priority, jobs in self.waiting.items()
+        }
+
+    def stats(self) -> dict[str, dict[str, int | float]]:
+        oldest = self.oldest
+        return {
+            priority.name: {
+                "depth": len(self.waiting[priority]),
+                "oldest": oldest[priority],
+                "max_wait": self.max_wait[priority],
+            }
+            for priority in Priority
+        }
+
+    def _ensure_workers(self) -> None:
+        self._workers = [w for w in self._workers if not w.done()]
+        for _ in range(self.worker_count - len(self._workers)):
+            self._workers.append(create_task(self._worker()))
+
+    async def run(
+        self,
+        feature_type: str,
+        jobs: list[tuple[int, Callable[[], Awaitable[DeliveryStatus]]]],
+        priority: Priority | None = None,
+    ) -> BroadcastResult:
+        """Queue every `(channel_id, job)` and wait for all of them to finish"""
+        if priority is None:
+            priority = FEATURE_PRIORITIES.get(feature_type, Priority.ANNOUNCEMENT)
+        result = BroadcastResult(feature_type=feature_type)
+        start = perf_counter()
+        if jobs:
+            self._ensure_workers()
+            finished = Event()
+            remaining = len(jobs)
+
+            def done() -> None:
+                nonlocal remaining
+                remaining -= 1
+                if remaining == 0:
+                    finished.set()
+
+            for channel_id, job in jobs:
+                queued = QueuedJob(
+                    channel_id=channel_id,
+                    job=job,
+                    priority=priority,
+                    result=result,
+                    done=done,
+                )
+                self.waiting[priority].append(queued)
+                self._queue.put_nowait((priority, next(self._sequence), queued))
+            await finished.wait()
+        result.wall_time = perf_counter() - start
+        return result
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, queued = await self._queue.get()
+            try:
+                await self._run_job(queued)
+            finally:
+                queued.done()
+                self._queue.task_done()
+
+    async def _run_job(self, queued: QueuedJob) -> None:
+        # jobs of the same priority leave the queue in the order they joined it
+        self.waiting[queued.priority].popleft()
+        wait = perf_counter() - queued.enqueued_at
+        self.max_wait[queued.priority] = max(self.max_wait[queued.priority], wait)
+        queued.result.queue_waits.append(wait)
+        channel_lock = self._channel_locks.setdefault(queued.channel_id, Lock())
+        self._channel_users[queued.channel_id] += 1
+        try:
+            async with channel_lock:
+                await self._global_bucket.acquire()
+                job_start = perf_counter()
+                try:
+                    status = await queued.job()
+                except Exception:
+                    status = DeliveryStatus.FAILED
+                queued.result.record(
+                    status or DeliveryStatus.FAILED, perf_counter() - job_start
+                )
+        finally:
+            self._channel_users[queued.channel_id] -= 1
+            if not self._channel_users[queued.channel_id]:
+                del self._channel_users[queued.channel_id]
+                del self._channel_locks[queued.channel_id]
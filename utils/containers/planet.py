@@ -12,7 +12,7 @@ from re import fullmatch
 from utils.api_wrapper.models import Planet
 from utils.dataclasses import Factions
 from utils.emojis import Emojis
-from utils.functions import get_end_time, short_format
+from utils.functions import END_TIMES, short_format
 from utils.interactables import HDCButton, WikiButton
 
 
@@ -160,7 +160,7 @@ class PlanetContainers(list[Container]):
                 change = f"{planet.tracker.change_rate_per_hour:+.2%}/hr"
                 liberation_text += f"\n`{change:^26}`"
 
-            end_time_info = get_end_time(planet, gambit_planets)
+            end_time_info = END_TIMES.get(planet, gambit_planets)
             if end_time_info.end_time:
                 if end_time_info.source_planet:
                     liberation_text += f"\n-# {component_json['liberated']} **<t:{int(planet.tracker.complete_time.timestamp())}:R>**"
@@ -1,19 +1,129 @@
-from dataclasses import dataclass
-from psycopg2 import connect
+from asyncio import to_thread
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from psycopg2.extensions import connection as Connection
 from psycopg2.extras import Json, DictCursor
-from typing import Self
+from psycopg2.pool import ThreadedConnectionPool
+from threading import BoundedSemaphore, Lock, RLock
+from time import perf_counter
+from typing import Callable, Iterator, Self
 from utils.mixins import ReprMixin
 from utils.dataclasses import Languages, Config
 
+# Connections kept open between queries / hard limit on open connections
+POOL_MIN_CONNECTIONS = 1
+POOL_MAX_CONNECTIONS = 8
+
+
+class ConnectionPool(ReprMixin):
+    def __init__(
+        self,
+        min_connections: int = POOL_MIN_CONNECTIONS,
+        max_connections: int = POOL_MAX_CONNECTIONS,
+    ):
+        """A thread-safe pool of database connections shared by every table class
+
+        Callers wait for a free connection instead of erroring when the pool is exhausted
+        """
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self._pool: ThreadedConnectionPool | None = None
+        self._pool_lock = Lock()
+        self._slots = BoundedSemaphore(max_connections)
+        self._stats_lock = Lock()
+        self.in_use = 0
+        self.checkouts = 0
+        self.discarded = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _get_pool(self) -> ThreadedConnectionPool:
+        with self._pool_lock:
+            if self._pool is None or self._pool.closed:
+                self._pool = ThreadedConnectionPool(
+                    minconn=self.min_connections,
+                    maxconn=self.max_connections,
+                    host=Config.DB_HOSTNAME,
+                    dbname=Config.DATABASE,
+                    user=Config.DB_USERNAME,
+                    password=Config.DB_PWD,
+                    port=Config.DB_PORT_ID,
+                )
+            return self._pool
+
+    @contextmanager
+    def connection(self) -> Iterator[Connection]:
+        """Borrow a connection, committing on success and rolling back on error
+
+        Waiting for a free slot blocks the calling thread, so coroutines go through `run_in_db_thread`
+        """
+        wait_start = perf_counter()
+        self._slots.acquire()
+        wait = perf_counter() - wait_start
+        with self._stats_lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        conn = None
+        try:
+            pool = self._get_pool()
+            conn = pool.getconn()
+            with conn:
+                yield conn
+        finally:
+            if conn is not None:
+                broken = bool(conn.closed)
+                if broken:
+                    with self._stats_lock:
+                        self.discarded += 1
+                pool.putconn(conn, close=broken)
+            with self._stats_lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    @property
+    def idle(self) -> int:
+        return len(self._pool._pool) if self._pool and not self._pool.closed else 0
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.checkouts if self.checkouts else 0.0
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "max_connections": self.max_connections,
+            "in_use": self.in_use,
+            "idle": self.idle,
+            "checkouts": self.checkouts,
+            "discarded": self.discarded,
+            "average_wait_ms": self.average_wait * 1000,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool and not self._pool.closed:
+                self._pool.closeall()
+
+
+DB_POOL = ConnectionPool()
+
 
 def connection():
-    return connect(
-        host=Config.DB_HOSTNAME,
-        dbname=Config.DATABASE,
-        user=Config.DB_USERNAME,
-        password=Config.DB_PWD,
-        port=Config.DB_PORT_ID,
-    )
+    """Borrow a connection from the shared pool
+
+    Use as `with connection() as conn:`, the connection goes back to the pool afterwards
+    """
+    return DB_POOL.connection()
+
+
+async def run_in_db_thread(func: Callable, *args, **kwargs):
+    """Run a blocking database call in a worker thread so the event loop keeps running
+
+    The wait for a pool slot happens in the worker too"""
+    return await to_thread(func, *args, **kwargs)
 
 
 class BotDashboard(ReprMixin):
@@ -203,6 +313,18 @@ class GWWGuild:
                     )
                 )
 
+    def copy(self) -> Self:
+        """Returns an independent copy of this guild and its features"""
+        guild = GWWGuild(
+            {
+                "guild_id": self.guild_id,
+                "language": self.language,
+                "feature_keys": list(self.feature_keys or []),
+            }
+        )
+        guild.features = [replace(f) for f in self.features]
+        return guild
+
     @property
     def language_long(self) -> str:
         """Returns the full version of the language's name
@@ -272,6 +394,7 @@ class GWWGuild:
                     values + (self.guild_id,),
                 )
                 conn.commit()
+        GUILD_REGISTRY.upsert(self)
 
     def reset(self) -> None:
         """Reset this entry to default"""
@@ -298,6 +421,7 @@ class GWWGuild:
                     query=f"DELETE FROM discord.guilds WHERE guild_id = {self.guild_id}"
                 )
                 conn.commit()
+        GUILD_REGISTRY.remove(self.guild_id)
 
     @classmethod
     def default(cls) -> Self:
@@ -343,13 +467,11 @@ class GWWGuilds(list[GWWGuild], ReprMixin):
 
     @staticmethod
     def unique_languages() -> list[str]:
-        with connection() as conn:
-            with conn.cursor() as curs:
-                curs.execute("SELECT DISTINCT language FROM discord.guilds")
-                records = curs.fetchall()
-                return [record[0] for record in records]
+        return GUILD_REGISTRY.languages
 
     def get_specific_guild(id: int) -> GWWGuild | None:
+        if (guild := GUILD_REGISTRY.get(id)) is not None:
+            return guild
         with connection() as conn:
             with conn.cursor(cursor_factory=DictCursor) as curs:
                 curs.execute(
@@ -379,7 +501,9 @@ class GWWGuilds(list[GWWGuild], ReprMixin):
                 )
                 record = curs.fetchone()
                 if record:
-                    return GWWGuild(dict(record))
+                    guild = GWWGuild(dict(record))
+                    GUILD_REGISTRY.upsert(guild)
+                    return guild
         return None
 
     def add(
@@ -394,7 +518,85 @@ class GWWGuilds(list[GWWGuild], ReprMixin):
                     vars=(guild_id, language, feature_keys),
                 )
                 conn.commit()
-        return GWWGuilds.get_specific_guild(guild_id)
+        guild = GWWGuild(
+            {"guild_id": guild_id, "language": language, "feature_keys": feature_keys}
+        )
+        GUILD_REGISTRY.upsert(guild)
+        return guild
+
+
+class GuildRegistry(ReprMixin):
+    def __init__(self):
+        """In-memory copy of every guild, kept consistent by writing through `GWWGuild` and `GWWGuilds` changes
+
+        Lookups hand out copies so callers can't change the registry without saving"""
+        self._guilds: dict[int, GWWGuild] = {}
+        self.language_counts: Counter[str] = Counter()
+        self.loaded = False
+        self._lock = RLock()
+
+    def load(self, guilds: list[GWWGuild] | None = None) -> None:
+        """(Re)build the registry from `guilds`, or from the database if not provided"""
+        if guilds is None:
+            guilds = GWWGuilds(fetch_all=True)
+        with self._lock:
+            self._guilds = {g.guild_id: g.copy() for g in guilds}
+            self.language_counts = Counter(g.language for g in self._guilds.values())
+            self.loaded = True
+
+    def _ensure_loaded(self) -> None:
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    self.load()
+
+    def get(self, guild_id: int) -> GWWGuild | None:
+        self._ensure_loaded()
+        with self._lock:
+            guild = self._guilds.get(guild_id)
+            return guild.copy() if guild else None
+
+    def language_of(self, guild_id: int) -> str | None:
+        self._ensure_loaded()
+        guild = self._guilds.get(guild_id)
+        return guild.language if guild else None
+
+    def all(self) -> list[GWWGuild]:
+        self._ensure_loaded()
+        with self._lock:
+            return [g.copy() for g in self._guilds.values()]
+
+    @property
+    def languages(self) -> list[str]:
+        self._ensure_loaded()
+        with self._lock:
+            return [lang for lang, count in self.language_counts.items() if count > 0]
+
+    def upsert(self, guild: GWWGuild) -> None:
+        if not self.loaded or not guild.guild_id:
+            # the next load reads it from the DB anyway
+            return
+        with self._lock:
+            if (old_guild := self._guilds.get(guild.guild_id)) is not None:
+                self._discount(old_guild.language)
+            self._guilds[guild.guild_id] = guild.copy()
+            self.language_counts[guild.language] += 1
+
+    def remove(self, guild_id: int) -> None:
+        with self._lock:
+            if (old_guild := self._guilds.pop(guild_id, None)) is not None:
+                self._discount(old_guild.language)
+
+    def _discount(self, language: str) -> None:
+        self.language_counts[language] -= 1
+        if self.language_counts[language] <= 0:
+            del self.language_counts[language]
+
+    def __len__(self) -> int:
+        return len(self._guilds)
+
+
+GUILD_REGISTRY = GuildRegistry()
 
 
 @dataclass
@@ -1,7 +1,8 @@
 from .bot_info_embed import BotInfoEmbeds
 from .community_servers_embed import CommunityServersEmbed
-from .dashboard import Dashboard
+from .dashboard import Dashboard, DashboardModel
 from .dss_embed import DSSEmbed
+from .map_embed import MapEmbed
 from .personal_order_embed import PersonalOrderCommandEmbed
 from .steam_embed import SteamEmbed
 from .usage_embed import UsageEmbed
@@ -11,7 +12,9 @@ __all__ = [
     "BotInfoEmbeds",
     "CommunityServersEmbed",
     "Dashboard",
+    "DashboardModel",
     "DSSEmbed",
+    "MapEmbed",
     "PersonalOrderCommandEmbed",
     "SteamEmbed",
     "UsageEmbed",
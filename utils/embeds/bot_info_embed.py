@@ -3,8 +3,12 @@ from disnake import Colour, Embed
 from disnake.ext.tasks import Loop
 from inspect import getmembers
 from utils.bot import GalacticWideWebBot
+from utils.dbv2 import DB_POOL, GUILD_REGISTRY
 from utils.mixins import EmbedReprMixin
 
+# Endpoints listed in the runtime embed, slowest p95 first
+SLOWEST_ENDPOINTS_SHOWN = 5
+
 
 # DOESNT NEED LOCALIZATION
 class BotInfoEmbeds(list[Embed]):
@@ -12,6 +16,7 @@ class BotInfoEmbeds(list[Embed]):
         self.append(self.HeaderEmbed(bot=bot))
         self.extend(self.CogEmbeds(bot=bot))
         self.append(self.InterfaceHandlerEmbed(bot=bot))
+        self.append(self.RuntimeEmbed(bot=bot))
 
     class HeaderEmbed(Embed, EmbedReprMixin):
         def __init__(self, bot: GalacticWideWebBot):
@@ -78,3 +83,59 @@ class BotInfoEmbeds(list[Embed]):
                 self.add_field(
                     type, f"Length: {list_length}\nSet Length: {set_length} {warning}"
                 )
+
+    class RuntimeEmbed(Embed, EmbedReprMixin):
+        def __init__(self, bot: GalacticWideWebBot):
+            super().__init__(title="Runtime", colour=Colour.dark_theme())
+            queue_lines = []
+            for priority, stats in bot.interface_handler.broadcaster.stats().items():
+                queue_lines.append(
+                    f"-# {priority.capitalize()}: {stats['depth']:,} queued, oldest {stats['oldest']:.1f}s, max wait {stats['max_wait']:.1f}s"
+                )
+            self.add_field(
+                "Broadcast queue", "\n".join(queue_lines) or "-# Empty", inline=False
+            )
+
+            http_pool = bot.data.http_pool
+            self.add_field(
+                "HTTP pool",
+                f"-# Created: {http_pool.connections_created:,}\n-# Reused: {http_pool.connections_reused:,} ({http_pool.reuse_ratio:.0%})",
+            )
+
+            stats = DB_POOL.stats()
+            warning = ":warning:" if stats["in_use"] >= stats["max_connections"] else ""
+            self.add_field(
+                "Database pool",
+                (
+                    f"-# In use: {stats['in_use']}/{stats['max_connections']} {warning}\n-# Idle: {stats['idle']}"
+                    f"\n-# Checkouts: {stats['checkouts']:,} ({stats['discarded']:,} discarded)"
+                    f"\n-# Wait: {stats['average_wait_ms']:.1f}ms avg, {stats['max_wait_ms']:.1f}ms max"
+                ),
+            )
+
+            guilds_text = f"-# {len(GUILD_REGISTRY):,}"
+            if GUILD_REGISTRY.language_counts:
+                guilds_text += "\n-# " + ", ".join(
+                    f"{language}: {count:,}"
+                    for language, count in GUILD_REGISTRY.language_counts.most_common()
+                )
+            self.add_field("Guilds", guilds_text, inline=False)
+
+            slowest = sorted(
+                http_pool.latencies.items(),
+                key=lambda x: (x[1].percentile(95), x[1].mean),
+                reverse=True,
+            )
+            endpoint_lines = [
+                f"-# `{endpoint}` p95 <= {histogram.percentile(95)}s, mean {histogram.mean * 1000:.0f}ms, {histogram.count:,} requests"
+                for endpoint, histogram in slowest[:SLOWEST_ENDPOINTS_SHOWN]
+            ]
+            if len(slowest) > SLOWEST_ENDPOINTS_SHOWN:
+                endpoint_lines.append(
+                    f"-# +{len(slowest) - SLOWEST_ENDPOINTS_SHOWN} more endpoints"
+                )
+            self.add_field(
+                "Slowest endpoints",
+                "\n".join(endpoint_lines) or "-# No requests yet",
+                inline=False,
+            )
@@ -1,5 +1,7 @@
 from datetime import datetime, timedelta, timezone
+from functools import partial
 from random import choice
+from typing import Callable
 from data.lists import (
     CURRENCIES,
     CUSTOM_COLOURS,
@@ -29,8 +31,21 @@ from utils.dataclasses.enums import (
     SpaceStationType,
 )
 from utils.emojis import Emojis
-from utils.functions import get_end_time, health_bar, short_format
-from utils.mixins import EmbedReprMixin
+from utils.functions import END_TIMES, health_bar, short_format
+from utils.mixins import EmbedReprMixin, ReprMixin
+
+# Discord's limit on characters across every embed in a message
+DASHBOARD_CHARACTER_LIMIT = 6000
+
+# Dashboards with this many embeds get a tighter character budget
+CROWDED_EMBED_COUNT = 9
+CROWDED_CHARACTER_LIMIT = 5000
+
+# Highest compact level the dashboard embeds know how to render
+MAX_COMPACT_LEVEL = 2
+
+# How much worse dropping a whole embed is than compacting the same number of characters
+DROP_WEIGHT = 2
 
 STATUS_DICT = {
     0: "inactive",
@@ -40,29 +55,226 @@ STATUS_DICT = {
 }
 
 
+class DashboardModel(ReprMixin):
+    _latest: "DashboardModel | None" = None
+
+    def __init__(self, data: FormattedData):
+        """The language-neutral half of a dashboard, built once per `FormattedData`
+
+        Every language and compact level is rendered from the same campaign groupings
+        """
+        self.data = data
+        self.homeworld_campaigns = [c for c in data.campaigns if c.planet.homeworld]
+        self.space_stations = [
+            ss
+            for ss in data.space_stations
+            if ss.type != SpaceStationType.DSS or ss.flags not in (0, 2)
+        ]
+        self.invasion_events = [
+            c
+            for c in data.campaigns
+            if c.type == CampaignType.Event
+            and c.planet.event
+            and c.planet.event.type == EventType.Invasion
+        ]
+        self.urgent_liberations = [
+            c
+            for c in data.campaigns
+            if c.planet.event and c.planet.event.type == EventType.UrgentLiberation
+        ]
+        self.defence_campaigns = [
+            c
+            for c in data.campaigns
+            if c.type == CampaignType.Event
+            and c.planet.event
+            and c.planet.event.type == EventType.Defence
+        ]
+        self.eagle_storm = data.dss.get_ta_by_name("EAGLE STORM") if data.dss else None
+        self.recon_campaigns = [
+            c for c in data.campaigns if c.type == CampaignType.Recon
+        ]
+        self.faction_campaigns: list[tuple[str, list[Campaign]]] = sorted(
+            (
+                (
+                    f,
+                    [
+                        c
+                        for c in data.campaigns
+                        if c.faction.full_name == f
+                        and not c.type
+                        in (
+                            CampaignType.Recon,
+                            CampaignType.Event,
+                            CampaignType.HighPriority,
+                        )
+                        and not c.planet.event
+                        and not c.planet.homeworld
+                    ],
+                )
+                for f in ["Illuminate", "Terminids", "Automaton"]
+            ),
+            key=lambda x: sum([c.planet.stats.player_count for c in x[1]]),
+            reverse=True,
+        )
+
+    @classmethod
+    def from_data(cls, data: FormattedData) -> "DashboardModel":
+        """Reuses the last model for as long as `data` is the same build"""
+        if cls._latest is None or cls._latest.data is not data:
+            cls._latest = cls(data=data)
+        return cls._latest
+
+
+class DashboardSlot(ReprMixin):
+    def __init__(
+        self,
+        build: Callable[..., Embed],
+        compact_levels: int = 1,
+        droppable: bool = False,
+    ):
+        """One embed of a dashboard and the cheaper versions of it the layout can pick from
+
+        Option `n` is the embed built at compact level `n`, a droppable slot has one more option that shows nothing
+        """
+        self.build = build
+        self.compact_levels = compact_levels
+        self.droppable = droppable
+        self._variants: dict[int, Embed | None] = {}
+
+    @property
+    def options(self) -> int:
+        return self.compact_levels + self.droppable
+
+    def variant(self, option: int) -> Embed | None:
+        """The embed shown for `option`, `None` if it would be empty or is dropped"""
+        if option >= self.compact_levels:
+            return None
+        if option not in self._variants:
+            embed = (
+                self.build(compact_level=option)
+                if self.compact_levels > 1
+                else self.build()
+            )
+            if embed.fields:
+                # add blank line (max size, dont change)
+                embed.set_image("https://i.imgur.com/cThNy4f.png")
+            self._variants[option] = embed if embed.fields else None
+        return self._variants[option]
+
+    def cost(self, option: int) -> int:
+        """Characters that count towards Discord's limit for `option`"""
+        embed = self.variant(option)
+        return embed_character_count(embed) if embed else 0
+
+
+def embed_character_count(embed: Embed) -> int:
+    total_characters = 0
+    if embed.title:
+        total_characters += len(embed.title.strip())
+    if embed.description:
+        total_characters += len(embed.description.strip())
+    if embed.footer:
+        total_characters += len(embed._footer.get("text", "").strip())
+    if embed.author:
+        total_characters += len(embed._author.get("name", "").strip())
+    if embed.fields:
+        for field in embed.fields:
+            total_characters += len(field.name.strip())
+            total_characters += len(field.value.strip())
+    return total_characters
+
+
+def dashboard_budget(embed_count: int) -> int:
+    """Most characters a dashboard with `embed_count` embeds may use"""
+    if embed_count >= CROWDED_EMBED_COUNT:
+        return CROWDED_CHARACTER_LIMIT
+    return DASHBOARD_CHARACTER_LIMIT
+
+
+def fit_layout(slots: list[DashboardSlot]) -> list[int]:
+    """Picks an option for every slot so the dashboard fits its budget, losing as little as possible
+
+    Compacting costs the characters it removes, dropping a whole embed costs `DROP_WEIGHT` times that.
+    The cheapest trims are taken one at a time, remembering the cheapest layout that fits on the way,
+    then any slot that no longer needs trimming is given back as much as the budget allows.
+    """
+
+    def fits(layout: list[int]) -> bool:
+        variants = [slot.variant(option) for slot, option in zip(slots, layout)]
+        return sum(
+            embed_character_count(embed) for embed in variants if embed
+        ) <= dashboard_budget(sum(embed is not None for embed in variants))
+
+    def loss(index: int, option: int) -> int:
+        slot = slots[index]
+        weight = DROP_WEIGHT if option >= slot.compact_levels else 1
+        return (slot.cost(0) - slot.cost(option)) * weight
+
+    def total_loss(layout: list[int]) -> int:
+        return sum(loss(index, option) for index, option in enumerate(layout))
+
+    layout = [0] * len(slots)
+    best: list[int] | None = None
+    while not fits(layout):
+        steps = [
+            (loss(index, option) - loss(index, layout[index]), index, option)
+            for index, slot in enumerate(slots)
+            for option in range(layout[index] + 1, slot.options)
+            if slot.cost(option) < slot.cost(layout[index])
+        ]
+        if not steps:
+            break
+        for _, index, option in steps:
+            trial = layout[:index] + [option] + layout[index + 1 :]
+            if fits(trial) and (best is None or total_loss(trial) < total_loss(best)):
+                best = trial
+        _, index, option = min(steps)
+        layout = layout[:index] + [option] + layout[index + 1 :]
+    if best is not None and (not fits(layout) or total_loss(best) < total_loss(layout)):
+        layout = best
+
+    for index in sorted(
+        range(len(slots)), key=lambda i: loss(i, layout[i]), reverse=True
+    ):
+        for option in range(layout[index]):
+            trial = layout[:index] + [option] + layout[index + 1 :]
+            if fits(trial):
+                layout = trial
+                break
+    return layout
+
+
 class Dashboard:
     def __init__(
         self,
         data: FormattedData,
         language_code: str,
         json_dict: dict,
-        compact_level: int = 0,
+        model: DashboardModel | None = None,
     ):
+        """Renders `model` (or the model of `data`) in one language, laid out to fit Discord's limits
+
+        Compact versions of embeds are only built if the full dashboard doesn't fit"""
+        if model is None:
+            model = DashboardModel.from_data(data)
+        data = model.data
         language_json = json_dict["languages"][language_code]
-        self.embeds: list[Embed] = []
-        self.compact_level = compact_level
+        compact_levels = MAX_COMPACT_LEVEL + 1
+        slots: list[DashboardSlot] = []
 
         # Homeworld Campaigns
-        if homeworld_campaigns := [c for c in data.campaigns if c.planet.homeworld]:
-            for c in homeworld_campaigns:
-                self.embeds.append(
-                    self.HomeworldCampaignEmbed(
+        for c in model.homeworld_campaigns:
+            slots.append(
+                DashboardSlot(
+                    build=partial(
+                        self.HomeworldCampaignEmbed,
                         campaign=c,
                         total_players=data.total_players,
                         language_json=language_json,
-                        compact_level=self.compact_level,
-                    )
+                    ),
+                    compact_levels=compact_levels,
                 )
+            )
 
         # Major Order Embeds
         if (
@@ -71,189 +283,152 @@ class Dashboard:
             )
         ) != []:
             for assignment in assignments:
-                self.embeds.append(
-                    self.MajorOrderEmbed(
-                        assignment=assignment,
-                        planets=data.planets,
-                        gambit_planets=data.gambit_planets,
-                        language_json=language_json,
-                        json_dict=json_dict,
-                        compact_level=compact_level,
+                slots.append(
+                    DashboardSlot(
+                        build=partial(
+                            self.MajorOrderEmbed,
+                            assignment=assignment,
+                            planets=data.planets,
+                            gambit_planets=data.gambit_planets,
+                            language_json=language_json,
+                            json_dict=json_dict,
+                        ),
+                        compact_levels=compact_levels,
                     )
                 )
 
         # Space Station Embeds
-        for ss in data.space_stations:
+        for ss in model.space_stations:
             match ss.type:
                 case SpaceStationType.DSS:
-                    if ss.flags not in (0, 2):
-                        self.embeds.append(
-                            self.DSSEmbed(
+                    slots.append(
+                        DashboardSlot(
+                            build=partial(
+                                self.DSSEmbed,
                                 dss=data.dss,
                                 language_json=language_json,
                                 gambit_planets=data.gambit_planets,
-                            )
+                            ),
+                            droppable=True,
                         )
+                    )
                 case _:
-                    self.embeds.append(
-                        self.SpaceStationEmbed(
-                            space_station=ss,
-                            language_json=language_json,
-                            gambit_planets=data.gambit_planets,
+                    slots.append(
+                        DashboardSlot(
+                            build=partial(
+                                self.SpaceStationEmbed,
+                                space_station=ss,
+                                language_json=language_json,
+                                gambit_planets=data.gambit_planets,
+                            ),
+                            droppable=True,
                         )
                     )
 
         # Global Resources
         for gr in data.global_resources:
-            self.embeds.append(self.GlobalResourceEmbed(global_resource=gr))
+            slots.append(
+                DashboardSlot(
+                    build=partial(self.GlobalResourceEmbed, global_resource=gr),
+                    droppable=True,
+                )
+            )
 
         # Invasion Events Embed
-        if invasion_events := [
-            c
-            for c in data.campaigns
-            if c.type == CampaignType.Event
-            and c.planet.event
-            and c.planet.event.type == EventType.Invasion
-        ]:
-            self.embeds.append(
-                self.InvasionEventsEmbed(
-                    invasion_event_campaigns=invasion_events,
-                    language_json=language_json,
-                    total_players=data.total_players,
-                    compact_level=compact_level,
+        if model.invasion_events:
+            slots.append(
+                DashboardSlot(
+                    build=partial(
+                        self.InvasionEventsEmbed,
+                        invasion_event_campaigns=model.invasion_events,
+                        language_json=language_json,
+                        total_players=data.total_players,
+                    ),
+                    compact_levels=compact_levels,
                 )
             )
 
         # Urgent Liberations Embed
-        if urgent_liberations := [
-            c
-            for c in data.campaigns
-            if c.planet.event and c.planet.event.type == EventType.UrgentLiberation
-        ]:
-            self.embeds.append(
-                self.UrgentLiberationsEmbed(
-                    urgent_lib_campaigns=urgent_liberations,
-                    language_json=language_json,
-                    total_players=data.total_players,
-                    compact_level=compact_level,
+        if model.urgent_liberations:
+            slots.append(
+                DashboardSlot(
+                    build=partial(
+                        self.UrgentLiberationsEmbed,
+                        urgent_lib_campaigns=model.urgent_liberations,
+                        language_json=language_json,
+                        total_players=data.total_players,
+                    ),
+                    compact_levels=compact_levels,
                 )
             )
 
         # Defence Campaigns Embed
-        if defence_campaigns := [
-            c
-            for c in data.campaigns
-            if c.type == CampaignType.Event
-            and c.planet.event
-            and c.planet.event.type == EventType.Defence
-        ]:
-            eagle_storm = data.dss.get_ta_by_name("EAGLE STORM") if data.dss else None
-            self.embeds.append(
-                self.DefenceEventsEmbed(
-                    defence_event_campaigns=defence_campaigns,
-                    language_json=language_json,
-                    total_players=data.total_players,
-                    eagle_storm=eagle_storm,
-                    gambit_planets=data.gambit_planets,
-                    compact_level=compact_level,
+        if model.defence_campaigns:
+            slots.append(
+                DashboardSlot(
+                    build=partial(
+                        self.DefenceEventsEmbed,
+                        defence_event_campaigns=model.defence_campaigns,
+                        language_json=language_json,
+                        total_players=data.total_players,
+                        eagle_storm=model.eagle_storm,
+                        gambit_planets=data.gambit_planets,
+                    ),
+                    compact_levels=compact_levels,
                 )
             )
 
         # Recon Campaigns Embed
-        if recon_campaigns := [
-            c for c in data.campaigns if c.type == CampaignType.Recon
-        ]:
-            self.embeds.append(
-                self.ReconCampaignEmbed(
-                    recon_campaigns=recon_campaigns,
-                    language_json=language_json,
-                    total_players=data.total_players,
-                    compact_level=compact_level,
+        if model.recon_campaigns:
+            slots.append(
+                DashboardSlot(
+                    build=partial(
+                        self.ReconCampaignEmbed,
+                        recon_campaigns=model.recon_campaigns,
+                        language_json=language_json,
+                        total_players=data.total_players,
+                    )
                 )
             )
 
         # Liberation Campaign Embeds
-        faction_campaigns = [
-            (
-                f,
-                [
-                    c
-                    for c in data.campaigns
-                    if c.faction.full_name == f
-                    and not c.type
-                    in (
-                        CampaignType.Recon,
-                        CampaignType.Event,
-                        CampaignType.HighPriority,
-                    )
-                    and not c.planet.event
-                    and not c.planet.homeworld
-                ],
+        for faction, campaigns in model.faction_campaigns:
+            slots.append(
+                DashboardSlot(
+                    build=partial(
+                        self.AttackEmbed,
+                        campaigns=campaigns,
+                        language_json=language_json,
+                        faction=faction,
+                        total_players=data.total_players,
+                        gambit_planets=data.gambit_planets,
+                        planets=data.planets,
+                    ),
+                    compact_levels=compact_levels,
+                )
             )
-            for f in ["Illuminate", "Terminids", "Automaton"]
-        ]
-        sorted_campaigns = sorted(
-            faction_campaigns,
-            key=lambda x: sum([c.planet.stats.player_count for c in x[1]]),
-            reverse=True,
-        )
-        for faction, campaigns in sorted_campaigns:
-            self.embeds.append(
-                self.AttackEmbed(
-                    campaigns=campaigns,
+
+        slots.append(
+            DashboardSlot(
+                build=partial(
+                    self.FooterEmbed,
                     language_json=language_json,
-                    faction=faction,
                     total_players=data.total_players,
-                    gambit_planets=data.gambit_planets,
-                    planets=data.planets,
-                    compact_level=compact_level,
+                    steam_players=data.steam_player_count,
+                    data_time=data.formatted_at,
                 )
             )
-
-        self.embeds.append(
-            self.FooterEmbed(
-                language_json=language_json,
-                total_players=data.total_players,
-                steam_players=data.steam_player_count,
-                data_time=data.formatted_at,
-            )
         )
 
-        for embed in self.embeds.copy():
-            if len(embed.fields) == 0:
-                self.embeds.remove(embed)
-            else:
-                # add blank line (max size, dont change)
-                embed.set_image("https://i.imgur.com/cThNy4f.png")
-
-        embeds_to_skip = (
-            self.DSSEmbed,
-            self.SpaceStationEmbed,
-            self.GlobalResourceEmbed,
-        )
-        if self.compact_level > 0:
-            self.embeds = [
-                embed
-                for embed in self.embeds.copy()
-                if type(embed) not in embeds_to_skip[: self.compact_level]
-            ]
+        self.layout = fit_layout(slots)
+        self.embeds: list[Embed] = [
+            embed
+            for slot, option in zip(slots, self.layout)
+            if (embed := slot.variant(option)) is not None
+        ]
 
     def character_count(self):
-        total_characters = 0
-        for embed in self.embeds:
-            if embed.title:
-                total_characters += len(embed.title.strip())
-            if embed.description:
-                total_characters += len(embed.description.strip())
-            if embed.footer:
-                total_characters += len(embed._footer.get("text", "").strip())
-            if embed.author:
-                total_characters += len(embed._author.get("name", "").strip())
-            if embed.fields:
-                for field in embed.fields:
-                    total_characters += len(field.name.strip())
-                    total_characters += len(field.value.strip())
-        return total_characters
+        return sum(embed_character_count(embed) for embed in self.embeds)
 
     class HomeworldCampaignEmbed(Embed, EmbedReprMixin):
         def __init__(
@@ -441,7 +616,7 @@ class Dashboard:
                                 planet = self.planets.get(task.planet_index)
                                 if not planet:
                                     continue
-                                end_time_info = get_end_time(
+                                end_time_info = END_TIMES.get(
                                     source_planet=planet,
                                     gambit_planets=self.gambit_planets,
                                 )
@@ -465,7 +640,7 @@ class Dashboard:
                                     ):
                                         continue
                                     else:
-                                        end_time_info = get_end_time(
+                                        end_time_info = END_TIMES.get(
                                             source_planet=planet,
                                             gambit_planets=self.gambit_planets,
                                         )
@@ -505,7 +680,7 @@ class Dashboard:
                             if len(defence_events) >= required_wins:
                                 victory_timestamps = []
                                 for planet in defence_events:
-                                    end_time_info = get_end_time(
+                                    end_time_info = END_TIMES.get(
                                         source_planet=planet,
                                         gambit_planets=self.gambit_planets,
                                     )
@@ -528,7 +703,7 @@ class Dashboard:
                                 planet = self.planets.get(task.planet_index)
                                 if planet is None:
                                     continue
-                                end_time_info = get_end_time(
+                                end_time_info = END_TIMES.get(
                                     source_planet=planet,
                                     gambit_planets=self.gambit_planets,
                                 )
@@ -572,7 +747,7 @@ class Dashboard:
                                     ):
                                         continue
                                     else:
-                                        end_time_info = get_end_time(
+                                        end_time_info = END_TIMES.get(
                                             source_planet=planet,
                                             gambit_planets=self.gambit_planets,
                                         )
@@ -1281,7 +1456,7 @@ class Dashboard:
                             for near_planet_index in planet.nearby:
                                 near_planet = self.planets.get(near_planet_index)
                                 if near_planet and near_planet.active_campaign:
-                                    end_time_info = get_end_time(
+                                    end_time_info = END_TIMES.get(
                                         source_planet=near_planet,
                                         gambit_planets=self.gambit_planets,
                                     )
@@ -1390,7 +1565,7 @@ class Dashboard:
             if task.planet_index != None:
                 planet = self.planets.get(task.planet_index)
                 if planet.event:
-                    end_time_info = get_end_time(planet, self.gambit_planets)
+                    end_time_info = END_TIMES.get(planet, self.gambit_planets)
                     if (
                         end_time_info.end_time
                         and end_time_info.end_time < self.assignment.ends_at_datetime
@@ -1423,7 +1598,7 @@ class Dashboard:
                     if p._sector == task.sector_index and p.event
                 ]
                 for planet in planets_in_sector:
-                    end_time_info = get_end_time(planet, self.gambit_planets)
+                    end_time_info = END_TIMES.get(planet, self.gambit_planets)
                     if (
                         end_time_info.end_time
                         and end_time_info.end_time < self.assignment.ends_at_datetime
@@ -1447,7 +1622,7 @@ class Dashboard:
                         and p.event.faction == task.faction
                     ]
                     for planet in planets_for_faction:
-                        end_time_info = get_end_time(planet, self.gambit_planets)
+                        end_time_info = END_TIMES.get(planet, self.gambit_planets)
                         if (
                             end_time_info.end_time
                             and end_time_info.end_time
@@ -1474,7 +1649,7 @@ class Dashboard:
                 else:
                     planet_events = [p for p in self.planets.values() if p.event]
                     for planet in planet_events:
-                        end_time_info = get_end_time(planet, self.gambit_planets)
+                        end_time_info = END_TIMES.get(planet, self.gambit_planets)
                         if (
                             end_time_info.end_time
                             and end_time_info.end_time
@@ -1649,7 +1824,7 @@ class Dashboard:
                             not planet.event and planet.faction != task.faction
                         ):
                             continue
-                    end_time_info = get_end_time(planet, self.gambit_planets)
+                    end_time_info = END_TIMES.get(planet, self.gambit_planets)
                     if planet.event:
                         if (
                             planet.event.end_time_datetime
@@ -1771,7 +1946,7 @@ class Dashboard:
                 for planet in (
                     p for p in self.planets.values() if p.stats.player_count > 200
                 ):
-                    end_time_info = get_end_time(planet, self.gambit_planets)
+                    end_time_info = END_TIMES.get(planet, self.gambit_planets)
                     if end_time_info.end_time:
                         if (
                             not planet.event
@@ -1801,7 +1976,7 @@ class Dashboard:
                 if task.planet_index is not None:
                     planet = self.planets.get(task.planet_index)
                     if planet is not None:
-                        end_time_info = get_end_time(
+                        end_time_info = END_TIMES.get(
                             source_planet=planet,
                             gambit_planets=self.gambit_planets,
                         )
@@ -1986,7 +2161,7 @@ class Dashboard:
             )
             move_datetime = dss.move_timer_datetime
             because_of_planet = False
-            end_time_info = get_end_time(dss.planet, gambit_planets)
+            end_time_info = END_TIMES.get(dss.planet, gambit_planets)
             if end_time_info.end_time and end_time_info.end_time < move_datetime:
                 move_datetime = end_time_info.end_time
                 because_of_planet = True
@@ -2088,7 +2263,7 @@ class Dashboard:
             )
             if space_station.votes:
                 because_of_planet = False
-                end_time_info = get_end_time(space_station.planet, gambit_planets)
+                end_time_info = END_TIMES.get(space_station.planet, gambit_planets)
                 if end_time_info.end_time and end_time_info.end_time < move_datetime:
                     move_datetime = end_time_info.end_time
                     because_of_planet = True
@@ -2211,7 +2386,7 @@ class Dashboard:
             field_value += f"\n{self.language_json['ends']} **<t:{int(campaign.planet.event.end_time_datetime.timestamp())}:R>**"
             field_value += f"\n{self.language_json['embeds']['Dashboard']['DefenceEmbed']['invasion_level']} **{campaign.planet.event.level}**{campaign.planet.event.level_exclamation}"
 
-            calculated_end_time = get_end_time(campaign.planet)
+            calculated_end_time = END_TIMES.get(campaign.planet)
             if calculated_end_time.end_time and (
                 self.now
                 < calculated_end_time.end_time
@@ -2341,7 +2516,7 @@ class Dashboard:
             field_value += f"\n{self.language_json['ends']} **<t:{int(campaign.planet.event.end_time_datetime.timestamp())}:R>**"
             field_value += f"\n{self.language_json['embeds']['Dashboard']['UrgentLiberationsEmbed']['urgency_level']} **{campaign.planet.event.level}**{campaign.planet.event.level_exclamation}"
 
-            calculated_end_time = get_end_time(campaign.planet)
+            calculated_end_time = END_TIMES.get(campaign.planet)
             if calculated_end_time.end_time and (
                 self.now
                 < calculated_end_time.end_time
@@ -2478,7 +2653,7 @@ class Dashboard:
             field_value += f"\n{self.language_json['ends']} **<t:{int(planet.event.end_time_datetime.timestamp())}:R>**"
             field_value += f"\n{self.language_json['embeds']['Dashboard']['DefenceEmbed']['invasion_level']} **{planet.event.level}**{planet.event.level_exclamation}"
 
-            calculated_end_time = get_end_time(planet, self.gambit_planets)
+            calculated_end_time = END_TIMES.get(planet, self.gambit_planets)
             if calculated_end_time.end_time and (
                 self.now < calculated_end_time.end_time < planet.event.end_time_datetime
             ):
@@ -2679,7 +2854,7 @@ class Dashboard:
                     if campaign.planet.regen_perc_per_hour < 0.001:
                         field_value += f"\n-# :warning: {campaign.planet.regen_perc_per_hour:+.2%}/hr :warning:"
 
-                    calc_end_time = get_end_time(campaign.planet)
+                    calc_end_time = END_TIMES.get(campaign.planet)
                     if calc_end_time.end_time:
                         if calc_end_time.regions:
                             regions_list = f"\n-# ".join(
@@ -2781,6 +2956,9 @@ class Dashboard:
                     )
 
     class FooterEmbed(Embed, EmbedReprMixin):
+        # the "Updated" line changes every edit, fingerprints leave it out
+        volatile_fields = (0,)
+
         def __init__(
             self,
             language_json: dict,
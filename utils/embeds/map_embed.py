@@ -0,0 +1,15 @@
+from datetime import datetime, timezone
+from disnake import Colour, Embed
+from utils.mixins import EmbedReprMixin
+
+
+class MapEmbed(Embed, EmbedReprMixin):
+    # the "Updated" line changes every edit, fingerprints leave it out
+    volatile_fields = (0,)
+
+    def __init__(self, map_link: str):
+        super().__init__(colour=Colour.dark_embed())
+        self.set_image(url=map_link)
+        self.add_field(
+            "", f"-# Updated <t:{int(datetime.now(tz=timezone.utc).timestamp())}:R>"
+        )
@@ -1,13 +1,14 @@
 from .compare_translations import compare_translations
 from .dict_empty import dict_empty
 from .arrowhead_format import arrowhead_format
-from .get_end_time import get_end_time
+from .get_end_time import END_TIMES, get_end_time
 from .health_bar import health_bar
 from .ordinal import ordinal
 from .short_format import short_format
 from .split_long_string import split_long_string
 
 __all__ = [
+    "END_TIMES",
     "compare_translations",
     "dict_empty",
     "arrowhead_format",
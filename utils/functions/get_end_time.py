@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta, timezone
 from utils.dataclasses import CalculatedEndTime, Factions
+from utils.mixins import ReprMixin
 from ..api_wrapper.models.planet import Planet
 
 
@@ -30,7 +31,7 @@ def get_end_time(
         # Gambit win
         if source_planet.index in gambit_planets:
             gambit_planet = gambit_planets[source_planet.index]
-            gambit_planet_end_time_info = get_end_time(gambit_planet)
+            gambit_planet_end_time_info = END_TIMES.get(gambit_planet)
             if gambit_planet_end_time_info.end_time:
                 if (
                     not results.end_time
@@ -245,3 +246,49 @@ def get_end_time(
                 results.end_time = source_planet.tracker.complete_time
 
     return results
+
+
+class EndTimeProjections(ReprMixin):
+    def __init__(self):
+        """Memoises `get_end_time` per planet for the current `FormattedData` version
+
+        Trackers only move when a new version is built, so each planet is projected once per cycle
+        """
+        self.version: int | None = None
+        self._projections: dict[
+            tuple[int | None, int, bool], tuple[Planet, CalculatedEndTime]
+        ] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def advance(self, version: int) -> None:
+        """Drop the projections of older versions"""
+        if version != self.version:
+            self.version = version
+            self._projections.clear()
+
+    def get(
+        self, source_planet: Planet, gambit_planets: dict[int, Planet] = None
+    ) -> CalculatedEndTime:
+        with_gambit = bool(gambit_planets) and source_planet.index in gambit_planets
+        key = (self.version, source_planet.index, with_gambit)
+        cached = self._projections.get(key)
+        # planets are rebuilt every version, so an old planet never gets a newer projection
+        if cached and cached[0] is source_planet:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        projection = get_end_time(
+            source_planet=source_planet,
+            gambit_planets=gambit_planets if with_gambit else None,
+        )
+        self._projections[key] = (source_planet, projection)
+        return projection
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+END_TIMES = EndTimeProjections()
@@ -1,4 +1,4 @@
-from asyncio import sleep
+from datetime import datetime, timezone
 from disnake import (
     Embed,
     Forbidden,
@@ -9,21 +9,58 @@ from disnake import (
 )
 from disnake.ext.commands import AutoShardedInteractionBot
 from disnake.ui import Container
-from utils.dbv2 import Feature, GWWGuilds, GWWGuild
+from functools import partial
+from hashlib import blake2b
+from json import dumps
+from time import monotonic
+from typing import Awaitable, Callable
+from utils.broadcaster import (
+    ANNOUNCEMENT_TYPE_PRIORITIES,
+    BroadcastResult,
+    Broadcaster,
+    DeliveryStatus,
+)
+from utils.dbv2 import Feature, GUILD_REGISTRY, GWWGuilds, GWWGuild, run_in_db_thread
 from utils.interactables import WikiButton
 from utils.mixins import ReprMixin
 
-# Time to wait between feature updates to avoid rate limits (in seconds)
-WAIT_TIME = 0.035
+# How long an unchanged payload goes without being edited again, refreshing its "Updated" line (in seconds)
+UNCHANGED_EDIT_INTERVALS = {
+    "dashboards": 60 * 60,
+    "maps": 3 * 60 * 60,
+}
+
+
+def payload_fingerprint(embeds: list[Embed]) -> str:
+    """Hash of what the embeds show, leaving out the fields an embed marks as `volatile_fields`"""
+    payload = []
+    for embed in embeds:
+        embed_dict = embed.to_dict()
+        if volatile_fields := getattr(embed, "volatile_fields", ()):
+            embed_dict["fields"] = [
+                field
+                for index, field in enumerate(embed_dict.get("fields", []))
+                if index not in volatile_fields
+            ]
+        payload.append(embed_dict)
+    return blake2b(dumps(payload, sort_keys=True).encode(), digest_size=16).hexdigest()
 
 
 class InterfaceHandler:
     def __init__(self, bot: AutoShardedInteractionBot):
-        self.wait_time = WAIT_TIME
         self.bot = bot
-        self.busy = False
+        self.broadcaster = Broadcaster()
         self.loaded = False
-        all_guilds = GWWGuilds(fetch_all=True)
+        # message ID -> fingerprint and time of the last successful edit, by feature
+        self.last_edits: dict[str, dict[int, tuple[str, float]]] = {
+            feature_type: {} for feature_type in UNCHANGED_EDIT_INTERVALS
+        }
+        # message ID -> when it was last edited or found to be up to date, by feature
+        self.confirmed_at: dict[str, dict[int, datetime]] = {
+            feature_type: {} for feature_type in UNCHANGED_EDIT_INTERVALS
+        }
+        GUILD_REGISTRY.load()
+        all_guilds = GUILD_REGISTRY.all()
         self.dashboards = BaseFeatureInteractionHandler(
             features=[
                 f for g in all_guilds for f in g.features if f.name == "dashboards"
@@ -116,48 +153,85 @@ class InterfaceHandler:
         self.loaded = True
         self.bot.logger.info("InterfaceHandler has been populated")
 
-    async def edit_dashboard(self, message: PartialMessage, embeds: list[Embed]):
+    async def _remove_feature(
+        self, feature_type: str, guild_id: int
+    ) -> GWWGuild | None:
+        """Stop sending `feature_type` to this guild and remove it from the DB"""
+        self.lists[feature_type].remove_entry(guild_id)
+        guild: GWWGuild | None = await run_in_db_thread(
+            GWWGuilds.get_specific_guild, guild_id
+        )
+        if guild:
+            guild.features = [f for f in guild.features if f.name != feature_type]
+            await run_in_db_thread(guild.update_features)
+        return guild
+
+    def _record_edit(
+        self, feature_type: str, message: PartialMessage, fingerprint: str | None
+    ) -> None:
+        if fingerprint:
+            self.last_edits[feature_type][message.id] = (fingerprint, monotonic())
+            self.confirmed_at[feature_type][message.id] = datetime.now(tz=timezone.utc)
+
+    def _is_unchanged(
+        self, feature_type: str, message: PartialMessage, fingerprint: str
+    ) -> bool:
+        """If `message` already shows `fingerprint` and was edited recently enough"""
+        last_edit = self.last_edits[feature_type].get(message.id)
+        return (
+            last_edit is not None
+            and last_edit[0] == fingerprint
+            and monotonic() - last_edit[1] < UNCHANGED_EDIT_INTERVALS[feature_type]
+        )
+
+    async def edit_dashboard(
+        self,
+        message: PartialMessage,
+        embeds: list[Embed],
+        fingerprint: str | None = None,
+    ) -> DeliveryStatus:
         try:
             await message.edit(embeds=embeds)
+            self._record_edit("dashboards", message, fingerprint)
+            return DeliveryStatus.SENT
         except (NotFound, Forbidden) as e:
-            self.dashboards.remove_entry(message.guild.id)
-            guild: GWWGuild = GWWGuilds.get_specific_guild(message.guild.id)
-            guild.features = [f for f in guild.features if f.name != "dashboards"]
-            guild.update_features()
-            return self.bot.logger.error(
-                f"edit_dashboard | {guild.language} | {e} | reset in DB | {guild.guild_id = }"
+            guild = await self._remove_feature("dashboards", message.guild.id)
+            self.bot.logger.error(
+                f"edit_dashboard | {guild.language if guild else None} | {e} | reset in DB | {message.guild.id = }"
             )
+            return DeliveryStatus.REMOVED
         except HTTPException as e:
             if "Thread is archived" in e.text:
-                self.dashboards.remove_entry(message.guild.id)
-                guild: GWWGuild = GWWGuilds.get_specific_guild(message.guild.id)
-                guild.features = [f for f in guild.features if f.name != "dashboards"]
-                guild.update_features()
-                return self.bot.logger.error(
-                    f"edit_dashboard | {guild.language} | {e} | reset in DB | {guild.guild_id = }"
+                guild = await self._remove_feature("dashboards", message.guild.id)
+                self.bot.logger.error(
+                    f"edit_dashboard | {guild.language if guild else None} | {e} | reset in DB | {message.guild.id = }"
                 )
+                return DeliveryStatus.REMOVED
             else:
-                return self.bot.logger.warning(
+                self.bot.logger.warning(
                     f"edit_dashboard | HTTPException | {e} | {message.guild.id = }"
                 )
+                return DeliveryStatus.FAILED
         except Exception as e:
-            return self.bot.logger.error(
-                f"edit_dashboard | {e} | {message.guild.id = }"
-            )
+            self.bot.logger.error(f"edit_dashboard | {e} | {message.guild.id = }")
+            return DeliveryStatus.FAILED
 
-    async def edit_map(self, message: PartialMessage, embed: Embed):
+    async def edit_map(
+        self, message: PartialMessage, embed: Embed, fingerprint: str | None = None
+    ) -> DeliveryStatus:
         try:
             await message.edit(embed=embed)
+            self._record_edit("maps", message, fingerprint)
+            return DeliveryStatus.SENT
         except (NotFound, Forbidden) as e:
-            self.maps.remove_entry(message.guild.id)
-            guild: GWWGuild = GWWGuilds.get_specific_guild(message.guild.id)
-            guild.features = [f for f in guild.features if f.name != "maps"]
-            guild.update_features()
-            return self.bot.logger.error(
-                f"edit_map | {e} | reset in DB | {guild.guild_id = }"
+            await self._remove_feature("maps", message.guild.id)
+            self.bot.logger.error(
+                f"edit_map | {e} | reset in DB | {message.guild.id = }"
             )
+            return DeliveryStatus.REMOVED
         except Exception as e:
-            return self.bot.logger.error(f"edit_map | {e} | {message.guild.id = }")
+            self.bot.logger.error(f"edit_map | {e} | {message.guild.id = }")
+            return DeliveryStatus.FAILED
 
     async def send_embeds(
         self,
@@ -165,152 +239,140 @@ class InterfaceHandler:
         channel: TextChannel,
         embeds: list[Embed],
         components: list,
-    ):
+    ) -> DeliveryStatus:
         try:
             await channel.send(embeds=embeds, components=components)
+            return DeliveryStatus.SENT
         except (NotFound, Forbidden) as e:
-            feature_list: BaseFeatureInteractionHandler = getattr(self, feature_type)
-            if channel in feature_list:
-                feature_list.remove(channel)
-            guild: GWWGuild = GWWGuilds.get_specific_guild(channel.guild.id)
-            guild.features = [f for f in guild.features if f.name != feature_type]
-            guild.update_features()
-            return self.bot.logger.error(
+            await self._remove_feature(feature_type, channel.guild.id)
+            self.bot.logger.error(
                 f"send_embed {feature_type} | {e} | reset in DB | {channel.guild.id = }"
             )
+            return DeliveryStatus.REMOVED
         except Exception as e:
-            return self.bot.logger.error(
+            self.bot.logger.error(
                 f"send_embed {feature_type} | {e} | {channel.guild.id = }"
             )
+            return DeliveryStatus.FAILED
 
     async def send_component(
         self,
         feature_type: str,
         channel: TextChannel,
         container: Container,
-    ):
+    ) -> DeliveryStatus:
         try:
             await channel.send(components=container)
+            return DeliveryStatus.SENT
         except (NotFound, Forbidden) as e:
-            feature_list: BaseFeatureInteractionHandler = getattr(self, feature_type)
-            if channel in feature_list:
-                feature_list.remove(channel)
-            guild: GWWGuild = GWWGuilds.get_specific_guild(channel.guild.id)
-            guild.features = [f for f in guild.features if f.name != feature_type]
-            guild.update_features()
-            return self.bot.logger.error(
+            await self._remove_feature(feature_type, channel.guild.id)
+            self.bot.logger.error(
                 f"send_component {feature_type} | {e} | reset in DB | {channel.guild.id = }"
             )
+            return DeliveryStatus.REMOVED
         except Exception as e:
-            return self.bot.logger.error(
+            self.bot.logger.error(
                 f"send_component {feature_type} | {e} | {channel.guild.id = }"
             )
+            return DeliveryStatus.FAILED
 
     async def send_feature(
         self,
         feature_type: str,
         content: dict[str, Embed | Container],
         announcement_type: str = None,
-    ):
-        self.busy = True
+    ) -> BroadcastResult:
         list_to_use: BaseFeatureInteractionHandler = getattr(self, feature_type)
-        components = None
-        guild_map = {g.guild_id: g for g in GWWGuilds(fetch_all=True)}
-        match feature_type:
-            case "dashboards":
-                for message in list_to_use.copy():
-                    message: PartialMessage
-                    guild: GWWGuild = guild_map.get(message.guild.id)
-                    if not guild:
-                        if message in list_to_use:
-                            list_to_use.remove(message)
-                        self.bot.logger.error(
-                            f"send_feature {feature_type} | guild not found in DB | {message.guild.id = }"
-                        )
-                        continue
-                    else:
-                        localized_dashboard = content.get(guild.language, content["en"])
-                        self.bot.loop.create_task(
-                            self.edit_dashboard(message, localized_dashboard.embeds)
-                        )
-                        await sleep(self.wait_time)
-            case "maps":
-                for message in list_to_use.copy():
-                    message: PartialMessage
-                    guild: GWWGuild = guild_map.get(message.guild.id)
-                    if not guild:
-                        if message in list_to_use:
-                            list_to_use.remove(message)
-                        self.bot.logger.error(
-                            f"send_feature {feature_type} | guild not found in DB | {message.guild.id = }"
-                        )
-                        continue
-                    else:
-                        self.bot.loop.create_task(
-                            self.edit_map(message, content[guild.language])
-                        )
-                        await sleep(self.wait_time)
-            case (
-                "war_announcements"
-                | "dss_announcements"
-                | "detailed_dispatches"
-                | "region_announcements"
-            ):
-                for channel in list_to_use.copy():
-                    guild = guild_map.get(channel.guild.id)
-                    if not guild:
-                        if message in list_to_use:
-                            list_to_use.remove(channel)
-                        self.bot.logger.error(
-                            f"send_feature {feature_type} {announcement_type} | guild not found in DB | {channel.guild.id = }"
-                        )
-                        continue
-                    else:
-                        if announcement_type == "MO":
-                            components = [
-                                WikiButton(
-                                    link=f"https://helldivers.wiki.gg/wiki/Major_Orders#Recent"
-                                )
-                            ]
-                            self.bot.loop.create_task(
-                                self.send_embeds(
-                                    feature_type,
-                                    channel,
-                                    content[guild.language],
-                                    components,
-                                )
-                            )
-                        else:
-                            self.bot.loop.create_task(
-                                self.send_component(
-                                    feature_type=feature_type,
-                                    channel=channel,
-                                    container=content[guild.language],
-                                )
+        jobs: list[tuple[int, Callable[[], Awaitable[DeliveryStatus]]]] = []
+        fingerprints: dict[str, str] = {}
+        skipped = 0
+        if feature_type in self.last_edits:
+            for language, payload in content.items():
+                fingerprints[language] = payload_fingerprint(
+                    payload.embeds if feature_type == "dashboards" else [payload]
+                )
+            # forget messages that are no longer in the list
+            self.last_edits[feature_type] = {
+                entry.id: last_edit
+                for entry in list_to_use
+                if (last_edit := self.last_edits[feature_type].get(entry.id))
+            }
+            self.confirmed_at[feature_type] = {
+                entry.id: confirmed_at
+                for entry in list_to_use
+                if (confirmed_at := self.confirmed_at[feature_type].get(entry.id))
+            }
+        for entry in list_to_use.copy():
+            entry: PartialMessage | TextChannel
+            language = GUILD_REGISTRY.language_of(entry.guild.id)
+            if not language:
+                if entry in list_to_use:
+                    list_to_use.remove(entry)
+                self.bot.logger.error(
+                    f"send_feature {feature_type} {announcement_type} | guild not found in DB | {entry.guild.id = }"
+                )
+                continue
+            if feature_type in self.last_edits:
+                fingerprint = fingerprints.get(language, fingerprints.get("en"))
+                if self._is_unchanged(feature_type, entry, fingerprint):
+                    self.confirmed_at[feature_type][entry.id] = datetime.now(
+                        tz=timezone.utc
+                    )
+                    skipped += 1
+                    continue
+            match feature_type:
+                case "dashboards":
+                    localized_dashboard = content.get(language, content["en"])
+                    job = partial(
+                        self.edit_dashboard,
+                        entry,
+                        localized_dashboard.embeds,
+                        fingerprint,
+                    )
+                case "maps":
+                    job = partial(self.edit_map, entry, content[language], fingerprint)
+                case (
+                    "war_announcements"
+                    | "dss_announcements"
+                    | "detailed_dispatches"
+                    | "region_announcements"
+                ):
+                    if announcement_type == "MO":
+                        components = [
+                            WikiButton(
+                                link=f"https://helldivers.wiki.gg/wiki/Major_Orders#Recent"
                             )
-                        await sleep(self.wait_time)
-            case _:
-                for channel in list_to_use.copy():
-                    channel: TextChannel
-                    guild = guild_map.get(channel.guild.id)
-                    if not guild:
-                        if channel in list_to_use:
-                            list_to_use.remove(channel)
-                        self.bot.logger.error(
-                            f"send_feature {feature_type} {announcement_type} | guild not found in DB | {channel.guild.id = }"
+                        ]
+                        job = partial(
+                            self.send_embeds,
+                            feature_type,
+                            entry,
+                            content[language],
+                            components,
                         )
-                        continue
                     else:
-                        self.bot.loop.create_task(
-                            self.send_embeds(
-                                feature_type,
-                                channel,
-                                content[guild.language],
-                                components,
-                            )
+                        job = partial(
+                            self.send_component,
+                            feature_type=feature_type,
+                            channel=entry,
+                            container=content[language],
                         )
-                        await sleep(self.wait_time)
-        self.busy = False
+                case _:
+                    job = partial(
+                        self.send_embeds, feature_type, entry, content[language], None
+                    )
+            channel_id = (
+                entry.channel.id if feature_type in ("dashboards", "maps") else entry.id
+            )
+            jobs.append((channel_id, job))
+        result = await self.broadcaster.run(
+            feature_type=feature_type,
+            jobs=jobs,
+            priority=ANNOUNCEMENT_TYPE_PRIORITIES.get(announcement_type),
+        )
+        result.skipped = skipped
+        self.bot.logger.info(f"send_feature | {result}")
+        return result
 
 
 class BaseFeatureInteractionHandler(list, ReprMixin):
@@ -331,7 +393,9 @@ class BaseFeatureInteractionHandler(list, ReprMixin):
                 else:
                     self.append(channel)
             except (NotFound, Forbidden) as e:
-                guild: GWWGuild = GWWGuilds.get_specific_guild(id=feature.guild_id)
+                guild: GWWGuild = await run_in_db_thread(
+                    GWWGuilds.get_specific_guild, id=feature.guild_id
+                )
                 if not guild:
                     self.bot.logger.error(
                         f"{feature.name}.populate() ERROR | {e} | not found in DB either | {feature.guild_id = }"
@@ -341,7 +405,7 @@ class BaseFeatureInteractionHandler(list, ReprMixin):
                     guild.features = [
                         f for f in guild.features if f.name != feature.name
                     ]
-                    guild.update_features()
+                    await run_in_db_thread(guild.update_features)
                     self.bot.logger.error(
                         f"{feature.name}.populate() ERROR | {e} | reset in DB | {guild.guild_id = }"
                     )
@@ -0,0 +1,703 @@
+from asyncio import (
+    Future,
+    Lock,
+    ensure_future,
+    gather,
+    get_running_loop,
+    shield,
+    to_thread,
+    wait,
+)
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from disnake import File, TextChannel
+from hashlib import blake2b
+from io import BytesIO
+from multiprocessing import get_context, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from numpy import ndarray, uint8
+from os import cpu_count
+from typing import AsyncIterator, Awaitable, Callable
+from utils.dataclasses import Faction, Subfaction
+from utils.maps import PREVIEW_LAYERS, PREVIEW_RESOLUTION, Maps
+from utils.mixins import ReprMixin
+
+# Processes localizing maps in parallel, ideally one per language (there are 9)
+MAP_LOCALIZE_WORKERS = min(9, cpu_count() or 1)
+
+# Rendered maps kept by localized snapshot version and language, enough for two versions
+RENDERED_MAPS_KEPT = 18
+
+# Uploaded map links kept by localized snapshot version and language (and planet for arrow maps)
+UPLOADED_MAPS_KEPT = 64
+
+# How long to wait for the full map before posting a preview of it (in seconds)
+PREVIEW_AFTER = 0.5
+
+# How long an uploaded map's link is reused, Discord's links expire (in seconds)
+UPLOADED_MAP_LIFETIME = 12 * 60 * 60
+
+
+@dataclass(frozen=True)
+class MapEffect:
+    id: int
+    effect_type: int
+    percent: float
+
+
+@dataclass(frozen=True)
+class MapEvent:
+    faction: Faction
+
+
+@dataclass(eq=False)
+class MapPlanet:
+    """The parts of a Planet the map reads, small enough to send to a worker process"""
+
+    index: int
+    name: str
+    names: dict[str, str]
+    sector: str
+    map_waypoints: tuple[int, int]
+    nearby: tuple[int, ...]
+    effect_ids: tuple[int, ...]
+    active_effects: tuple[MapEffect, ...]
+    faction: Faction
+    event: MapEvent | None
+    in_assignment: bool
+    dss_in_orbit: bool
+    active_campaign: bool
+    is_hidden: bool
+    defending_from: tuple[int, ...]
+    regen_perc_per_hour: float
+    subfactions: tuple[Subfaction, ...]
+    in_gloom: bool
+
+    @classmethod
+    def from_planet(cls, planet) -> "MapPlanet":
+        return cls(
+            index=planet.index,
+            name=planet.name,
+            names=dict(planet.names),
+            sector=planet.sector,
+            map_waypoints=planet.map_waypoints,
+            nearby=tuple(planet.nearby),
+            effect_ids=tuple(sorted(planet.effect_ids)),
+            active_effects=tuple(
+                sorted(
+                    (
+                        MapEffect(id=e.id, effect_type=e.effect_type, percent=e.percent)
+                        for e in planet.active_effects
+                    ),
+                    key=lambda e: (e.id, e.effect_type),
+                )
+            ),
+            faction=planet.faction,
+            event=MapEvent(faction=planet.event.faction) if planet.event else None,
+            in_assignment=planet.in_assignment,
+            dss_in_orbit=planet.dss_in_orbit,
+            active_campaign=planet.active_campaign,
+            is_hidden=planet.is_hidden,
+            defending_from=tuple(planet.defending_from),
+            regen_perc_per_hour=planet.regen_perc_per_hour,
+            subfactions=tuple(
+                sorted(planet.subfactions, key=lambda sf: sf.resource_hash)
+            ),
+            in_gloom=planet.in_gloom,
+        )
+
+
+@dataclass(frozen=True)
+class MapTacticalAction:
+    status: int
+
+
+@dataclass(frozen=True)
+class MapDSS:
+    flags: int
+    move_timer_datetime: datetime
+    tactical_actions: tuple[MapTacticalAction, ...]
+
+    @classmethod
+    def from_dss(cls, dss) -> "MapDSS":
+        return cls(
+            flags=dss.flags,
+            move_timer_datetime=dss.move_timer_datetime,
+            tactical_actions=tuple(
+                MapTacticalAction(status=ta.status) for ta in dss.tactical_actions
+            ),
+        )
+
+
+@dataclass(eq=False)
+class MapSnapshot:
+    planets: dict[int, MapPlanet]
+    assignment_ids: tuple[int, ...]
+    dss: MapDSS | None
+    version: str = field(init=False)
+    _localized_versions: dict[str, str] = field(
+        init=False, default_factory=dict, repr=False
+    )
+
+    def __post_init__(self):
+        # the names are only drawn by the localisation, see `localized_version`
+        self.version = blake2b(
+            repr(
+                (
+                    [
+                        {k: v for k, v in vars(planet).items() if k != "names"}
+                        for planet in self.planets.values()
+                    ],
+                    self.assignment_ids,
+                    self.dss,
+                )
+            ).encode(),
+            digest_size=16,
+        ).hexdigest()
+
+    def localized_version(self, language_code_long: str) -> str:
+        """`version` plus the planet names this language's map shows"""
+        if (version := self._localized_versions.get(language_code_long)) is None:
+            version = blake2b(
+                repr(
+                    (
+                        self.version,
+                        language_code_long,
+                        [
+                            planet.names.get(language_code_long, planet.name)
+                            for planet in self.planets.values()
+                        ],
+                    )
+                ).encode(),
+                digest_size=16,
+            ).hexdigest()
+            self._localized_versions[language_code_long] = version
+        return version
+
+    @classmethod
+    def from_data(cls, formatted_data) -> "MapSnapshot":
+        return cls(
+            planets={
+                index: MapPlanet.from_planet(planet)
+                for index, planet in formatted_data.galactic_planets.items()
+            },
+            assignment_ids=tuple(
+                assignment.id for assignment in formatted_data.assignments.get("en", [])
+            ),
+            dss=MapDSS.from_dss(formatted_data.dss) if formatted_data.dss else None,
+        )
+
+
+@dataclass(frozen=True)
+class MapBase:
+    """Where a worker published the base map for the localisation workers"""
+
+    shared_memory_name: str
+    shape: tuple[int, ...]
+    fingerprint: str
+    timings: str
+
+
+# The Maps instance of a worker process, so its layer caches survive between jobs
+_worker_maps: Maps | None = None
+
+# The newest base map the base worker has published
+_published_base: tuple[str, SharedMemory] | None = None
+
+# The base map a localisation worker is attached to
+_attached_base: tuple[str, SharedMemory, ndarray] | None = None
+
+
+def _get_worker_maps() -> Maps:
+    global _worker_maps
+    if _worker_maps is None:
+        _worker_maps = Maps()
+    return _worker_maps
+
+
+def _start_worker() -> None:
+    """Load the map assets as the worker starts rather than on its first job"""
+    maps = _get_worker_maps()
+    maps.empty_map
+    maps.icons
+
+
+def _render_base(snapshot: MapSnapshot) -> MapBase:
+    global _published_base
+    maps = _get_worker_maps()
+    maps.update_base_map(
+        planets=snapshot.planets, assignments=list(snapshot.assignment_ids)
+    )
+    fingerprint = maps.fingerprints[maps.layer_names[-1]]
+    layer = maps.layers[maps.layer_names[-1]]
+    if _published_base is None or _published_base[0] != fingerprint:
+        shared_memory = SharedMemory(create=True, size=layer.nbytes)
+        ndarray(layer.shape, dtype=layer.dtype, buffer=shared_memory.buf)[:] = layer
+        if _published_base is not None:
+            # only closed here, MapRenderer unlinks it once no localisation job needs it
+            _published_base[1].close()
+        _published_base = (fingerprint, shared_memory)
+    return MapBase(
+        shared_memory_name=_published_base[1].name,
+        shape=layer.shape,
+        fingerprint=fingerprint,
+        timings=maps.timing_summary(),
+    )
+
+
+def _attach_base(base: MapBase) -> ndarray:
+    global _attached_base
+    if _attached_base is None or _attached_base[0] != base.shared_memory_name:
+        if _attached_base is not None:
+            _attached_base[1].close()
+        shared_memory = SharedMemory(name=base.shared_memory_name)
+        # the base worker owns the segment, stop this process' tracker unlinking it
+        resource_tracker.unregister(shared_memory._name, "shared_memory")
+        layer = ndarray(base.shape, dtype=uint8, buffer=shared_memory.buf)
+        layer.flags.writeable = False
+        _attached_base = (base.shared_memory_name, shared_memory, layer)
+    return _attached_base[2]
+
+
+def _localize(
+    base: MapBase,
+    snapshot: MapSnapshot,
+    language_code: str,
+    language_code_long: str,
+) -> tuple[bytes, str]:
+    maps = _get_worker_maps()
+    maps.timings.clear()
+    maps.reused.clear()
+    maps.use_base_layer(layer=_attach_base(base), fingerprint=base.fingerprint)
+    maps.localize_map(
+        language_code_short=language_code,
+        language_code_long=language_code_long,
+        planets=snapshot.planets,
+    )
+    maps.add_icons(
+        lang=language_code,
+        long_code=language_code_long,
+        planets=snapshot.planets,
+        dss=snapshot.dss,
+    )
+    return maps.encoded_maps[language_code], maps.timing_summary()
+
+
+def _render_preview(
+    maps: Maps,
+    snapshot: MapSnapshot,
+    language_code: str,
+    language_code_long: str,
+    planet: MapPlanet | None,
+) -> bytes:
+    maps.update_base_map(
+        planets=snapshot.planets, assignments=list(snapshot.assignment_ids)
+    )
+    maps.localize_map(
+        language_code_short=language_code,
+        language_code_long=language_code_long,
+        planets=snapshot.planets,
+    )
+    maps.add_icons(
+        lang=language_code,
+        long_code=language_code_long,
+        planets=snapshot.planets,
+        dss=snapshot.dss,
+    )
+    if planet is not None:
+        return maps.draw_arrow(language_code=language_code, planet=planet)
+    return maps.encoded_maps[language_code]
+
+
+def _render_arrow(
+    base: MapBase,
+    snapshot: MapSnapshot,
+    language_code: str,
+    language_code_long: str,
+    planet: MapPlanet,
+) -> tuple[bytes, str]:
+    _, timings = _localize(
+        base=base,
+        snapshot=snapshot,
+        language_code=language_code,
+        language_code_long=language_code_long,
+    )
+    return (
+        _get_worker_maps().draw_arrow(language_code=language_code, planet=planet),
+        timings,
+    )
+
+
+def _unlink_shared_memory(name: str) -> None:
+    try:
+        shared_memory = SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shared_memory.close()
+    shared_memory.unlink()
+
+
+class MapRenderer(ReprMixin):
+    def __init__(self, localize_workers: int = MAP_LOCALIZE_WORKERS):
+        """Renders maps in worker processes so the event loop stays free
+
+        One worker draws the base map and keeps its layer caches warm,
+        the languages are then localized in parallel from that shared base.
+        Identical jobs that overlap share one render"""
+        self.localize_workers = localize_workers
+        self._base_executor: ProcessPoolExecutor | None = None
+        self._localize_executor: ProcessPoolExecutor | None = None
+        self._in_flight: dict[tuple, Future] = {}
+        self._rendered_maps: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._uploaded_maps: OrderedDict[tuple, Maps.LatestMap] = OrderedDict()
+        self._uploading: dict[tuple, Future] = {}
+        # shared memory names of the base maps not unlinked yet, the newest last
+        self._published_bases: list[str] = []
+        # shared memory name -> localisation jobs in flight that read it
+        self._base_readers: dict[str, int] = {}
+        self._preview_maps = Maps(
+            resolution=PREVIEW_RESOLUTION, layer_names=PREVIEW_LAYERS, with_icons=False
+        )
+        self._preview_lock = Lock()
+        self.renders = 0
+        self.deduplicated = 0
+        self.uploads = 0
+        self.uploads_skipped = 0
+        self.last_timings = ""
+
+    @property
+    def base_executor(self) -> ProcessPoolExecutor:
+        if self._base_executor is None:
+            self._base_executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=get_context("spawn"),
+                initializer=_start_worker,
+            )
+        return self._base_executor
+
+    @property
+    def localize_executor(self) -> ProcessPoolExecutor:
+        if self._localize_executor is None:
+            self._localize_executor = ProcessPoolExecutor(
+                max_workers=self.localize_workers,
+                mp_context=get_context("spawn"),
+                initializer=_start_worker,
+            )
+        return self._localize_executor
+
+    async def _submit(self, key: tuple, base: bool, function: Callable, *args):
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+        else:
+            executor = self.base_executor if base else self.localize_executor
+            future = get_running_loop().run_in_executor(executor, function, *args)
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            if not base:
+                # localisation jobs take their MapBase first and read it until they finish
+                name = args[0].shared_memory_name
+                self._base_readers[name] = self._base_readers.get(name, 0) + 1
+                future.add_done_callback(lambda _: self._release_base(name))
+            self._in_flight[key] = future
+            self.renders += 1
+        try:
+            return await shield(future)
+        except BrokenProcessPool:
+            if base:
+                self._base_executor = None
+            else:
+                self._localize_executor = None
+            raise
+
+    async def _render_base(self, snapshot: MapSnapshot) -> MapBase:
+        base: MapBase = await self._submit(
+            ("base", snapshot.version), True, _render_base, snapshot
+        )
+        if base.shared_memory_name not in self._published_bases:
+            self._published_bases.append(base.shared_memory_name)
+            self._unlink_unused_bases()
+        return base
+
+    def _release_base(self, name: str) -> None:
+        if name not in self._base_readers:
+            # released by close()
+            return
+        self._base_readers[name] -= 1
+        if not self._base_readers[name]:
+            del self._base_readers[name]
+            self._unlink_unused_bases()
+
+    def _unlink_unused_bases(self) -> None:
+        """Unlink the shared memory of older base maps no localisation job is reading"""
+        for name in self._published_bases[:-1]:
+            if name not in self._base_readers:
+                self._published_bases.remove(name)
+                _unlink_shared_memory(name)
+
+    async def render_map(
+        self, snapshot: MapSnapshot, language_code: str, language_code_long: str
+    ) -> bytes:
+        """The encoded map for this language"""
+        key = (snapshot.localized_version(language_code_long), language_code)
+        if (image := self._rendered_maps.get(key)) is not None:
+            self._rendered_maps.move_to_end(key)
+            return image
+        base = await self._render_base(snapshot=snapshot)
+        image, timings = await self._submit(
+            ("map", snapshot.localized_version(language_code_long), language_code),
+            False,
+            _localize,
+            base,
+            snapshot,
+            language_code,
+            language_code_long,
+        )
+        self.last_timings = f"{base.timings} | {timings}"
+        self._rendered_maps[key] = image
+        while len(self._rendered_maps) > RENDERED_MAPS_KEPT:
+            self._rendered_maps.popitem(last=False)
+        return image
+
+    async def render_arrow(
+        self,
+        snapshot: MapSnapshot,
+        language_code: str,
+        language_code_long: str,
+        planet: MapPlanet,
+    ) -> bytes:
+        """The encoded map for this language with an arrow pointing at the planet"""
+        base = await self._render_base(snapshot=snapshot)
+        image, timings = await self._submit(
+            (
+                "arrow",
+                snapshot.localized_version(language_code_long),
+                language_code,
+                planet.index,
+            ),
+            False,
+            _render_arrow,
+            base,
+            snapshot,
+            language_code,
+            language_code_long,
+            planet,
+        )
+        self.last_timings = f"{base.timings} | {timings}"
+        return image
+
+    async def render_preview(
+        self,
+        snapshot: MapSnapshot,
+        language_code: str,
+        language_code_long: str,
+        planet: MapPlanet | None = None,
+    ) -> bytes:
+        """A quick, smaller map without the sectors, territories or icons
+
+        Drawn on a thread in this process so it doesn't wait for the workers to start"""
+        async with self._preview_lock:
+            return await to_thread(
+                _render_preview,
+                self._preview_maps,
+                snapshot,
+                language_code,
+                language_code_long,
+                planet,
+            )
+
+    async def _publish(
+        self,
+        key: tuple,
+        filename: str,
+        render: Callable[[], Awaitable[bytes]],
+        channel: TextChannel,
+    ) -> Maps.LatestMap:
+        """Upload the rendered map unless the same map was uploaded recently
+
+        `key` identifies the render's inputs, a repeat skips the render and upload"""
+        now = datetime.now(tz=timezone.utc)
+        uploaded = self._uploaded_maps.get(key)
+        if (
+            uploaded is not None
+            and (now - uploaded.updated_at).total_seconds() < UPLOADED_MAP_LIFETIME
+        ):
+            self._uploaded_maps.move_to_end(key)
+            self.uploads_skipped += 1
+            return Maps.LatestMap(now, uploaded.map_link)
+        future = self._uploading.get(key)
+        if future is None:
+            future = ensure_future(
+                self._upload(key=key, filename=filename, render=render, channel=channel)
+            )
+            future.add_done_callback(lambda _: self._uploading.pop(key, None))
+            self._uploading[key] = future
+        return await shield(future)
+
+    async def _upload(
+        self,
+        key: tuple,
+        filename: str,
+        render: Callable[[], Awaitable[bytes]],
+        channel: TextChannel,
+    ) -> Maps.LatestMap:
+        image = await render()
+        message = await channel.send(file=File(fp=BytesIO(image), filename=filename))
+        uploaded = Maps.LatestMap(
+            datetime.now(tz=timezone.utc), message.attachments[0].url
+        )
+        self.uploads += 1
+        self._uploaded_maps[key] = uploaded
+        while len(self._uploaded_maps) > UPLOADED_MAPS_KEPT:
+            self._uploaded_maps.popitem(last=False)
+        return uploaded
+
+    async def publish_map(
+        self,
+        snapshot: MapSnapshot,
+        language_code: str,
+        language_code_long: str,
+        channel: TextChannel,
+    ) -> Maps.LatestMap:
+        """The link to this language's map, rendering and uploading it if needed"""
+        return await self._publish(
+            key=("map", snapshot.localized_version(language_code_long), language_code),
+            filename=f"{language_code}.webp",
+            render=lambda: self.render_map(
+                snapshot=snapshot,
+                language_code=language_code,
+                language_code_long=language_code_long,
+            ),
+            channel=channel,
+        )
+
+    async def publish_arrow(
+        self,
+        snapshot: MapSnapshot,
+        language_code: str,
+        language_code_long: str,
+        planet: MapPlanet,
+        channel: TextChannel,
+    ) -> Maps.LatestMap:
+        """The link to this language's map pointing at the planet"""
+        return await self._publish(
+            key=(
+                "arrow",
+                snapshot.localized_version(language_code_long),
+                language_code,
+                planet.index,
+            ),
+            filename="arrow_map.webp",
+            render=lambda: self.render_arrow(
+                snapshot=snapshot,
+                language_code=language_code,
+                language_code_long=language_code_long,
+                planet=planet,
+            ),
+            channel=channel,
+        )
+
+    async def publish_preview(
+        self,
+        snapshot: MapSnapshot,
+        language_code: str,
+        language_code_long: str,
+        channel: TextChannel,
+        planet: MapPlanet | None = None,
+    ) -> Maps.LatestMap:
+        return await self._publish(
+            key=(
+                "preview",
+                snapshot.localized_version(language_code_long),
+                language_code,
+                planet.index if planet else None,
+            ),
+            filename=f"{language_code}_preview.webp",
+            render=lambda: self.render_preview(
+                snapshot=snapshot,
+                language_code=language_code,
+                language_code_long=language_code_long,
+                planet=planet,
+            ),
+            channel=channel,
+        )
+
+    async def publish_progressively(
+        self,
+        snapshot: MapSnapshot,
+        language_code: str,
+        language_code_long: str,
+        channel: TextChannel,
+        planet: MapPlanet | None = None,
+    ) -> AsyncIterator[Maps.LatestMap]:
+        """Yields a preview if the map isn't ready quickly, then the full map
+
+        The full map (or arrow map if `planet` is provided) is always yielded last"""
+        if planet is None:
+            full_map = ensure_future(
+                self.publish_map(
+                    snapshot=snapshot,
+                    language_code=language_code,
+                    language_code_long=language_code_long,
+                    channel=channel,
+                )
+            )
+        else:
+            full_map = ensure_future(
+                self.publish_arrow(
+                    snapshot=snapshot,
+                    language_code=language_code,
+                    language_code_long=language_code_long,
+                    planet=planet,
+                    channel=channel,
+                )
+            )
+        done, _ = await wait({full_map}, timeout=PREVIEW_AFTER)
+        if not done:
+            try:
+                preview = await self.publish_preview(
+                    snapshot=snapshot,
+                    language_code=language_code,
+                    language_code_long=language_code_long,
+                    channel=channel,
+                    planet=planet,
+                )
+            except Exception:
+                # the full map is still on its way, it just arrives without a preview
+                preview = None
+            if preview is not None and not full_map.done():
+                yield preview
+        yield await full_map
+
+    async def publish_maps(
+        self, snapshot: MapSnapshot, languages: dict[str, str], channel: TextChannel
+    ) -> dict[str, Maps.LatestMap | Exception]:
+        """Publish the map for every `{code: long_code}` at once
+
+        Failed languages map to their exception"""
+        results = await gather(
+            *[
+                self.publish_map(
+                    snapshot=snapshot,
+                    language_code=code,
+                    language_code_long=long_code,
+                    channel=channel,
+                )
+                for code, long_code in languages.items()
+            ],
+            return_exceptions=True,
+        )
+        return dict(zip(languages, results))
+
+    def close(self) -> None:
+        for executor in (self._base_executor, self._localize_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._base_executor = None
+        self._localize_executor = None
+        for name in self._published_bases:
+            _unlink_shared_memory(name)
+        self._published_bases.clear()
+        self._base_readers.clear()
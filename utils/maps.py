@@ -1,49 +1,62 @@
+from contextlib import contextmanager
+from hashlib import blake2b
 from math import hypot
 from cv2 import (
-    INTER_NEAREST,
+    CHAIN_APPROX_SIMPLE,
+    COLOR_BGRA2RGBA,
+    COLOR_RGBA2BGRA,
     addWeighted,
     arrowedLine,
-    boundingRect,
     circle,
-    fillPoly,
+    cvtColor,
+    findContours,
     floodFill,
     FLOODFILL_FIXED_RANGE,
     FLOODFILL_MASK_ONLY,
     imread,
-    imwrite,
+    imencode,
     IMREAD_UNCHANGED,
+    INTER_AREA,
     line,
     LINE_AA,
-    merge,
     polylines,
     resize,
-    split,
+    RETR_EXTERNAL,
 )
 from data.lists import CUSTOM_COLOURS
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from io import BytesIO
+from os import listdir
 from numpy import (
-    arctan2,
+    arange,
     array,
+    ascontiguousarray,
+    asarray,
     clip,
-    cos,
-    dot,
-    float32,
-    linalg,
-    mgrid,
+    flatnonzero,
+    full,
     full_like,
+    int16,
+    maximum,
+    mgrid,
+    minimum,
+    ndarray,
     newaxis,
-    pi,
-    sin,
+    nonzero,
+    ones,
     sqrt,
     uint8,
+    uint16,
     where,
     zeros,
 )
 from numpy.random import randint, random_sample
 from PIL import Image, ImageDraw, ImageFont
+from time import perf_counter
+from typing import Callable
 from utils.api_wrapper.models import Assignment, DSS, Planet
-from utils.dataclasses import Factions, Faction, Sectors
+from utils.dataclasses import Factions, Faction, Sector, Sectors
 from utils.mixins import ReprMixin
 
 VONOROI_COLOURS: dict[Faction, dict[str, tuple]] = {
@@ -52,10 +65,217 @@ VONOROI_COLOURS: dict[Faction, dict[str, tuple]] = {
     Factions.terminids: {"tint": (20, 75, 95), "lines": (0, 150, 200)},
 }
 
+# The base map layers in drawing order, each is drawn on a copy of the one beneath it
+MAP_LAYERS = ("sectors", "waypoints", "assignments", "planets", "territories")
+
+# The layers of a quick preview, skipping the slow sector and territory fills
+PREVIEW_LAYERS = ("waypoints", "assignments", "planets")
+
+# Width and height the layers are drawn at, the planets' waypoints are in these pixels
+MAP_RESOLUTION = 2000
+
+# Width and height of the quick preview maps
+PREVIEW_RESOLUTION = 1000
+
+# Every png in here is loaded into the IconAtlas, keyed by its file name
+ICON_DIRECTORY = "resources/map_icons/"
+
+# Width of the diagonal stripes sectors are filled with (in pixels)
+SECTOR_STRIPE_WIDTH = 5
+
+# The map is a disc of this radius (in pixels) centred in a square image twice as wide
+MAP_RADIUS = 1000
+
+# Side of the square tiles the Voronoi partition is labelled in (in pixels)
+VORONOI_TILE_SIZE = 50
+
+
+@dataclass
+class MapIcon:
+    """An icon's colour premultiplied by its alpha, ready to blend with integer maths"""
+
+    premultiplied: ndarray
+    inverse_alpha: ndarray
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self.premultiplied.shape
+
+    @classmethod
+    def from_image(cls, image: ndarray) -> "MapIcon":
+        if image.shape[2] == 4:
+            alpha = image[:, :, 3:].astype(uint16)
+        else:
+            alpha = full((*image.shape[:2], 1), 255, dtype=uint16)
+        return cls(
+            premultiplied=image[:, :, :3].astype(uint16) * alpha,
+            inverse_alpha=255 - alpha,
+        )
+
+
+@dataclass
+class IconPlacement:
+    icon: MapIcon
+    x: int
+    y: int
+
+
+class IconAtlas(dict[str, MapIcon]):
+    @classmethod
+    def load(cls, directory: str = ICON_DIRECTORY) -> "IconAtlas":
+        atlas = cls()
+        for file_name in sorted(listdir(directory)):
+            if file_name.endswith(".png"):
+                atlas[file_name[:-4]] = MapIcon.from_image(
+                    imread(directory + file_name, IMREAD_UNCHANGED)
+                )
+        return atlas
+
+
+class SectorLabels:
+    def __init__(self, empty_map: ndarray):
+        """The regions between the sector lines of the empty map, each flood filled once
+
+        Painting the sector layer is then a palette lookup by label and stripe"""
+        self.image = ascontiguousarray(empty_map[:, :, :3])
+        self.labels = zeros(self.image.shape[:2], dtype=int16)
+        yy, xx = mgrid[: self.image.shape[0], : self.image.shape[1]]
+        self.stripes = (
+            (xx + yy) % (SECTOR_STRIPE_WIDTH * 2) < SECTOR_STRIPE_WIDTH
+        ).astype(uint8)
+        self.count = 0
+
+    def label_at(self, point: tuple[int, int]) -> int:
+        h, w = self.labels.shape
+        x, y = min(max(int(point[0]), 0), w - 1), min(max(int(point[1]), 0), h - 1)
+        if self.labels[y, x] == 0:
+            mask = zeros((h + 2, w + 2), uint8)
+            floodFill(
+                image=self.image,
+                mask=mask,
+                seedPoint=(x, y),
+                newVal=(0, 0, 0),
+                loDiff=(50, 50, 50),
+                upDiff=(50, 50, 50),
+                flags=FLOODFILL_FIXED_RANGE | FLOODFILL_MASK_ONLY,
+            )
+            self.count += 1
+            region = mask[1:-1, 1:-1].astype(bool) & (self.labels == 0)
+            region[y, x] = True
+            self.labels[region] = self.count
+        return int(self.labels[y, x])
+
+    def label_of(self, sector: Sector) -> int:
+        """The region most of the sector's planets are in"""
+        labels = [self.label_at(p.map_waypoints) for p in sector.planets]
+        return max(labels, key=labels.count)
+
+    def paint(self, background: ndarray, sectors: Sectors) -> None:
+        colours = {
+            self.label_of(sector): tuple(int(i) for i in sector.map_colour[::-1])
+            for sector in sectors.all_sectors
+            if sector.map_colour is not None
+        }
+        palette = zeros((self.count + 1, 2, 3), dtype=uint8)
+        painted = zeros(self.count + 1, dtype=bool)
+        for label, bgr_colour in colours.items():
+            palette[label] = (tuple(int(c * 0.5) for c in bgr_colour), bgr_colour)
+            painted[label] = True
+        mask = painted[self.labels]
+        background[:, :, :3][mask] = palette[self.labels[mask], self.stripes[mask]]
+
+
+class VoronoiPartition:
+    def __init__(self, points: dict[int, tuple[int, int]], radius: int = MAP_RADIUS):
+        """Labels each pixel of the map disc with its closest planet, -1 outside it
+
+        Done tile by tile, only checking the planets that could be closest to it"""
+        self.positions = {index: position for position, index in enumerate(points)}
+        self.labels = full((radius * 2, radius * 2), -1, dtype=int16)
+        coords = array(list(points.values()), dtype=float).reshape(-1, 2)
+        tile = VORONOI_TILE_SIZE
+        tile_diagonal = tile * sqrt(2)
+        for top in range(0, radius * 2, tile):
+            for left in range(0, radius * 2, tile):
+                ys = arange(top, min(top + tile, radius * 2))[:, newaxis]
+                xs = arange(left, min(left + tile, radius * 2))[newaxis, :]
+                from_centre = (ys + 0.5 - radius) ** 2 + (xs + 0.5 - radius) ** 2
+                in_disc = from_centre <= radius**2
+                if not in_disc.any() or len(coords) == 0:
+                    continue
+                centre_distances = sqrt(
+                    (coords[:, 0] - (left + tile / 2)) ** 2
+                    + (coords[:, 1] - (top + tile / 2)) ** 2
+                )
+                candidates = flatnonzero(
+                    centre_distances <= centre_distances.min() + tile_diagonal
+                )
+                distances = (xs[:, :, newaxis] - coords[candidates, 0]) ** 2 + (
+                    ys[:, :, newaxis] - coords[candidates, 1]
+                ) ** 2
+                self.labels[top : top + tile, left : left + tile] = where(
+                    in_disc, candidates[distances.argmin(axis=2)], -1
+                )
+        self.bounding_boxes = self._bounding_boxes(self.labels, len(points))
+
+    @staticmethod
+    def _bounding_boxes(labels: ndarray, count: int) -> ndarray:
+        """`(top, left, bottom, right)` of each label, from the runs along each row"""
+        starts = ones(labels.shape, dtype=bool)
+        starts[:, 1:] = labels[:, 1:] != labels[:, :-1]
+        ends = ones(labels.shape, dtype=bool)
+        ends[:, :-1] = starts[:, 1:]
+        rows, run_starts = nonzero(starts)
+        run_ends = nonzero(ends)[1] + 1
+        run_labels = labels[rows, run_starts]
+        keep = run_labels >= 0
+        boxes = full((count, 4), (labels.shape[0], labels.shape[1], 0, 0))
+        minimum.at(boxes[:, 0], run_labels[keep], rows[keep])
+        minimum.at(boxes[:, 1], run_labels[keep], run_starts[keep])
+        maximum.at(boxes[:, 2], run_labels[keep], rows[keep] + 1)
+        maximum.at(boxes[:, 3], run_labels[keep], run_ends[keep])
+        return boxes
+
+    def cell(self, index: int) -> tuple[tuple[slice, slice], ndarray] | None:
+        """The bounding box of a planet's cell and the cell's mask within it"""
+        position = self.positions.get(index)
+        if position is None:
+            return None
+        top, left, bottom, right = self.bounding_boxes[position]
+        if top >= bottom:
+            return None
+        area = (slice(top, bottom), slice(left, right))
+        return area, self.labels[area] == position
+
 
 class Maps:
-    def __init__(self):
+    def __init__(
+        self,
+        resolution: int = MAP_RESOLUTION,
+        layer_names: tuple[str, ...] = MAP_LAYERS,
+        with_icons: bool = True,
+    ):
+        """Draws the galactic map, encoding it at `resolution` pixels square
+
+        A preview uses fewer `layer_names` and skips the icons"""
+        self.resolution = resolution
+        self.layer_names = layer_names
+        self.with_icons = with_icons
         self.latest_maps: dict[str, Maps.LatestMap] = {}
+        self.layers: dict[str, ndarray] = {}
+        self.localized_layers: dict[str, ndarray] = {}
+        self.fingerprints: dict[str, str] = {}
+        self.names_fingerprints: dict[str, str] = {}
+        self.map_fingerprints: dict[str, tuple[str | None, str]] = {}
+        self.encoded_maps: dict[str, bytes] = {}
+        self.timings: dict[str, float] = {}
+        self.reused: set[str] = set()
+        self._empty_map: ndarray | None = None
+        self._icons: IconAtlas | None = None
+        self._fonts: dict[str, ImageFont.FreeTypeFont] = {}
+        self._sector_labels: SectorLabels | None = None
+        self._partition: VoronoiPartition | None = None
+        self._partition_fingerprint: str | None = None
         self.TEXT_SIZE = 25
         self.PLANET_RADIUS = 8
 
@@ -68,23 +288,114 @@ class Maps:
     class FileLocations:
         _prefix: str = "resources/maps/"
         empty_map: str = _prefix + "empty_map.webp"
-        sector_map: str = _prefix + "sector_map.webp"
-        waypoints_map: str = _prefix + "waypoints_map.webp"
-        assignment_map: str = _prefix + "assignment_map.webp"
-        planets_map: str = _prefix + "planets_map.webp"
-        icons_map: str = _prefix + "icons_map.webp"
-        arrow_map: str = _prefix + "arrow_map.webp"
 
-        def localized_map_path(language_code: str) -> str:
-            return f"resources/maps/localized/{language_code}.webp"
+    @contextmanager
+    def _timed(self, name: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = perf_counter() - start
+
+    def timing_summary(self) -> str:
+        return " | ".join(
+            f"{name}: {seconds * 1000:.0f}ms{' (cached)' if name in self.reused else ''}"
+            for name, seconds in self.timings.items()
+        )
+
+    @property
+    def scale(self) -> float:
+        return self.resolution / MAP_RESOLUTION
+
+    @staticmethod
+    def _fingerprint(*inputs) -> str:
+        return blake2b(repr(inputs).encode(), digest_size=16).hexdigest()
+
+    @property
+    def empty_map(self) -> ndarray:
+        if self._empty_map is None:
+            self._empty_map = imread(Maps.FileLocations.empty_map, IMREAD_UNCHANGED)
+        return self._empty_map
+
+    @property
+    def icons(self) -> IconAtlas:
+        if self._icons is None:
+            self._icons = IconAtlas.load()
+        return self._icons
+
+    def font(self, language_code: str) -> ImageFont.FreeTypeFont:
+        if language_code not in self._fonts:
+            if language_code == "zh-Hant":
+                font = ImageFont.truetype(
+                    "resources/gww-font-zh-hant.ttf", self.TEXT_SIZE
+                )
+                font.set_variation_by_name("Medium")
+            else:
+                font = ImageFont.truetype("resources/gww-font.ttf", self.TEXT_SIZE)
+            self._fonts[language_code] = font
+        return self._fonts[language_code]
+
+    def voronoi_partition(self, planets: dict[int, Planet]) -> VoronoiPartition:
+        """The partition for this layout of planets, only relabelled when a planet moves"""
+        points = {index: planet.map_waypoints for index, planet in planets.items()}
+        fingerprint = self._fingerprint(tuple(points.items()))
+        if self._partition is None or fingerprint != self._partition_fingerprint:
+            self._partition = VoronoiPartition(points=points)
+            self._partition_fingerprint = fingerprint
+        return self._partition
+
+    def _latest_layer_name(self, below: str | None = None) -> str | None:
+        """The highest layer drawn so far (beneath `below` if provided)"""
+        layers = (
+            self.layer_names[: self.layer_names.index(below)]
+            if below
+            else self.layer_names
+        )
+        return next((l for l in reversed(layers) if l in self.layers), None)
+
+    def _latest_layer(self, below: str | None = None) -> ndarray:
+        """The highest layer drawn so far (beneath `below` if provided), or the empty map
+
+        Not a copy, draw on `.copy()` of it"""
+        layer = self._latest_layer_name(below=below)
+        return self.layers[layer] if layer else self.empty_map
+
+    def _update_layer(
+        self, layer: str, inputs: tuple, draw: Callable[[ndarray], None]
+    ) -> None:
+        """Redraw `layer` only if its inputs or any layer beneath it have changed"""
+        with self._timed(layer):
+            below = self._latest_layer_name(below=layer)
+            fingerprint = self._fingerprint(self.fingerprints.get(below), inputs)
+            if layer in self.layers and self.fingerprints.get(layer) == fingerprint:
+                self.reused.add(layer)
+                return
+            self.reused.discard(layer)
+            background = self._latest_layer(below=layer).copy()
+            draw(background)
+            self.layers[layer] = background
+            self.fingerprints[layer] = fingerprint
+
+    def use_base_layer(self, layer: ndarray, fingerprint: str) -> None:
+        """Localize on top of a base map drawn elsewhere, `layer` is never drawn on"""
+        self.layers = {self.layer_names[-1]: layer}
+        self.fingerprints = {self.layer_names[-1]: fingerprint}
 
     def update_base_map(
-        self, planets: list[Planet], assignments: list[Assignment]
+        self, planets: dict[int, Planet], assignments: list[Assignment]
     ) -> None:
-        self.update_sectors(planets=planets)
-        self.update_waypoint_lines(planets=planets)
-        self.update_assignment_tasks(assignments=assignments, planets=planets)
-        self.update_planets(planets=planets)
+        self.timings.clear()
+        self.reused.clear()
+        if "sectors" in self.layer_names:
+            self.update_sectors(planets=planets)
+        if "waypoints" in self.layer_names:
+            self.update_waypoint_lines(planets=planets)
+        if "assignments" in self.layer_names:
+            self.update_assignment_tasks(assignments=assignments, planets=planets)
+        if "planets" in self.layer_names:
+            self.update_planets(planets=planets)
+        if "territories" in self.layer_names:
+            self.update_territories(planets=planets)
 
     def update_sectors(self, planets: dict[int, Planet]) -> None:
         sectors = Sectors()
@@ -95,59 +406,40 @@ class Maps:
                 sectors.add_sector(planet)
             else:
                 planet_sector.planets.append(planet)
+        self._update_layer(
+            layer="sectors",
+            inputs=tuple(sorted((s.name, s.map_colour) for s in sectors.all_sectors)),
+            draw=lambda background: self._draw_sectors(background, sectors),
+        )
 
-        background = imread(Maps.FileLocations.empty_map, IMREAD_UNCHANGED)
-        if background.shape[2] == 4:
-            alpha_channel = background[:, :, 3].copy()
-            background_rgb = background[:, :, :3].copy()
-        else:
-            background_rgb = background.copy()
-            alpha_channel = None
-
-        for sector in sectors.all_sectors:
-            if sector.map_colour is None:
-                continue
-            bgr_colour = tuple(int(i) for i in sector.map_colour[::-1])
-            h, w = background.shape[:2]
-            mask = zeros((h + 2, w + 2), uint8)
-            floodFill(
-                image=background_rgb,
-                mask=mask,
-                seedPoint=sector.coordinates,
-                newVal=bgr_colour,
-                loDiff=(50, 50, 50),
-                upDiff=(50, 50, 50),
-                flags=FLOODFILL_FIXED_RANGE | FLOODFILL_MASK_ONLY,
-            )
-
-            # sector stripes
-            region_mask = mask[1:-1, 1:-1].astype(bool)
-            x, y, bw, bh = boundingRect(region_mask.astype(uint8))
-            if bw == 0 or bh == 0:
-                continue
-            yy, xx = mgrid[y : y + bh, x : x + bw]
-            stripes = ((xx + yy if 45 == 45 else xx - yy) % (5 * 2)) < 5
-            sub_region = region_mask[y : y + bh, x : x + bw]
-            sub_bg = background_rgb[y : y + bh, x : x + bw]
-            sub_bg[stripes & sub_region] = bgr_colour
-            sub_bg[~stripes & sub_region] = tuple(int(c * 0.5) for c in bgr_colour)
-            background_rgb[y : y + bh, x : x + bw] = sub_bg
-
-        if alpha_channel is not None:
-            background = merge(
-                [
-                    background_rgb[:, :, 0],
-                    background_rgb[:, :, 1],
-                    background_rgb[:, :, 2],
-                    alpha_channel,
-                ]
-            )
-        else:
-            background = background_rgb
-        imwrite(Maps.FileLocations.sector_map, background)
+    def _draw_sectors(self, background: ndarray, sectors: Sectors) -> None:
+        if self._sector_labels is None:
+            self._sector_labels = SectorLabels(self.empty_map)
+        self._sector_labels.paint(background, sectors)
 
     def update_waypoint_lines(self, planets: dict[int, Planet]) -> None:
-        background = imread(Maps.FileLocations.sector_map, IMREAD_UNCHANGED)
+        self._update_layer(
+            layer="waypoints",
+            inputs=tuple(
+                (
+                    p.index,
+                    p.map_waypoints,
+                    tuple(p.nearby),
+                    p.is_hidden,
+                    p.faction.colour,
+                    p.event.faction.colour if p.event else None,
+                    tuple(p.defending_from),
+                    p.regen_perc_per_hour < 0,
+                    p.in_assignment,
+                )
+                for p in planets.values()
+            ),
+            draw=lambda background: self._draw_waypoint_lines(background, planets),
+        )
+
+    def _draw_waypoint_lines(
+        self, background: ndarray, planets: dict[int, Planet]
+    ) -> None:
         for planet in planets.values():
             for n_index in planet.nearby:
                 near_planet = planets.get(n_index)
@@ -203,25 +495,49 @@ class Maps:
                     lineType=LINE_AA,
                 )
 
-        imwrite(Maps.FileLocations.waypoints_map, background)
-
     def update_assignment_tasks(
         self, assignments: list[Assignment], planets: dict[int, Planet]
     ) -> None:
-        background = imread(Maps.FileLocations.waypoints_map, IMREAD_UNCHANGED)
-        if assignments:
-            for planet in (p for p in planets.values() if p.in_assignment):
-                self._draw_ellipse(
-                    image=background,
-                    coords=planet.map_waypoints,
-                    fill_colour=CUSTOM_COLOURS["MO"],
-                    radius=12 if not planet.dss_in_orbit else 15,
-                )
+        assignment_planets = (
+            [p for p in planets.values() if p.in_assignment] if assignments else []
+        )
+        self._update_layer(
+            layer="assignments",
+            inputs=tuple((p.map_waypoints, p.dss_in_orbit) for p in assignment_planets),
+            draw=lambda background: self._draw_assignment_tasks(
+                background, assignment_planets
+            ),
+        )
 
-        imwrite(Maps.FileLocations.assignment_map, background)
+    def _draw_assignment_tasks(
+        self, background: ndarray, assignment_planets: list[Planet]
+    ) -> None:
+        for planet in assignment_planets:
+            self._draw_ellipse(
+                image=background,
+                coords=planet.map_waypoints,
+                fill_colour=CUSTOM_COLOURS["MO"],
+                radius=12 if not planet.dss_in_orbit else 15,
+            )
 
     def update_planets(self, planets: dict[int, Planet]) -> None:
-        background = imread(Maps.FileLocations.assignment_map, IMREAD_UNCHANGED)
+        self._update_layer(
+            layer="planets",
+            inputs=tuple(
+                (
+                    p.index,
+                    p.map_waypoints,
+                    tuple(sorted(p.effect_ids)),
+                    p.dss_in_orbit,
+                    p.faction.colour,
+                    p.active_campaign,
+                )
+                for p in planets.values()
+            ),
+            draw=lambda background: self._draw_planets(background, planets),
+        )
+
+    def _draw_planets(self, background: ndarray, planets: dict[int, Planet]) -> None:
         for index, planet in planets.items():
             if any(i in planet.effect_ids for i in (1190, 1241, 1252, 1376)):
                 # hidden or special (destroyed etc)
@@ -229,10 +545,14 @@ class Maps:
 
             if any(aeid in (1373, 1374, 1375) for aeid in planet.effect_ids):
                 # exostorm
-                exostorm_icon = imread(
-                    "resources/map_icons/exostorm_swirl.png", IMREAD_UNCHANGED
+                self.composite_icons(
+                    background=background,
+                    placements=[
+                        self.place_icon(
+                            self.icons["exostorm_swirl"], planet.map_waypoints
+                        )
+                    ],
                 )
-                self.paste_image(background, exostorm_icon, planet.map_waypoints)
 
             if planet.dss_in_orbit:
                 self._draw_ellipse(
@@ -291,6 +611,29 @@ class Maps:
                     fill_colour=colour,
                 )
 
+    def update_territories(self, planets: dict[int, Planet]) -> None:
+        self._update_layer(
+            layer="territories",
+            inputs=tuple(
+                (
+                    p.index,
+                    p.map_waypoints,
+                    1376 in p.effect_ids,
+                    p.active_campaign,
+                    tuple(
+                        sorted(
+                            e.percent for e in p.active_effects if e.effect_type == 73
+                        )
+                    ),
+                )
+                for p in planets.values()
+            ),
+            draw=lambda background: self._draw_territories(background, planets),
+        )
+
+    def _draw_territories(
+        self, background: ndarray, planets: dict[int, Planet]
+    ) -> None:
         for planet in [p for p in planets.values() if 1376 in p.effect_ids]:
             self.draw_void(background, planet, planets)
 
@@ -301,42 +644,23 @@ class Maps:
         ]:
             self.draw_gloom(background, planet, planets)
 
-        imwrite(Maps.FileLocations.planets_map, background)
-
-    def draw_arrow(self, language_code: str, planet: Planet) -> None:
-        with Image.open(
-            fp=Maps.FileLocations.localized_map_path(language_code=language_code)
-        ) as background:
+    def draw_arrow(self, language_code: str, planet: Planet) -> bytes:
+        with Image.open(fp=BytesIO(self.encoded_maps[language_code])) as background:
             background_draw = ImageDraw.Draw(im=background)
-            target_coords = planet.map_waypoints
-            background_draw.line(
-                (
-                    target_coords[0] - 7,
-                    target_coords[1] + 25,
-                    target_coords[0] + 75,
-                    target_coords[1] + 100,
-                ),
-                width=20,
-            )
-            background_draw.line(
-                (
-                    target_coords[0] + 7,
-                    target_coords[1] + 25,
-                    target_coords[0] - 75,
-                    target_coords[1] + 100,
-                ),
-                width=20,
-            )
-            background_draw.line(
-                (
-                    target_coords[0],
-                    target_coords[1] + 25,
-                    target_coords[0],
-                    target_coords[1] + 250,
-                ),
-                width=20,
-            )
-            background.save(fp=Maps.FileLocations.arrow_map)
+            x, y = (coord * self.scale for coord in planet.map_waypoints)
+            for x_start, x_end, y_end in ((-7, 75, 100), (7, -75, 100), (0, 0, 250)):
+                background_draw.line(
+                    (
+                        x + x_start * self.scale,
+                        y + 25 * self.scale,
+                        x + x_end * self.scale,
+                        y + y_end * self.scale,
+                    ),
+                    width=max(1, round(20 * self.scale)),
+                )
+            arrow_map = BytesIO()
+            background.save(fp=arrow_map, format="WEBP")
+            return arrow_map.getvalue()
 
     def draw_flow_arrows(self, background, pt1, pt2, spacing=15, size=10):
         x1, y1 = pt1
@@ -378,20 +702,46 @@ class Maps:
         language_code_long: str,
         planets: dict[int, Planet],
     ) -> None:
-        with Image.open(fp=Maps.FileLocations.planets_map) as background:
-            self._write_names(
-                background=background, language_code=language_code_long, planets=planets
+        with self._timed(f"names:{language_code_short}"):
+            fingerprint = self._fingerprint(
+                self.fingerprints.get(self._latest_layer_name()),
+                language_code_long,
+                tuple(
+                    (
+                        p.map_waypoints,
+                        p.names.get(language_code_long, p.name),
+                        p.dss_in_orbit or 1217 in p.effect_ids,
+                    )
+                    for p in planets.values()
+                    if (p.active_campaign and not p.is_hidden)
+                    or (p.dss_in_orbit or 1217 in p.effect_ids)
+                ),
+            )
+            self.names_fingerprints[language_code_short] = fingerprint
+            if (
+                self.map_fingerprints.get(language_code_short, (None,))[0]
+                == fingerprint
+            ):
+                # add_icons draws the names itself if the icons have changed
+                self.localized_layers.pop(language_code_short, None)
+                self.reused.add(f"names:{language_code_short}")
+                return
+            self.reused.discard(f"names:{language_code_short}")
+            self.localized_layers[language_code_short] = self._draw_names(
+                language_code=language_code_long, planets=planets
             )
-            background.save(fp=f"resources/maps/localized/{language_code_short}.webp")
+
+    def _draw_names(self, language_code: str, planets: dict[int, Planet]) -> ndarray:
+        background = Image.fromarray(cvtColor(self._latest_layer(), COLOR_BGRA2RGBA))
+        self._write_names(
+            background=background, language_code=language_code, planets=planets
+        )
+        return cvtColor(asarray(background), COLOR_RGBA2BGRA)
 
     def _write_names(
         self, background: Image.Image, language_code: str, planets: dict[int, Planet]
     ) -> None:
-        if language_code == "zh-Hant":
-            font = ImageFont.truetype("resources/gww-font-zh-hant.ttf", self.TEXT_SIZE)
-            font.set_variation_by_name("Medium")
-        else:
-            font = ImageFont.truetype("resources/gww-font.ttf", self.TEXT_SIZE)
+        font = self.font(language_code)
         background_draw = ImageDraw.Draw(im=background)
         for planet in planets.values():
             if (planet.active_campaign and not planet.is_hidden) or (
@@ -414,21 +764,37 @@ class Maps:
                     spacing=-10,
                 )
 
-    def paste_image(self, background, overlay, coords, x_offset=0, y_offset=0) -> None:
-        x, y = (
-            (coords[0] - int(overlay.shape[0] / 2)) + x_offset,
-            (coords[1] - int(overlay.shape[1] / 2)) + y_offset,
+    @staticmethod
+    def place_icon(
+        icon: MapIcon, coords, x_offset: int = 0, y_offset: int = 0
+    ) -> IconPlacement:
+        return IconPlacement(
+            icon=icon,
+            x=int(coords[0]) - int(icon.shape[0] / 2) + x_offset,
+            y=int(coords[1]) - int(icon.shape[1] / 2) + y_offset,
         )
-        x = max(x, 57)
-        y = max(y, 57)
-        b, g, r, a = split(overlay)
-        overlay_rgb = merge((b, g, r))
-        mask = a.astype(float) / 255.0
-        mask = merge((mask, mask, mask))
-        h, w = overlay.shape[:2]
-        roi = background[y : y + h, x : x + w, :3].astype(float)
-        blended = (overlay_rgb.astype(float) * mask + roi * (1 - mask)).astype(uint8)
-        background[y : y + h, x : x + w, :3] = blended
+
+    @staticmethod
+    def composite_icons(background: ndarray, placements: list[IconPlacement]) -> None:
+        """Alpha blend each placement onto `background` in order, clipped to its edges"""
+        height, width = background.shape[:2]
+        for placement in placements:
+            icon = placement.icon
+            h, w = icon.shape[:2]
+            top, left = max(placement.y, 0), max(placement.x, 0)
+            bottom, right = min(placement.y + h, height), min(placement.x + w, width)
+            if top >= bottom or left >= right:
+                continue
+            icon_area = (
+                slice(top - placement.y, bottom - placement.y),
+                slice(left - placement.x, right - placement.x),
+            )
+            roi = background[top:bottom, left:right, :3]
+            blended = (
+                icon.premultiplied[icon_area] + roi * icon.inverse_alpha[icon_area]
+            )
+            # exact integer division by 255 for anything up to 255 * 255
+            roi[...] = (blended + 1 + (blended >> 8)) >> 8
 
     def add_icons(
         self,
@@ -437,8 +803,84 @@ class Maps:
         planets: dict[int, Planet],
         dss: DSS,
     ):
-        path = Maps.FileLocations.localized_map_path(language_code=lang)
-        background = imread(path, IMREAD_UNCHANGED)
+        with self._timed(f"icons:{lang}"):
+            names_fingerprint = self.names_fingerprints.get(lang)
+            fingerprint = (
+                names_fingerprint,
+                self._fingerprint(
+                    long_code,
+                    self._dss_active(dss) if dss else None,
+                    tuple(
+                        (
+                            p.index,
+                            p.map_waypoints,
+                            p.name,
+                            p.names.get(long_code, p.name),
+                            tuple(sorted(p.effect_ids)),
+                            p.is_hidden,
+                            p.active_campaign,
+                            p.dss_in_orbit,
+                            p.faction.full_name,
+                            p.event.faction.full_name if p.event else None,
+                            tuple(
+                                (sf.faction.full_name, sf.eng_name)
+                                for sf in p.subfactions
+                            ),
+                        )
+                        for p in planets.values()
+                    ),
+                ),
+            )
+            if (
+                names_fingerprint
+                and self.map_fingerprints.get(lang) == fingerprint
+                and lang in self.encoded_maps
+            ):
+                self.localized_layers.pop(lang, None)
+                self.reused.add(f"icons:{lang}")
+                return
+            self.reused.discard(f"icons:{lang}")
+            background = self.localized_layers.pop(lang, None)
+            if background is None:
+                background = (
+                    self._draw_names(language_code=long_code, planets=planets)
+                    if names_fingerprint
+                    else self._latest_layer().copy()
+                )
+            if self.with_icons:
+                self._draw_icons(
+                    background=background,
+                    long_code=long_code,
+                    planets=planets,
+                    dss=dss,
+                )
+        with self._timed(f"encode:{lang}"):
+            self.encoded_maps[lang] = self.encode(background)
+        self.map_fingerprints[lang] = fingerprint
+
+    def encode(self, image: ndarray) -> bytes:
+        if image.shape[0] != self.resolution:
+            image = resize(
+                image, (self.resolution, self.resolution), interpolation=INTER_AREA
+            )
+        return imencode(".webp", image)[1].tobytes()
+
+    @staticmethod
+    def _dss_active(dss: DSS) -> bool:
+        return dss.flags == 1 and not (
+            all([ta.status == 0 for ta in dss.tactical_actions])
+            and dss.move_timer_datetime
+            > datetime.now(tz=timezone.utc) + timedelta(days=30)
+        )
+
+    def _draw_icons(
+        self,
+        background: ndarray,
+        long_code: str,
+        planets: dict[int, Planet],
+        dss: DSS,
+    ) -> None:
+        placements: list[IconPlacement] = []
         for planet in planets.values():
             if 1376 in planet.effect_ids:
                 # in void
@@ -446,25 +888,21 @@ class Maps:
 
             if planet.name == "SUPER EARTH":
                 # super earth
-                se_icon = imread(
-                    "resources/map_icons/super_earth.png", IMREAD_UNCHANGED
-                )
-                self.paste_image(
-                    background=background,
-                    overlay=se_icon,
-                    coords=planet.map_waypoints,
+                placements.append(
+                    self.place_icon(
+                        icon=self.icons["super_earth"],
+                        coords=planet.map_waypoints,
+                    )
                 )
             elif any([aeid in (1241, 1252) for aeid in planet.effect_ids]):
                 # fractured planets
-                frac_planet_icon = imread(
-                    "resources/map_icons/fractured_planet.png", IMREAD_UNCHANGED
-                )
-                self.paste_image(
-                    background=background,
-                    overlay=frac_planet_icon,
-                    coords=planet.map_waypoints,
-                    x_offset=-20,
-                    y_offset=10,
+                placements.append(
+                    self.place_icon(
+                        icon=self.icons["fractured_planet"],
+                        coords=planet.map_waypoints,
+                        x_offset=-20,
+                        y_offset=10,
+                    )
                 )
 
             loc_name = planet.names.get(long_code, planet.name)
@@ -481,35 +919,35 @@ class Maps:
                         Factions.humans,
                     ]:
                         continue
-                    sf_icon = imread(
-                        f"resources/map_icons/{sf.eng_name.lower().replace(' ', '_')}_bordered.png",
-                        IMREAD_UNCHANGED,
+                    sf_icon = self.icons.get(
+                        f"{sf.eng_name.lower().replace(' ', '_')}_bordered"
                     )
                     if sf_icon is not None:
-                        self.paste_image(
-                            background=background,
-                            overlay=sf_icon,
-                            coords=planet.map_waypoints,
-                            x_offset=(
-                                allied_horiz_offset
-                                if sf.faction == Factions.humans
-                                else enemy_horiz_offset
-                            ),
-                            y_offset=-(
-                                20
-                                + (
-                                    (loc_name.count(" ") + 1)
-                                    * (
-                                        self.TEXT_SIZE
-                                        if planet.active_campaign
-                                        or (
-                                            planet.dss_in_orbit
-                                            or 1217 in planet.effect_ids
+                        placements.append(
+                            self.place_icon(
+                                icon=sf_icon,
+                                coords=planet.map_waypoints,
+                                x_offset=(
+                                    allied_horiz_offset
+                                    if sf.faction == Factions.humans
+                                    else enemy_horiz_offset
+                                ),
+                                y_offset=-(
+                                    20
+                                    + (
+                                        (loc_name.count(" ") + 1)
+                                        * (
+                                            self.TEXT_SIZE
+                                            if planet.active_campaign
+                                            or (
+                                                planet.dss_in_orbit
+                                                or 1217 in planet.effect_ids
+                                            )
+                                            else 0
                                         )
-                                        else 0
                                     )
-                                )
-                            ),
+                                ),
+                            )
                         )
                         if sf.faction == Factions.humans:
                             allied_horiz_offset -= sf_icon.shape[0] + 1
@@ -518,16 +956,9 @@ class Maps:
 
             if dss and planet.dss_in_orbit:
                 dss_icon = (
-                    imread("resources/map_icons/dss_glow.png", IMREAD_UNCHANGED)
-                    if dss.flags == 1
-                    and not (
-                        all([ta.status == 0 for ta in dss.tactical_actions])
-                        and dss.move_timer_datetime
-                        > datetime.now(tz=timezone.utc) + timedelta(days=30)
-                    )
-                    else imread(
-                        "resources/map_icons/dss_glow_inactive.png", IMREAD_UNCHANGED
-                    )
+                    self.icons["dss_glow"]
+                    if self._dss_active(dss)
+                    else self.icons["dss_glow_inactive"]
                 )
                 verti_diff = 65
                 if loc_name.count(" ") > 0:
@@ -536,11 +967,9 @@ class Maps:
                     int(planet.map_waypoints[0]) + 10,
                     int(planet.map_waypoints[1]) - verti_diff,
                 )
-                self.paste_image(background, dss_icon, dss_coords)
+                placements.append(self.place_icon(dss_icon, dss_coords))
             elif 1217 in planet.effect_ids:
-                dss_icon = imread(
-                    "resources/map_icons/dss_glow_inactive.png", IMREAD_UNCHANGED
-                )
+                dss_icon = self.icons["dss_glow_inactive"]
                 verti_diff = 65
                 if loc_name.count(" ") > 0:
                     verti_diff += loc_name.count(" ") * (self.TEXT_SIZE - 5)
@@ -548,131 +977,14 @@ class Maps:
                     int(planet.map_waypoints[0]) + 10,
                     int(planet.map_waypoints[1]) - verti_diff,
                 )
-                self.paste_image(background, dss_icon, dss_coords)
-        imwrite(path, background)
-
-    def get_voronoi_cell_polygon(
-        self, focal, others, bounds=(-2000, 2000, -2000, 2000)
-    ):
-        xmin, xmax, ymin, ymax = bounds
-        polygon = array(
-            [
-                [xmin, ymin],
-                [xmax, ymin],
-                [xmax, ymax],
-                [xmin, ymax],
-            ],
-            dtype=float,
-        )
-
-        for other in others:
-            mid = (focal + other) / 2.0
-            normal = focal - other
-            polygon = self.clip_polygon_by_halfplane(polygon, mid, normal)
-            if len(polygon) == 0:
-                break
-
-        return polygon
-
-    def clip_polygon_by_halfplane(self, polygon, point_on_plane, normal):
-        if len(polygon) == 0:
-            return polygon
-
-        result = []
-        n = len(polygon)
-
-        def inside(p):
-            return dot(p - point_on_plane, normal) >= 0
-
-        def intersect(a, b):
-            da = dot(a - point_on_plane, normal)
-            db = dot(b - point_on_plane, normal)
-            t = da / (da - db)
-            return a + t * (b - a)
-
-        for i in range(n):
-            a = polygon[i]
-            b = polygon[(i + 1) % n]
-            a_in = inside(a)
-            b_in = inside(b)
-
-            if a_in:
-                result.append(a)
-                if not b_in:
-                    result.append(intersect(a, b))
-            elif b_in:
-                result.append(intersect(a, b))
-
-        return array(result)
-
-    def clip_polygon_by_circle(self, polygon, center, radius):
-        if len(polygon) == 0:
-            return polygon
-
-        result = []
-        n = len(polygon)
-        tol = 1.0
-
-        def inside(p):
-            return linalg.norm(p - center) <= radius
-
-        def on_circle(p):
-            return abs(linalg.norm(p - center) - radius) <= tol
-
-        def intersect(a, b):
-            d = b - a
-            f = a - center
-            qa = dot(d, d)
-            qb = 2 * dot(f, d)
-            qc = dot(f, f) - radius**2
-            disc = qb**2 - 4 * qa * qc
-            if disc < 0:
-                return a
-            disc = sqrt(disc)
-            t1 = (-qb - disc) / (2 * qa)
-            t2 = (-qb + disc) / (2 * qa)
-            for t in (t1, t2):
-                if 0 <= t <= 1:
-                    return a + t * d
-            return a
-
-        for i in range(n):
-            a = polygon[i]
-            b = polygon[(i + 1) % n]
-            a_in = inside(a)
-            b_in = inside(b)
-
-            if a_in:
-                result.append(a)
-                if not b_in:
-                    result.append(intersect(a, b))
-            elif b_in:
-                result.append(intersect(a, b))
-
-        if len(result) == 0:
-            return array([])
-
-        final = []
-        for i in range(len(result)):
-            a = result[i]
-            b = result[(i + 1) % len(result)]
-            final.append(a)
-            if on_circle(a) and on_circle(b):
-                angle_a = arctan2(a[1] - center[1], a[0] - center[0])
-                angle_b = arctan2(b[1] - center[1], b[0] - center[0])
-                diff = (angle_b - angle_a + pi) % (2 * pi) - pi
-                for step in range(1, 20):
-                    t = step / 20
-                    angle = angle_a + diff * t
-                    final.append(center + radius * array([cos(angle), sin(angle)]))
-
-        return array(final)
+                placements.append(self.place_icon(dss_icon, dss_coords))
+        self.composite_icons(background=background, placements=placements)
 
     def draw_voronoi_tint(
         self,
-        background,
-        focal_planet,
-        nearby_planets,
+        background: ndarray,
+        partition: VoronoiPartition,
+        planet: Planet,
         background_weight: float,
         tint_colour: tuple[int, int, int],
         tint_weight: float,
@@ -681,77 +993,59 @@ class Maps:
         with_static: bool = False,
         with_stars: bool = False,
     ):
-        cell_polygon = self.get_voronoi_cell_polygon(focal_planet, nearby_planets)
-        cell_polygon = self.clip_polygon_by_circle(
-            cell_polygon, array((1000, 1000), dtype=float), 1000
-        )
-        if len(cell_polygon) == 0:
+        cell = partition.cell(planet.index)
+        if cell is None:
             return
+        area, mask = cell
+        roi = background[area]
 
-        cell_px = cell_polygon.astype(int)
-        cell_px = clip(cell_px, 0, 2000 - 1)
-
-        mask = zeros((2000, 2000), dtype=uint8)
-        fillPoly(mask, [cell_px], 255)
-
-        tint_colour = (*tint_colour, 255)
-        tint = full_like(background, tint_colour)
-        tinted = addWeighted(background, background_weight, tint, tint_weight, 0)
-
-        background[:] = where(mask[:, :, newaxis] == 255, tinted, background)
+        tint = full_like(roi, (*tint_colour, 255)[: roi.shape[2]])
+        tinted = addWeighted(roi, background_weight, tint, tint_weight, 0)
+        roi[mask] = tinted[mask]
         if with_lines:
+            contours, _ = findContours(
+                mask.astype(uint8),
+                RETR_EXTERNAL,
+                CHAIN_APPROX_SIMPLE,
+                offset=(area[1].start, area[0].start),
+            )
             polylines(
                 background,
-                [cell_px],
+                contours,
                 isClosed=True,
                 color=(*line_colour, 150),
                 thickness=2,
             )
 
         if with_static:
-            cell_pixels = where(mask == 255)
-            if len(cell_pixels[0]) > 0:
-                intensity = int(30 * tint_weight)
-                if intensity > 0:
-                    grain_size = 2
-                    small_noise = randint(
-                        -intensity,
-                        intensity + 1,
-                        size=(2000 // grain_size, 2000 // grain_size),
-                    )
-                    noise_full = resize(
-                        small_noise.astype(float32),
-                        (2000, 2000),
-                        interpolation=INTER_NEAREST,
-                    ).astype(int)
-                    noise = noise_full[cell_pixels]
-                    if with_stars:
-                        star_chance = 0.0015
-                        star_mask = random_sample(len(cell_pixels[0])) < star_chance
-                    for c in range(3):
-                        ch = background[:, :, c]
-                        vals = ch[cell_pixels].astype(int)
-                        reflected = where(
-                            vals + noise < 0,
-                            -noise,
-                            where(vals + noise > 255, -noise, noise),
-                        )
-                        new_vals = clip(vals + reflected, 0, 255).astype(uint8)
-                        if with_stars:
-                            new_vals[star_mask] = 255
-                        ch[cell_pixels] = new_vals
-                        background[:, :, c] = ch
+            intensity = int(30 * tint_weight)
+            if intensity > 0:
+                grain_size = 2
+                h, w = mask.shape
+                small_noise = randint(
+                    -intensity,
+                    intensity + 1,
+                    size=(-(-h // grain_size), -(-w // grain_size)),
+                    dtype=int16,
+                )
+                noise = small_noise.repeat(grain_size, axis=0).repeat(
+                    grain_size, axis=1
+                )[:h, :w][mask][:, newaxis]
+                vals = roi[:, :, :3][mask].astype(int16)
+                reflected = where(
+                    (vals + noise < 0) | (vals + noise > 255), -noise, noise
+                )
+                new_vals = clip(vals + reflected, 0, 255).astype(uint8)
+                if with_stars:
+                    star_chance = 0.0015
+                    new_vals[random_sample(len(new_vals)) < star_chance] = 255
+                roi[:, :, :3][mask] = new_vals
 
     def draw_void(self, background, planet: Planet, planets: dict[int, Planet]):
-        focal_planet = array(planet.map_waypoints)
-        nearby_planets = array(
-            [p.map_waypoints for p in planets.values() if p != planet], dtype=float
-        )
-
         self.draw_voronoi_tint(
             background,
-            focal_planet,
-            nearby_planets,
+            self.voronoi_partition(planets),
+            planet,
             0.15,
             VONOROI_COLOURS[Factions.illuminate]["tint"],
             0.85,
@@ -761,10 +1055,6 @@ class Maps:
         )
 
     def draw_gloom(self, background, planet: Planet, planets: dict[int, Planet]):
-        focal_planet = array(planet.map_waypoints)
-        nearby_planets = array(
-            [p.map_waypoints for p in planets.values() if p != planet], dtype=float
-        )
         gloom_effect = next(
             (gwe for gwe in planet.active_effects if gwe.effect_type == 73), None
         )
@@ -774,8 +1064,8 @@ class Maps:
             effect_percent -= 0.1
         self.draw_voronoi_tint(
             background,
-            focal_planet,
-            nearby_planets,
+            self.voronoi_partition(planets),
+            planet,
             clip(0.25 + (1 - effect_percent) / 0.25 * 0.6, 0.25, 0.75),
             VONOROI_COLOURS[Factions.terminids]["tint"],
             effect_percent,
@@ -1,38 +1,76 @@
-from collections import deque
 from datetime import datetime, timedelta, timezone
+from numpy import arange, errstate, float64, int64, sqrt, where, zeros
+from time import time
 from typing import Any
 from utils.mixins import ReprMixin
 
+# Samples kept per key, about 15 minutes of pulls
+TRACKER_SAMPLES = 16
+
+# Keys a tracker has room for before its buffers grow
+TRACKER_ROWS = 64
+
+# A sample's weight in the rate halves for every this many seconds it is older than the newest (in seconds)
+RATE_HALF_LIFE = 10 * 60
+
+# Standard errors either side of the rate covered by the ETA range, 1.96 is ~95%
+ETA_CONFIDENCE_Z = 1.96
+
 
 class BaseTrackerEntry(ReprMixin):
     __slots__ = (
-        "value",
-        "max_entries",
-        "changes_list",
+        "_tracker",
+        "_row",
+        "_value",
+        "_rate",
+        "_rate_error",
     )
 
-    def __init__(self, value: int | float, max_entries: int = 15):
-        self.value: int | float = value
-        self.max_entries: int = max_entries
-        self.changes_list: deque = deque(maxlen=self.max_entries)
+    def __init__(self, tracker: "BaseTracker", row: int):
+        """A view of one key's samples in a `BaseTracker`
 
-    def update_data(self, new_value: int | float) -> None:
-        delta: int | float = new_value - self.value
-        if len(self.changes_list) == 0:
-            self.changes_list.extend([delta] * self.max_entries)
-        else:
-            self.changes_list.append(delta)
-        self.value: int | float = new_value
+        Keeps its last value and rate if the key is removed from the tracker"""
+        self._tracker: BaseTracker | None = tracker
+        self._row = row
+        self._value: int | float = 0
+        self._rate: float = 0.0
+        self._rate_error: float | None = None
+
+    def _detach(self) -> None:
+        self._value = self.value
+        self._rate = self.change_rate_per_hour
+        self._rate_error = self.change_rate_error
+        self._tracker = None
+
+    @property
+    def value(self) -> int | float:
+        if self._tracker is None:
+            return self._value
+        return self._tracker.latest_value(self._row)
+
+    @property
+    def change_rate_per_hour(self) -> float:
+        if self._tracker is None:
+            return self._rate
+        return float(self._tracker.rates_per_hour[self._row])
 
     @property
-    def change_rate_per_hour(self) -> int | float:
-        if not self.changes_list:
-            return 0
-        return sum(self.changes_list) * (60 / len(self.changes_list))
+    def change_rate_error(self) -> float | None:
+        """Standard error of `change_rate_per_hour`, `None` until there are 3 samples"""
+        if self._tracker is None:
+            return self._rate_error
+        error = float(self._tracker.rate_errors_per_hour[self._row])
+        return None if error != error else error
 
     @property
-    def seconds_until_complete(self) -> int:
-        rate: int | float = self.change_rate_per_hour
+    def change_rate_interval(self) -> tuple[float, float] | None:
+        """The range the hourly rate likely falls in, `None` until there are 3 samples"""
+        if (error := self.change_rate_error) is None:
+            return None
+        rate = self.change_rate_per_hour
+        return rate - ETA_CONFIDENCE_Z * error, rate + ETA_CONFIDENCE_Z * error
+
+    def _seconds_until_complete(self, rate: float) -> int | None:
         if rate > 0:
             return int(((1 - self.value) / rate) * 3600)
         elif rate < 0:
@@ -40,7 +78,11 @@ class BaseTrackerEntry(ReprMixin):
         return None
 
     @property
-    def complete_time(self) -> datetime:
+    def seconds_until_complete(self) -> int | None:
+        return self._seconds_until_complete(self.change_rate_per_hour)
+
+    @property
+    def complete_time(self) -> datetime | None:
         if self.change_rate_per_hour > 0:
             return datetime.now(tz=timezone.utc) + timedelta(
                 seconds=self.seconds_until_complete
@@ -48,6 +90,24 @@ class BaseTrackerEntry(ReprMixin):
         else:
             return None
 
+    @property
+    def complete_time_range(self) -> tuple[datetime | None, datetime | None]:
+        """Earliest and latest likely completion times
+
+        The latest is `None` if the rate might not be positive, both are `None` without enough samples
+        """
+        if (
+            self.change_rate_per_hour <= 0
+            or (interval := self.change_rate_interval) is None
+        ):
+            return None, None
+        now = datetime.now(tz=timezone.utc)
+        slowest, fastest = interval
+        earliest = now + timedelta(seconds=self._seconds_until_complete(fastest))
+        if slowest <= 0:
+            return earliest, None
+        return earliest, now + timedelta(seconds=self._seconds_until_complete(slowest))
+
     def percentage_at(self, time: datetime) -> float:
         return (
             self.value
@@ -61,25 +121,112 @@ class BaseTrackerEntry(ReprMixin):
 
 
 class BaseTracker(ReprMixin):
-    def __init__(self) -> None:
+    def __init__(self, samples: int = TRACKER_SAMPLES) -> None:
+        """Timestamped samples for many keys in one ring buffer
+
+        Rates come from a weighted least squares fit of value against time,
+        worked out for every key at once the first time a rate is read after new samples.
+        Late or skipped pulls only stretch the time between samples instead of skewing the rate.
+        """
+        self.samples = samples
         self._raw_dict: dict[Any, BaseTrackerEntry] = {}
+        self._free_rows: list[int] = []
+        self._rows = 0
+        self._times = zeros((0, samples), dtype=float64)
+        self._values = zeros((0, samples), dtype=float64)
+        self._counts = zeros(0, dtype=int64)
+        self._latest = zeros(0, dtype=int64)
+        self._rates = zeros(0, dtype=float64)
+        self._rate_errors = zeros(0, dtype=float64)
+        self._stale = False
 
-    def add_entry(self, key, value) -> None:
+    def _new_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+        if self._rows == len(self._counts):
+            capacity = max(TRACKER_ROWS, self._rows * 2)
+            for name in ("_times", "_values", "_counts", "_latest"):
+                array = getattr(self, name)
+                grown = zeros((capacity, *array.shape[1:]), dtype=array.dtype)
+                grown[: self._rows] = array
+                setattr(self, name, grown)
+        self._rows += 1
+        return self._rows - 1
+
+    def add_entry(self, key, value, timestamp: float | None = None) -> None:
+        """Record `value` for `key`, sampled at `timestamp` (UNIX seconds, default now)"""
+        if timestamp is None:
+            timestamp = time()
         if key not in self._raw_dict:
-            self._raw_dict[key] = BaseTrackerEntry(value=value)
-        else:
-            entry: BaseTrackerEntry = self._raw_dict[key]
-            entry.update_data(new_value=value)
+            row = self._new_row()
+            self._counts[row] = 0
+            self._latest[row] = -1
+            self._raw_dict[key] = BaseTrackerEntry(tracker=self, row=row)
+        row = self._raw_dict[key]._row
+        slot = (self._latest[row] + 1) % self.samples
+        self._times[row, slot] = timestamp
+        self._values[row, slot] = value
+        self._latest[row] = slot
+        self._counts[row] = min(self._counts[row] + 1, self.samples)
+        self._stale = True
 
     def get_entry(self, key) -> BaseTrackerEntry | None:
         return self._raw_dict.get(key)
 
     def remove_entry(self, key) -> None:
         if key in self._raw_dict:
-            self._raw_dict.pop(key)
+            entry = self._raw_dict.pop(key)
+            entry._detach()
+            self._counts[entry._row] = 0
+            self._free_rows.append(entry._row)
+            self._stale = True
 
     def all_keys(self) -> list:
         return list(self._raw_dict.keys())
 
     def as_dict(self) -> dict:
         return {k: v.value for k, v in self._raw_dict.items()}
+
+    def latest_value(self, row: int) -> float:
+        return float(self._values[row, self._latest[row]])
+
+    @property
+    def rates_per_hour(self):
+        if self._stale:
+            self._fit()
+        return self._rates
+
+    @property
+    def rate_errors_per_hour(self):
+        if self._stale:
+            self._fit()
+        return self._rate_errors
+
+    def _fit(self) -> None:
+        """Weighted least squares slope and its standard error for every key"""
+        rows = self._rows
+        times = self._times[:rows]
+        values = self._values[:rows]
+        counts = self._counts[:rows]
+        # ring slots are filled in order, so the first `count` slots of a row are in use
+        in_use = arange(self.samples) < counts[:, None]
+        newest = times[arange(rows), self._latest[:rows]]
+        with errstate(divide="ignore", invalid="ignore", over="ignore"):
+            weights = where(
+                in_use, 0.5 ** ((newest[:, None] - times) / RATE_HALF_LIFE), 0.0
+            )
+            total_weight = weights.sum(axis=1)
+            mean_time = (weights * times).sum(axis=1) / total_weight
+            mean_value = (weights * values).sum(axis=1) / total_weight
+            time_offsets = where(in_use, times - mean_time[:, None], 0.0)
+            value_offsets = where(in_use, values - mean_value[:, None], 0.0)
+            spread = (weights * time_offsets**2).sum(axis=1)
+            slopes = (weights * time_offsets * value_offsets).sum(axis=1) / spread
+            fitted = spread > 0
+            slopes = where(fitted, slopes, 0.0)
+            residuals = value_offsets - slopes[:, None] * time_offsets
+            variance = (weights * residuals**2).sum(axis=1) / (counts - 2)
+            errors = sqrt(variance / spread)
+        self._rates = slopes * 3600
+        self._rate_errors = where(fitted & (counts > 2), errors * 3600, float("nan"))
+        self._stale = False